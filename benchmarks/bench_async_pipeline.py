@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Compare thread-per-source and asyncio pipelines over many device pairs.
+
+Starts N simulated board pairs (UartSimulator, looping tests/ini.txt and
+tests/ref.txt at the given procedure rate) and runs either the threaded
+pipeline (producer_worker per source, merged_stream_consumer per pair) or
+run_async_pipeline() on one event loop. Reports coupled pairs per second,
+process CPU time and the number of pipeline threads.
+
+Usage:
+    python3 benchmarks/bench_async_pipeline.py [pairs] [rate_hz] [seconds]
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from queue import Queue
+from threading import Event, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources.uart_simulator import UartSimulator
+from toolset.data_sources.uart_source import UartDataSource
+from toolset.pipeline import producer_worker, run_async_pipeline
+from toolset.processing.cs_subevent_data_consumer import MergedQueueWriter, merged_stream_consumer
+
+
+def _start_pairs(count, rate_hz):
+    simulators = [UartSimulator('tests/ini.txt', 'tests/ref.txt', rate_hz=rate_hz, loop=True) for _ in range(count)]
+    pairs = []
+    for simulator in simulators:
+        simulator.start()
+        initiator, reflector = (UartDataSource(port) for port in simulator.ports)
+        initiator.open()
+        reflector.open()
+        pairs.append((initiator, reflector))
+    return simulators, pairs
+
+
+def _run_threads(pairs, seconds, coupled, stop_event):
+    threads = []
+    for initiator, reflector in pairs:
+        merged_queue = Queue(maxsize=200)
+        for role, source in enumerate((initiator, reflector)):
+            source.set_stop_event(stop_event)
+            threads.append(Thread(target=producer_worker,
+                                  args=(source, MergedQueueWriter(merged_queue, role), stop_event), daemon=True))
+        threads.append(Thread(target=merged_stream_consumer,
+                              args=(merged_queue, lambda *data: coupled.append(1)), daemon=True))
+    for thread in threads:
+        thread.start()
+    for initiator, _ in pairs:
+        initiator.send(b's')
+    time.sleep(seconds)
+    peak_threads = threading.active_count()
+    stop_event.set()
+    for thread in threads:
+        thread.join(timeout=2.0)
+    return peak_threads
+
+
+def _run_async(pairs, seconds, coupled, stop_event):
+    peak_threads = []
+
+    async def _main():
+        task = asyncio.create_task(run_async_pipeline(pairs, lambda index, *data: coupled.append(1)))
+        for initiator, _ in pairs:
+            initiator.send(b's')
+        await asyncio.sleep(seconds)
+        peak_threads.append(threading.active_count())
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(_main())
+    return peak_threads[0]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    rate_hz = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    print(f"{count} pairs at {rate_hz:g} Hz for {seconds:g} s (offered {count * rate_hz:g} pairs/s)")
+
+    for name, run in (('threads', _run_threads), ('asyncio', _run_async)):
+        simulators, pairs = _start_pairs(count, rate_hz)
+        # Simulator threads are not part of the pipeline
+        base_threads = threading.active_count()
+        coupled = []
+        cpu_start = time.process_time()
+        stop_event = Event()
+        peak_threads = run(pairs, seconds, coupled, stop_event)
+        cpu = time.process_time() - cpu_start
+        for simulator in simulators:
+            simulator.close()
+        print(f"  {name:8s} coupled {len(coupled) / seconds:7.1f} pairs/s  CPU {cpu / seconds * 100:5.1f} %  "
+              f"pipeline threads {peak_threads - base_threads}")
+
+
+if __name__ == '__main__':
+    main()
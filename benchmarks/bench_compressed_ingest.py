@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Compare FileDataSource throughput and memory on plain and compressed logs.
+
+A synthetic session (see bench_parallel_ingest) is written uncompressed and
+as gzip, bzip2 and xz, then each file is read once for timing and once under
+tracemalloc to report the peak traced memory.
+
+Usage:
+    python3 benchmarks/bench_compressed_ingest.py [log_file] [num_subevents]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_parallel_ingest import write_synthetic_log
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.compression import open_log_writer
+from toolset.data_sources.events import SubeventResultEvent
+
+
+def _read(path):
+    return sum(1 for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent))
+
+
+def main():
+    template = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    num_subevents = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, 'session.txt')
+        write_synthetic_log(template, plain, num_subevents)
+        text_mb = os.path.getsize(plain) / 1e6
+        with open(plain, 'rb') as f:
+            data = f.read()
+
+        paths = {'plain': plain}
+        for compression in ('gz', 'bz2', 'xz'):
+            paths[compression] = f'{plain}.{compression}'
+            with open_log_writer(paths[compression], compression) as f:
+                f.write(data)
+        del data
+
+        print(f"{num_subevents} subevents, {text_mb:.1f} MB of text")
+        baseline = None
+        for name, path in paths.items():
+            start = time.perf_counter()
+            count = _read(path)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+
+            tracemalloc.start()
+            _read(path)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+
+            print(f"  {name:5s}  {os.path.getsize(path) / 1e6:6.2f} MB on disk  "
+                  f"{text_mb / elapsed:5.1f} MB/s  {count / elapsed:6.0f} subevents/s  "
+                  f"({baseline / elapsed:.2f}x plain)  peak {peak_mb:.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
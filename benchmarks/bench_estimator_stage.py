@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Compare inline pair processing with the process-pool EstimatorStage.
+
+Processes the coupled pairs of tests/ini.txt and tests/ref.txt (repeated)
+either inline, as the consumer and Tk threads do without
+--estimator-workers (phase slope and amplitude response, then IFFT and
+MUSIC), or through an EstimatorStage with N worker processes. Reports
+pairs per second and the CPU time of the submitting thread per pair,
+which is what remains on the consumer's GIL.
+
+Usage:
+    python3 benchmarks/bench_estimator_stage.py [pairs] [max_workers]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.pipeline import EstimatorStage
+from toolset.processing.cs_ifft import compute_ifft_response
+from toolset.processing.cs_music import compute_music_spectrum
+from toolset.processing.cs_subevent_data_consumer import process_coupled_subevents
+
+
+def _pairs(count):
+    def subevents(path):
+        return {e.subevent.procedure_counter: e.subevent
+                for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)}
+
+    initiators, reflectors = subevents('tests/ini.txt'), subevents('tests/ref.txt')
+    pairs = [(initiators[c], reflectors[c]) for c in sorted(initiators.keys() & reflectors.keys())]
+    return (pairs * (count // len(pairs) + 1))[:count]
+
+
+def _inline(pairs):
+    def gui_callback(initiator, reflector, phase_slope_data, amplitude_response_data):
+        compute_ifft_response(phase_slope_data, amplitude_response_data)
+        compute_music_spectrum(phase_slope_data, amplitude_response_data)
+
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    for initiator, reflector in pairs:
+        process_coupled_subevents(initiator, reflector, gui_callback)
+    return time.perf_counter() - start, time.thread_time() - cpu_start
+
+
+def _pooled(pairs, workers):
+    delivered = []
+    stage = EstimatorStage(lambda *data: delivered.append(1), workers, max_pending=4 * workers)
+    # Let the workers start before timing
+    stage.pool.submit(int).result()
+    for future in [stage.pool.submit(int) for _ in range(workers)]:
+        future.result()
+
+    start = time.perf_counter()
+    cpu_start = time.thread_time()
+    for initiator, reflector in pairs:
+        stage.submit(initiator, reflector)
+    cpu_s = time.thread_time() - cpu_start
+    stage.close()
+    assert len(delivered) == len(pairs)
+    return time.perf_counter() - start, cpu_s
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else max(os.cpu_count() or 1, 2)
+    pairs = _pairs(count)
+
+    print(f"{count} pairs, {os.cpu_count()} CPUs")
+    runs = [('inline', lambda: _inline(pairs))]
+    workers = 1
+    while workers <= max_workers:
+        runs.append((f'{workers} workers', lambda workers=workers: _pooled(pairs, workers)))
+        workers *= 2
+    for name, run in runs:
+        elapsed, caller_s = run()
+        print(f"  {name:10s} {count / elapsed:7.1f} pairs/s  caller thread CPU {caller_s / count * 1e3:6.3f} ms/pair")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Measure append-to-event latency of FollowFileDataSource.
+
+A writer thread appends subevent blocks to a temporary log, flushing each
+block and recording when its end marker hit the file; the reader measures
+when the matching SubeventResultEvent comes out of the follower. Idle CPU
+time is measured over a quiet period to show the cost of waiting.
+
+Usage:
+    python3 benchmarks/bench_follow_latency.py [log_file] [num_subevents] [interval_ms]
+"""
+
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.cs_utils.cs_subevent_parser import parse_cs_subevent_result
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.follow_source import FollowFileDataSource
+
+
+def _subevent_blocks(path):
+    with open(path, 'rb') as f:
+        text = f.read()
+    blocks = re.findall(rb'I: CS Subevent result received:.*?I: CS Subevent end\n', text, re.DOTALL)
+    return [b for b in blocks if parse_cs_subevent_result(b.decode()) is not None]
+
+
+def _writer(path, blocks, interval_s, sent_at):
+    end_marker = b'I: CS Subevent end\n'
+    with open(path, 'ab', buffering=0) as f:
+        for counter, block in enumerate(blocks):
+            block = re.sub(rb'Procedure counter: \d+', b'Procedure counter: %d' % counter, block)
+            f.write(block[:-len(end_marker)])
+            time.sleep(0.001)
+            # Latency is measured from the moment the end marker is written
+            sent_at[counter] = time.perf_counter()
+            f.write(end_marker)
+            time.sleep(interval_s)
+
+
+def _measure_mode(mode, blocks, interval_s, poll_interval):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ini.txt')
+        open(path, 'wb').close()
+        source = FollowFileDataSource(path, mode=mode, poll_interval=poll_interval)
+        sent_at = {}
+        received_at = {}
+
+        def _reader():
+            for event in source.read():
+                if isinstance(event, SubeventResultEvent):
+                    received_at[event.subevent.procedure_counter] = time.perf_counter()
+
+        reader = Thread(target=_reader, daemon=True)
+        reader.start()
+
+        # Idle CPU: nothing is written for one second
+        cpu_start = time.process_time()
+        time.sleep(1.0)
+        idle_cpu_ms = (time.process_time() - cpu_start) * 1e3
+
+        _writer(path, blocks, interval_s, sent_at)
+        time.sleep(0.2)
+        source.close()
+        reader.join(timeout=1.0)
+
+    latencies = [(received_at[c] - sent_at[c]) * 1e3 for c in sent_at if c in received_at]
+    return latencies, idle_cpu_ms
+
+
+def _report(name, latencies, idle_cpu_ms, expected):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:14s} received {len(latencies):4d}/{expected:<4d} "
+          f"mean {statistics.mean(latencies):6.2f} ms  p50 {statistics.median(latencies):6.2f} ms  "
+          f"p99 {p99:6.2f} ms  idle CPU {idle_cpu_ms:5.1f} ms/s")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    interval_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 13.0) / 1e3
+
+    blocks = _subevent_blocks(path)
+    blocks = (blocks * (count // len(blocks) + 1))[:count]
+
+    print(f"{count} subevents every {interval_s * 1e3:.1f} ms from {path}")
+    if sys.platform.startswith('linux'):
+        latencies, idle_cpu_ms = _measure_mode('inotify', blocks, interval_s, 0.05)
+        _report('inotify', latencies, idle_cpu_ms, count)
+    for poll_interval in (0.01, 0.05):
+        latencies, idle_cpu_ms = _measure_mode('poll', blocks, interval_s, poll_interval)
+        _report(f'poll {poll_interval * 1e3:.0f} ms', latencies, idle_cpu_ms, count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark per-line marker handling against the previous substring loop.
+
+Every line of a log is run through LogStreamParser.process_line() (status
+markers, capabilities and procedure parameters; subevent parsing excluded)
+and through the previous implementation, which tested each status marker
+and keyword with separate `in` checks on every line, hex rows included.
+
+Usage:
+    python3 benchmarks/bench_line_classifier.py [log_file] [repeat]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources.base import _STATUS_MARKERS
+from toolset.data_sources.events import StatusEvent, CapabilitiesEvent, ProcedureParamsEvent
+from toolset.data_sources.log_stream import LogStreamParser
+
+
+class LegacyLineParser:
+    """Previous process_line(): a substring loop over _STATUS_MARKERS per line."""
+
+    def __init__(self):
+        self._collecting_capabilities = False
+        self._capabilities_lines = []
+        self._connection_interval_ms = None
+        self._procedure_interval = None
+
+    def process_line(self, line):
+        for key, marker in _STATUS_MARKERS.items():
+            markers = marker if isinstance(marker, tuple) else (marker,)
+            if any(m in line for m in markers):
+                yield StatusEvent(key)
+
+        if self._collecting_capabilities:
+            if 'I:  - ' in line:
+                self._capabilities_lines.append(line.split('I:  - ', 1)[1])
+            else:
+                if self._capabilities_lines:
+                    yield CapabilitiesEvent('\n'.join(self._capabilities_lines))
+                self._collecting_capabilities = False
+                self._capabilities_lines = []
+
+        if _STATUS_MARKERS['cs_capabilities'] in line:
+            self._collecting_capabilities = True
+            self._capabilities_lines = []
+
+        if 'Connection interval:' in line:
+            m = re.search(r'Connection interval:\s*(\d+)', line)
+            if m:
+                self._connection_interval_ms = int(m.group(1))
+
+        if 'procedure interval:' in line:
+            m = re.search(r'procedure interval:\s*(\d+)', line)
+            if m:
+                self._procedure_interval = int(m.group(1))
+                if self._connection_interval_ms is not None:
+                    yield ProcedureParamsEvent(self._connection_interval_ms, self._procedure_interval)
+
+
+def _time_per_line(parser_class, lines, repeat):
+    events = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser = parser_class()
+        for line in lines:
+            for _ in parser.process_line(line):
+                events += 1
+    return (time.perf_counter() - start) / (repeat * len(lines)) * 1e9, events // repeat
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with open(path) as f:
+        lines = [line.rstrip('\r\n') for line in f]
+    hex_rows = sum(1 for line in lines if line.startswith(' '))
+
+    legacy_ns, legacy_events = _time_per_line(LegacyLineParser, lines, repeat)
+    current_ns, current_events = _time_per_line(LogStreamParser, lines, repeat)
+    assert legacy_events == current_events
+
+    print(f"{path}: {len(lines)} lines ({hex_rows} hex rows), {current_events} events, {repeat} repeats")
+    print(f"  substring loop:    {legacy_ns:6.0f} ns/line")
+    print(f"  marker automaton:  {current_ns:6.0f} ns/line ({legacy_ns / current_ns:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
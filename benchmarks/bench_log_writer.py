@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark how raw UART logging stalls the serial read loop.
+
+Feeds chunks of UART-sized data to a log sink the way UartDataSource does
+and measures time spent in the read loop per chunk: inline write+flush
+(previous behaviour) versus BackgroundLogWriter. The disk is a real file
+whose flush() additionally sleeps to emulate a slow or contended disk.
+
+Usage:
+    python3 benchmarks/bench_log_writer.py [flush_delay_ms] [chunks]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources.log_writer import BackgroundLogWriter
+
+CHUNK = (b"I:  - Procedure counter: 42\r\n" + b"  " + b"0a" * 48 + b"\r\n") * 2
+
+
+class SlowFile:
+    """Binary file whose flush() takes an extra delay."""
+
+    def __init__(self, path, delay_s):
+        self._f = open(path, 'wb')
+        self._delay_s = delay_s
+
+    def write(self, data):
+        return self._f.write(data)
+
+    def flush(self):
+        self._f.flush()
+        time.sleep(self._delay_s)
+
+    def fileno(self):
+        return self._f.fileno()
+
+    def close(self):
+        self._f.close()
+
+
+def _run(name, write, chunks, interval_s, close):
+    stalls = []
+    start = time.perf_counter()
+    for _ in range(chunks):
+        t0 = time.perf_counter()
+        write(CHUNK)
+        stalls.append(time.perf_counter() - t0)
+        # Serial data arrives at ~1 Mbaud: one chunk every interval_s
+        time.sleep(interval_s)
+    elapsed = time.perf_counter() - start
+    close()
+    stalls.sort()
+    print(f"  {name:<10} loop {elapsed:5.2f} s, per chunk mean {sum(stalls) / len(stalls) * 1e6:8.1f} us, "
+          f"p99 {stalls[int(len(stalls) * 0.99)] * 1e6:8.1f} us, max {stalls[-1] * 1e6:8.1f} us")
+
+
+def main():
+    delay_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 2.0
+    chunks = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    # Time for one chunk at 1 Mbaud (10 bits per byte)
+    interval_s = len(CHUNK) * 10 / 1_000_000
+    print(f"{chunks} chunks of {len(CHUNK)} bytes every {interval_s * 1e6:.0f} us, flush delay {delay_ms} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inline = SlowFile(os.path.join(tmp, 'inline.txt'), delay_ms / 1000)
+
+        def inline_write(data):
+            inline.write(data)
+            inline.flush()
+
+        _run('inline', inline_write, chunks, interval_s, inline.close)
+
+        writer = BackgroundLogWriter(SlowFile(os.path.join(tmp, 'bg.txt'), delay_ms / 1000))
+        _run('background', writer.write, chunks, interval_s, writer.close)
+        stats = writer.stats
+        print(f"  background: {stats.written_bytes} bytes written, {stats.dropped_bytes} dropped, "
+              f"max lag {stats.max_lag_s * 1000:.1f} ms, {stats.fsyncs} fsyncs")
+        assert os.path.getsize(os.path.join(tmp, 'bg.txt')) == os.path.getsize(os.path.join(tmp, 'inline.txt'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Measure pair emission delay of strict alternation vs merged-queue pairing.
+
+Two producer threads put the subevents of tests/ini.txt and tests/ref.txt
+at a fixed procedure period; the initiator loses one subevent early on,
+like a dropped UART frame. The delay of a pair is the time from its second
+half being put until the consumer hands it to the GUI callback. The legacy
+consumer reads the two queues in strict alternation, so after the loss
+every pair waits for the next initiator subevent.
+
+Usage:
+    python3 benchmarks/bench_pairing_latency.py [period_ms] [lost_counter]
+"""
+
+import os
+import statistics
+import sys
+import time
+from queue import Queue
+from threading import Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.processing.cs_subevent_data_consumer import (
+    INITIATOR, REFLECTOR, MergedQueueWriter, merged_stream_consumer, process_coupled_subevents,
+)
+
+
+def legacy_dual_stream_consumer(initiator_queue, reflector_queue, gui_callback):
+    """The consumer before the merged queue: blocking get() on each queue in turn."""
+    buffers = ({}, {})
+    queues = (initiator_queue, reflector_queue)
+    done = [False, False]
+    while not all(done):
+        for role in (INITIATOR, REFLECTOR):
+            if done[role]:
+                continue
+            data = queues[role].get()
+            if data is None:
+                done[role] = True
+                continue
+            counter = data.procedure_counter
+            buffers[role][counter] = data
+            if counter in buffers[1 - role]:
+                process_coupled_subevents(buffers[INITIATOR].pop(counter), buffers[REFLECTOR].pop(counter),
+                                          gui_callback)
+
+
+def _subevents(path):
+    return [e.subevent for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)]
+
+
+def _producer(subevents, queue, period_s, lost_counter, put_at, role, start):
+    for i, subevent in enumerate(subevents):
+        due = start + i * period_s
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        counter = subevent.procedure_counter
+        if role == INITIATOR and counter == lost_counter:
+            continue
+        put_at[role][counter] = time.perf_counter()
+        queue.put(subevent)
+    queue.put(None)
+
+
+def _measure(name, streams, period_s, lost_counter):
+    put_at = ({}, {})
+    emitted_at = {}
+
+    def gui_callback(initiator, reflector, *data):
+        emitted_at[initiator.procedure_counter] = time.perf_counter()
+
+    if name == 'alternating':
+        queues = Queue(maxsize=100), Queue(maxsize=100)
+        consumer = Thread(target=legacy_dual_stream_consumer, args=(*queues, gui_callback))
+    else:
+        merged_queue = Queue(maxsize=200)
+        queues = MergedQueueWriter(merged_queue, INITIATOR), MergedQueueWriter(merged_queue, REFLECTOR)
+        consumer = Thread(target=merged_stream_consumer, args=(merged_queue, gui_callback))
+
+    start = time.perf_counter() + 0.05
+    producers = [Thread(target=_producer, args=(streams[role], queues[role], period_s, lost_counter, put_at, role, start))
+                 for role in (INITIATOR, REFLECTOR)]
+    consumer.start()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    consumer.join()
+
+    delays = sorted((emitted_at[c] - max(put_at[0][c], put_at[1][c])) * 1e3 for c in emitted_at)
+    p99 = delays[min(len(delays) - 1, int(len(delays) * 0.99))]
+    print(f"  {name:12s} {len(delays):3d} pairs  mean {statistics.mean(delays):6.2f} ms  "
+          f"p50 {statistics.median(delays):6.2f} ms  p99 {p99:6.2f} ms")
+
+
+def main():
+    period_s = (float(sys.argv[1]) if len(sys.argv) > 1 else 20.0) / 1e3
+    lost_counter = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # The common counter range, so the reflector does not run on alone at the end
+    initiators = _subevents('tests/ini.txt')
+    counters = {s.procedure_counter for s in initiators}
+    reflectors = [s for s in _subevents('tests/ref.txt') if s.procedure_counter in counters]
+
+    print(f"Procedure period {period_s * 1e3:.1f} ms, initiator subevent {lost_counter} lost")
+    for name in ('alternating', 'merged'):
+        _measure(name, (initiators, reflectors), period_s, lost_counter)
+
+
+if __name__ == '__main__':
+    main()
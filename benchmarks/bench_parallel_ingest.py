@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Measure log ingest throughput of FileDataSource against the parse worker count.
+
+A long synthetic session is written by repeating the subevent blocks of a
+recorded log with increasing procedure counters, then read back sequentially
+and with 1..N worker processes.
+
+Usage:
+    python3 benchmarks/bench_parallel_ingest.py [log_file] [num_subevents] [max_workers]
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+
+_START_MARKER = 'I: CS Subevent result received:'
+_COUNTER_RE = re.compile(r'Procedure counter:\s*\d+')
+
+
+def write_synthetic_log(template_path, out_path, num_subevents):
+    """Write the template's preamble followed by num_subevents renumbered blocks."""
+    with open(template_path) as f:
+        text = f.read()
+    first = text.index(_START_MARKER)
+    blocks = [_START_MARKER + b for b in text[first:].split(_START_MARKER)[1:]]
+    with open(out_path, 'w') as out:
+        out.write(text[:first])
+        for n in range(num_subevents):
+            block = blocks[n % len(blocks)]
+            out.write(_COUNTER_RE.sub(f'Procedure counter: {n}', block, count=1))
+
+
+def _time_read(path, workers):
+    start = time.perf_counter()
+    subevents = sum(1 for e in FileDataSource(path, workers=workers).read() if isinstance(e, SubeventResultEvent))
+    return subevents, time.perf_counter() - start
+
+
+def main():
+    template = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    num_subevents = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    max_workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'session.txt')
+        write_synthetic_log(template, path, num_subevents)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{num_subevents} subevents, {size_mb:.1f} MB, {os.cpu_count()} CPUs")
+
+        count, elapsed = _time_read(path, None)
+        baseline = count / elapsed
+        print(f"  sequential:  {baseline:8.0f} subevents/s")
+        workers = 1
+        while workers <= max_workers:
+            count, elapsed = _time_read(path, workers)
+            rate = count / elapsed
+            print(f"  {workers:2d} workers:  {rate:8.0f} subevents/s ({rate / baseline:.2f}x)")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare full-queue policies of the pairing queue with a slow consumer.
+
+Two producer threads put the subevents of tests/ini.txt and tests/ref.txt
+(looped, with increasing procedure counters) at a fixed rate into a
+merged PolicyQueue; the consumer's GUI callback takes longer than a
+procedure period, so the queue fills. For each policy the producers'
+longest put() stall shows whether a UART reader would stop draining its
+port, and the age of rendered pairs shows how fresh the display is.
+
+Usage:
+    python3 benchmarks/bench_queue_policies.py [rate_hz] [consumer_ms] [seconds] [queue_size]
+"""
+
+import dataclasses
+import os
+import statistics
+import sys
+import time
+from threading import Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.pipeline import PolicyQueue, QUEUE_POLICIES
+from toolset.processing.cs_subevent_data_consumer import (
+    INITIATOR, REFLECTOR, MergedQueueWriter, merged_stream_consumer,
+)
+
+
+def _subevents(path, counters=None):
+    subevents = [e.subevent for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)]
+    return [s for s in subevents if counters is None or s.procedure_counter in counters]
+
+
+def _producer(subevents, writer, period_s, seconds, stalls, put_at):
+    start = time.perf_counter()
+    for i in range(int(seconds / period_s)):
+        delay = start + i * period_s - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        subevent = dataclasses.replace(subevents[i % len(subevents)], procedure_counter=i % 0x10000)
+        put_start = put_at[i % 0x10000] = time.perf_counter()
+        writer.put(subevent)
+        stalls.append(time.perf_counter() - put_start)
+    writer.put(None)
+
+
+def _measure(policy, streams, period_s, consumer_s, seconds, queue_size):
+    queue = PolicyQueue(maxsize=queue_size, policy=policy,
+                        key=lambda item: item[0], is_sentinel=lambda item: item[1] is None)
+    put_at = ({}, {})
+    ages = []
+
+    def gui_callback(initiator, reflector, *data):
+        # Age of a pair: time since its second half was put
+        counter = initiator.procedure_counter
+        ages.append(time.perf_counter() - max(put_at[INITIATOR][counter], put_at[REFLECTOR][counter]))
+        time.sleep(consumer_s)
+
+    stalls = ([], [])
+    consumer = Thread(target=merged_stream_consumer, args=(queue, gui_callback))
+    producers = [Thread(target=_producer,
+                        args=(streams[role], MergedQueueWriter(queue, role), period_s, seconds, stalls[role], put_at[role]))
+                 for role in (INITIATOR, REFLECTOR)]
+    consumer.start()
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+    consumer.join()
+
+    all_stalls = stalls[0] + stalls[1]
+    stats = queue.stats
+    return (f"  {policy:12s} pairs {len(ages):5d}  put stall max {max(all_stalls) * 1e3:7.1f} ms "
+            f"total {sum(all_stalls):5.1f} s  pair age p50 {statistics.median(ages) * 1e3:7.1f} ms "
+            f"max {max(ages) * 1e3:7.1f} ms  dropped {stats.dropped:5d}  coalesced {stats.coalesced:5d}")
+
+
+def main():
+    rate_hz = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
+    consumer_s = (float(sys.argv[2]) if len(sys.argv) > 2 else 15.0) / 1e3
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 3.0
+    queue_size = int(sys.argv[4]) if len(sys.argv) > 4 else 200
+
+    initiators = _subevents('tests/ini.txt')
+    reflectors = _subevents('tests/ref.txt', {s.procedure_counter for s in initiators})
+    print(f"{rate_hz:g} procedures/s, consumer {consumer_s * 1e3:g} ms per pair, {seconds:g} s, queue size {queue_size}")
+    lines = []
+    for policy in QUEUE_POLICIES:
+        # The consumer prints its summary; keep the table together
+        lines.append(_measure(policy, (initiators, reflectors), 1.0 / rate_hz, consumer_s, seconds, queue_size))
+    print('\n'.join(lines))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark per-subevent step handling: eager CSStep objects vs lazy columnar decode.
+
+Measures building a subevent from decoded step bytes plus the numeric work the
+live pipeline does for every initiator/reflector pair (phase, amplitude and
+tone quality checks).
+
+Usage:
+    python3 benchmarks/bench_step_processing.py [log_file] [repeat]
+"""
+
+import os
+import sys
+import time
+from math import atan2, log, sqrt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.cs_utils import cs_step_parser
+from toolset.cs_utils.cs_step import CSStepMode2, ToneQualityIndicator, ToneQualityIndicatorExtensionSlot
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.processing.cs_amplitude_response import _extract_channel_rssi
+from toolset.processing.cs_phase_slope import _extract_channel_phases
+from toolset.processing.sensing_features import ext_slot_emission, first_bad_tone, subevent_quality_ok
+
+_EMPTY_SLOT = ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
+_BAD_QUALITY = (ToneQualityIndicator.TONE_QUALITY_MEDIUM, ToneQualityIndicator.TONE_QUALITY_LOW)
+
+
+def _legacy_average_iq(step):
+    valid_tones = [tone for tone in step.tones if tone.quality_extension_slot != _EMPTY_SLOT]
+    if not valid_tones:
+        return 0.0, 0.0
+    count = len(valid_tones)
+    return sum(t.pct_i for t in valid_tones) / count, sum(t.pct_q for t in valid_tones) / count
+
+
+def legacy_process(raw_data, reference_power_level):
+    """Previous path: build every CSStep/ToneData object and iterate them."""
+    steps = cs_step_parser.parse_cs_steps(raw_data)
+    phases, rssi = {}, {}
+    for step in steps:
+        if not isinstance(step, CSStepMode2):
+            continue
+        avg_i, avg_q = _legacy_average_iq(step)
+        phases[step.channel] = atan2(avg_q, avg_i)
+        mag = sqrt(avg_i ** 2 + avg_q ** 2)
+        if mag != 0:
+            rssi[step.channel] = 20 * log(mag / 2048, 10) + reference_power_level
+    quality_ok = not any(tone.quality in _BAD_QUALITY
+                         for step in steps if isinstance(step, CSStepMode2) for tone in step.tones)
+    emission = any(tone.quality_extension_slot == _EMPTY_SLOT and (tone.pct_i ** 2 + tone.pct_q ** 2) ** 0.5 > 30.0
+                   for step in steps if isinstance(step, CSStepMode2) for tone in step.tones)
+    return phases, rssi, quality_ok, emission
+
+
+def lazy_process(subevent):
+    """Current path: columnar mode-2 decode, CSStep objects never built."""
+    subevent.steps = cs_step_parser.StepStream(subevent.raw_data)
+    return (_extract_channel_phases(subevent), _extract_channel_rssi(subevent),
+            subevent_quality_ok(subevent), first_bad_tone(subevent), ext_slot_emission(subevent))
+
+
+def _time_per_subevent(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    return (time.perf_counter() - start) / (repeat * len(items)) * 1e6
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    subevents = [e.subevent for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)]
+
+    legacy_us = _time_per_subevent(lambda s: legacy_process(s.raw_data, s.reference_power_level), subevents, repeat)
+    lazy_us = _time_per_subevent(lazy_process, subevents, repeat)
+
+    print(f"{path}: {len(subevents)} subevents, {repeat} repeats (step decode + phase/amplitude/quality)")
+    print(f"  eager CSStep objects:  {legacy_us:7.1f} us/subevent")
+    print(f"  lazy columnar:         {lazy_us:7.1f} us/subevent ({legacy_us / lazy_us:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
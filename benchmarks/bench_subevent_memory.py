@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Measure memory retained per stored subevent over a long synthetic session.
+
+Subevents from a log are rebuilt from their raw step bytes (as the viewer's
+initiator/reflector history would hold them) and the traced allocation is
+divided by the number kept. Three states are reported: steps left lazy,
+steps materialized (e.g. after the steps tab showed them), and a plain list
+of eagerly parsed CSStep objects.
+
+Usage:
+    python3 benchmarks/bench_subevent_memory.py [log_file] [num_subevents]
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.cs_utils import cs_step_parser
+from toolset.cs_utils.cs_subevent_parser import SubeventHeader, build_subevent_result
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+
+
+def _header(subevent):
+    return SubeventHeader(
+        procedure_counter=subevent.procedure_counter,
+        procedure_done_status=subevent.procedure_done_status,
+        subevent_done_status=subevent.subevent_done_status,
+        procedure_abort_reason=subevent.procedure_abort_reason,
+        subevent_abort_reason=subevent.subevent_abort_reason,
+        reference_power_level=subevent.reference_power_level,
+        num_steps_reported=subevent.num_steps_reported,
+        measured_freq_offset=subevent.measured_freq_offset,
+    )
+
+
+def _bytes_per_item(build, sources, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = {}
+    for n in range(count):
+        header, raw_data = sources[n % len(sources)]
+        # Fresh copy per procedure, as each one arrives from the device
+        kept[n] = build(header, bytes(raw_data))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used / count
+
+
+def _materialized(header, raw_data):
+    subevent = build_subevent_result(header, raw_data)
+    list(subevent.steps)
+    return subevent
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    subevents = [e.subevent for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)]
+    sources = [(_header(s), s.raw_data) for s in subevents]
+    raw_bytes = sum(len(s.raw_data) for s in subevents) / len(subevents)
+    num_steps = sum(len(s.steps) for s in subevents) / len(subevents)
+
+    print(f"{path}: {count} stored subevents, avg {num_steps:.0f} steps / {raw_bytes:.0f} raw bytes each")
+    print(f"  lazy steps:          {_bytes_per_item(build_subevent_result, sources, count):8.0f} bytes/subevent")
+    print(f"  materialized steps:  {_bytes_per_item(_materialized, sources, count):8.0f} bytes/subevent")
+    print(f"  eager CSStep list:   "
+          f"{_bytes_per_item(lambda h, raw: cs_step_parser.parse_cs_steps(raw), sources, count):8.0f} bytes/subevent")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Benchmark subevent header extraction against the previous multi-regex parser.
+
+Usage:
+    python3 benchmarks/bench_subevent_parser.py [log_file] [repeat]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.cs_utils import cs_subevent
+from toolset.cs_utils.cs_subevent_parser import parse_subevent_header, decode_step_hex, _find_step_hex
+
+
+def legacy_extract_header(text_data):
+    """Previous header/hex extraction: one re.search per field plus DOTALL regex and re.sub."""
+    match = re.search(r'Procedure counter:\s*(\d+)', text_data)
+    procedure_counter = int(match.group(1))
+    match = re.search(r'Procedure done status:\s*(\d+)', text_data)
+    procedure_done_status = cs_subevent.ProcedureDoneStatus(int(match.group(1)))
+    match = re.search(r'Subevent done status:\s*(\d+)', text_data)
+    subevent_done_status = cs_subevent.SubeventDoneStatus(int(match.group(1)))
+    match = re.search(r'Procedure abort reason:\s*(\d+)', text_data)
+    procedure_abort_reason = cs_subevent.ProcedureAbortReason(int(match.group(1)))
+    match = re.search(r'Subevent abort reason:\s*(\d+)', text_data)
+    subevent_abort_reason = cs_subevent.SubeventAbortReason(int(match.group(1)))
+    match = re.search(r'Reference power level:\s*(-?\d+)', text_data)
+    reference_power_level = int(match.group(1))
+    match = re.search(r'Num steps reported:\s*(\d+)', text_data)
+    num_steps_reported = int(match.group(1))
+    match = re.search(r'Raw step data:(.+?)(?:\n\n|I: CS Subevent end|\Z)', text_data, re.DOTALL)
+    hex_data = re.sub(r'[^0-9a-fA-F]', '', match.group(1))
+    return (procedure_counter, procedure_done_status, subevent_done_status, procedure_abort_reason,
+            subevent_abort_reason, reference_power_level, num_steps_reported, hex_data, bytes.fromhex(hex_data))
+
+
+def single_pass_extract_header(text_data):
+    """Current header/hex extraction."""
+    return parse_subevent_header(text_data), decode_step_hex(_find_step_hex(text_data))
+
+
+def _subevent_blocks(path):
+    with open(path) as f:
+        text = f.read()
+    blocks = re.split(r'(?=I: CS Subevent result received:)', text)
+    return [b for b in blocks if 'CS Subevent result received:' in b and 'Raw step data:' in b]
+
+
+def _time_per_block(func, blocks, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for block in blocks:
+            func(block)
+    return (time.perf_counter() - start) / (repeat * len(blocks)) * 1e6
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    blocks = _subevent_blocks(path)
+
+    legacy_us = _time_per_block(legacy_extract_header, blocks, repeat)
+    current_us = _time_per_block(single_pass_extract_header, blocks, repeat)
+
+    print(f"{path}: {len(blocks)} subevents, {repeat} repeats (header + hex extraction, step decoding excluded)")
+    print(f"  legacy parser:       {legacy_us:7.1f} us/subevent")
+    print(f"  single-pass parser:  {current_us:7.1f} us/subevent ({legacy_us / current_us:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Measure the UART framer's work left when a subevent's end marker arrives.
+
+Each subevent block of a log is fed to UartDataSource._feed() in 256-byte
+chunks up to its end marker; the end marker line is then fed alone. The time
+of that last call is the parse latency added on top of the block's arrival.
+
+Usage:
+    python3 benchmarks/bench_uart_framing.py [log_file] [repeat]
+"""
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.uart_source import UartDataSource
+
+END_LINE = b"I: CS Subevent end\r\n"
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    text = open(path, 'rb').read().replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+    blocks = re.findall(rb'I: CS Subevent result received:.*?' + re.escape(END_LINE), text, re.S)
+
+    source = UartDataSource('unused')
+    end_latency = []
+    block_time = []
+    for _ in range(repeat):
+        for block in blocks:
+            head = block[:-len(END_LINE)]
+            start = time.perf_counter()
+            for i in range(0, len(head), 256):
+                list(source._feed(head[i:i + 256]))
+            end_start = time.perf_counter()
+            events = list(source._feed(END_LINE))
+            done = time.perf_counter()
+            if any(isinstance(e, SubeventResultEvent) for e in events):
+                end_latency.append(done - end_start)
+                block_time.append(done - start)
+
+    end_latency.sort()
+    print(f"{path}: {len(end_latency) // repeat} subevents x {repeat}")
+    print(f"  end marker -> event  mean {sum(end_latency) / len(end_latency) * 1e6:6.1f} us  "
+          f"p50 {end_latency[len(end_latency) // 2] * 1e6:6.1f} us  p99 {end_latency[int(len(end_latency) * 0.99)] * 1e6:6.1f} us")
+    print(f"  total per block      mean {sum(block_time) / len(block_time) * 1e6:6.1f} us")
+
+
+if __name__ == '__main__':
+    main()
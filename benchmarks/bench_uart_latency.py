@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Compare subevent latency of UART read modes using a pty-backed fake serial port.
+
+A writer thread replays subevent blocks from a log into the pty master and
+records when each block's end marker was written; the reader measures when the
+matching SubeventResultEvent comes out of UartDataSource.read(). Idle CPU time
+is measured over a quiet period to show wakeup overhead.
+
+Usage:
+    python3 benchmarks/bench_uart_latency.py [log_file] [num_subevents] [interval_ms]
+"""
+
+import os
+import pty
+import re
+import statistics
+import sys
+import time
+import tty
+from threading import Event, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.cs_utils.cs_subevent_parser import parse_cs_subevent_result
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.uart_source import UartDataSource, READ_MODES, read_multiplexed
+
+
+def _subevent_blocks(path):
+    with open(path, 'rb') as f:
+        text = f.read()
+    blocks = re.findall(rb'I: CS Subevent result received:.*?I: CS Subevent end\n', text, re.DOTALL)
+    return [b for b in blocks if parse_cs_subevent_result(b.decode()) is not None]
+
+
+def _open_pty():
+    master, slave = pty.openpty()
+    tty.setraw(master)
+    return master, slave, os.ttyname(slave)
+
+
+def _writer(master, blocks, interval_s, sent_at):
+    end_marker = b'I: CS Subevent end\n'
+    for counter, block in enumerate(blocks):
+        block = re.sub(rb'Procedure counter: \d+', b'Procedure counter: %d' % counter, block)
+        os.write(master, block[:-len(end_marker)])
+        time.sleep(0.001)
+        # Latency is measured from the moment the end marker is written
+        sent_at[counter] = time.perf_counter()
+        os.write(master, end_marker)
+        time.sleep(interval_s)
+
+
+def _measure_mode(read_mode, blocks, interval_s):
+    master, slave, port = _open_pty()
+    source = UartDataSource(port, read_mode=read_mode)
+    stop_event = Event()
+    source.set_stop_event(stop_event)
+    source.open()
+
+    sent_at = {}
+    received_at = {}
+
+    def _reader():
+        for event in source.read():
+            if isinstance(event, SubeventResultEvent):
+                received_at[event.subevent.procedure_counter] = time.perf_counter()
+
+    reader = Thread(target=_reader, daemon=True)
+    reader.start()
+
+    # Idle CPU: nothing is written for one second
+    cpu_start = time.process_time()
+    time.sleep(1.0)
+    idle_cpu_ms = (time.process_time() - cpu_start) * 1e3
+
+    _writer(master, blocks, interval_s, sent_at)
+    time.sleep(0.2)
+    stop_event.set()
+    source.close()
+    reader.join(timeout=1.0)
+    os.close(master)
+    os.close(slave)
+
+    latencies = [(received_at[c] - sent_at[c]) * 1e3 for c in sent_at if c in received_at]
+    return latencies, idle_cpu_ms
+
+
+def _measure_multiplexed(blocks, interval_s):
+    """Two ports read from one thread by read_multiplexed()."""
+    ptys = [_open_pty(), _open_pty()]
+    sources = [UartDataSource(port) for _, _, port in ptys]
+    stop_event = Event()
+    sent_at = [{}, {}]
+    received_at = [{}, {}]
+
+    def _reader():
+        for source, event in read_multiplexed(sources, stop_event):
+            if isinstance(event, SubeventResultEvent):
+                received_at[sources.index(source)][event.subevent.procedure_counter] = time.perf_counter()
+
+    reader = Thread(target=_reader, daemon=True)
+    reader.start()
+
+    cpu_start = time.process_time()
+    time.sleep(1.0)
+    idle_cpu_ms = (time.process_time() - cpu_start) * 1e3
+
+    writers = [Thread(target=_writer, args=(master, blocks, interval_s, sent_at[i])) for i, (master, _, _) in enumerate(ptys)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    time.sleep(0.2)
+    stop_event.set()
+    reader.join(timeout=1.0)
+    for source in sources:
+        source.close()
+    for master, slave, _ in ptys:
+        os.close(master)
+        os.close(slave)
+
+    latencies = [(received_at[i][c] - sent_at[i][c]) * 1e3 for i in range(2) for c in sent_at[i] if c in received_at[i]]
+    return latencies, idle_cpu_ms
+
+
+def _report(name, latencies, idle_cpu_ms, expected):
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:12s} received {len(latencies):4d}/{expected:<4d} "
+          f"mean {statistics.mean(latencies):6.2f} ms  p50 {statistics.median(latencies):6.2f} ms  "
+          f"p99 {p99:6.2f} ms  idle CPU {idle_cpu_ms:5.1f} ms/s")
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'tests/ini.txt'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    interval_s = (float(sys.argv[3]) if len(sys.argv) > 3 else 13.0) / 1e3
+
+    blocks = _subevent_blocks(path)
+    blocks = (blocks * (count // len(blocks) + 1))[:count]
+
+    print(f"{count} subevents every {interval_s * 1e3:.1f} ms from {path}")
+    for read_mode in READ_MODES:
+        latencies, idle_cpu_ms = _measure_mode(read_mode, blocks, interval_s)
+        _report(read_mode, latencies, idle_cpu_ms, count)
+    latencies, idle_cpu_ms = _measure_multiplexed(blocks, interval_s)
+    _report('select x2', latencies, idle_cpu_ms, 2 * count)
+
+
+if __name__ == '__main__':
+    main()
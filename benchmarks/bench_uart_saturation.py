@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Find the saturation point of the UART path with simulated boards.
+
+Runs UartSimulator with looping logs at increasing procedure rates, reads
+both ports with UartDataSource threads the way run.py does, pairs
+subevents by procedure counter and runs process_coupled_subevents() on
+every pair (no GUI). For each offered rate, reports the delivered pair
+rate, the simulator's late procedures and the pipeline lag.
+
+Usage:
+    python3 benchmarks/bench_uart_saturation.py [baudrate] [seconds] [rate ...]
+"""
+
+import os
+import sys
+import time
+from queue import Empty, Queue
+from threading import Event, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.uart_simulator import UartSimulator
+from toolset.data_sources.uart_source import UartDataSource
+from toolset.processing.cs_subevent_data_consumer import process_coupled_subevents
+
+
+def _run(baudrate, rate_hz, seconds):
+    simulator = UartSimulator('tests/ini.txt', 'tests/ref.txt', baudrate=baudrate, rate_hz=rate_hz, loop=True)
+    simulator.start()
+    stop_event = Event()
+    sources = [UartDataSource(port) for port in simulator.ports]
+    queue = Queue()
+
+    def _reader(role, source):
+        for event in source.read():
+            if isinstance(event, SubeventResultEvent):
+                queue.put((role, time.monotonic(), event.subevent))
+
+    for source in sources:
+        source.set_stop_event(stop_event)
+        source.open()
+    readers = [Thread(target=_reader, args=(role, source), daemon=True) for role, source in enumerate(sources)]
+    for reader in readers:
+        reader.start()
+    sources[0].send(b's')
+
+    pending = ({}, {})
+    pairs = 0
+    lags = []
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        try:
+            role, received_at, subevent = queue.get(timeout=0.1)
+        except Empty:
+            continue
+        counter = subevent.procedure_counter
+        other = pending[1 - role].pop(counter, None)
+        if other is None:
+            pending[role][counter] = (received_at, subevent)
+            continue
+        pairs_in = (subevent, other[1]) if role == 0 else (other[1], subevent)
+        process_coupled_subevents(*pairs_in)
+        pairs += 1
+        lags.append(time.monotonic() - min(received_at, other[0]))
+    elapsed = time.monotonic() - start
+
+    stop_event.set()
+    for source in sources:
+        source.close()
+    simulator.close()
+    late = simulator.initiator.stats.late_procedures + simulator.reflector.stats.late_procedures
+    sent = simulator.initiator.stats.procedures_sent
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] * 1e3 if lags else float('nan')
+    return pairs / elapsed, sent / elapsed, late, queue.qsize(), p99
+
+
+def main():
+    baudrate = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    rates = [float(r) for r in sys.argv[3:]] or [10, 20, 40, 80, 160, 320, 0]
+
+    print(f"baud {baudrate or 'unlimited'}, {seconds:g} s per rate")
+    for rate in rates:
+        paired, sent, late, backlog, p99 = _run(baudrate, rate, seconds)
+        label = f"{rate:g} Hz" if rate else "max"
+        print(f"  offered {label:>8}: sent {sent:7.1f}/s  paired {paired:7.1f}/s  late {late:5d}  "
+              f"backlog {backlog:5d}  pair lag p99 {p99:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
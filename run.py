@@ -1,18 +1,50 @@
 #!/usr/bin/env python3
 
 import argparse
+import dataclasses
 import os
 import signal
 import time
 from datetime import datetime
-from queue import Queue
 from threading import Thread, Event
 
-from toolset.data_sources import FileDataSource
-from toolset.data_sources.uart_source import UartDataSource
-from toolset.pipeline import producer_worker
-from toolset.processing.cs_subevent_data_consumer import dual_stream_consumer
+from toolset.data_sources import FileDataSource, BinaryDataSource, ParseCache
+from toolset.data_sources.binary_capture import is_binary_capture, CAPTURE_SUFFIX
+from toolset.data_sources.parse_cache import DEFAULT_CACHE_DIR
+from toolset.data_sources.paced_source import PacedDataSource, ReplayClock
+from toolset.data_sources.follow_source import FollowFileDataSource
+from toolset.data_sources.compression import COMPRESSIONS
+from toolset.data_sources.uart_source import UartDataSource, READ_MODES
+from toolset.pipeline import (
+    producer_worker, multiplexed_producer_worker, EstimatorStage, PolicyQueue, QUEUE_POLICIES, parse_queue_policies,
+)
+from toolset.processing.cs_subevent_data_consumer import (
+    DEFAULT_ORPHAN_AGE_S, DEFAULT_PAIRING_WINDOW, INITIATOR, REFLECTOR, MergedQueueWriter, PairingEngine,
+    merged_stream_consumer,
+)
 from toolset.gui.cs_viewer import launch_viewer
+from toolset.stats import STATS, DEFAULT_STATS_INTERVAL_S, StatsDumper
+
+# Pipeline queues whose full-queue policy --queue-policy selects
+QUEUE_STAGES = ('pairing', 'estimator')
+
+
+def _log_file_source(path, counter_range, seek_counter, parse_workers=None, parse_cache=None):
+    """Return a data source for a text log or binary capture file."""
+    if is_binary_capture(path):
+        return BinaryDataSource(path, counter_range=counter_range, seek_counter=seek_counter)
+    return FileDataSource(path, counter_range=counter_range, seek_counter=seek_counter,
+                          workers=parse_workers, cache=parse_cache)
+
+
+def _print_queue_stats(stage, queue):
+    stats = queue.stats
+    print(f"Queue {stage} ({queue.policy}): {stats.delivered}/{stats.put} delivered, {stats.dropped} dropped, "
+          f"{stats.coalesced} coalesced, {stats.blocked} blocked puts ({stats.blocked_s:.2f} s), max depth {stats.max_depth}")
+
+
+def _queue_gauge(queue):
+    return lambda: {'depth': queue.qsize(), **dataclasses.asdict(queue.stats)}
 
 
 def main():
@@ -23,13 +55,13 @@ def main():
     parser.add_argument(
         '-i', '--initiator',
         required=True,
-        help='Path to initiator log file or COM-port (e.g., /dev/ttyACM1)'
+        help='Path to initiator log file, binary capture or COM-port (e.g., /dev/ttyACM1)'
     )
 
     parser.add_argument(
         '-r', '--reflector',
         required=True,
-        help='Path to reflector log file or COM-port (e.g., /dev/ttyACM3)'
+        help='Path to reflector log file, binary capture or COM-port (e.g., /dev/ttyACM3)'
     )
 
     parser.add_argument(
@@ -44,6 +76,150 @@ def main():
         help='Write raw UART data to log files in log/ folder'
     )
 
+    parser.add_argument(
+        '--log-compress',
+        choices=COMPRESSIONS,
+        default=None,
+        help='Compress --log-uart log files with gzip, bzip2 or xz'
+    )
+
+    parser.add_argument(
+        '--log-binary',
+        action='store_true',
+        help='Record parsed UART data to compact binary capture files (.cscap) in log/ folder'
+    )
+
+    parser.add_argument(
+        '--uart-read-mode',
+        choices=READ_MODES,
+        default='blocking',
+        help="How COM-ports are read: 'blocking' reads with a timeout (default), "
+             "'select' waits on both ports from one thread (POSIX only), "
+             "'poll' checks for data every 10 ms"
+    )
+
+    parser.add_argument(
+        '--seek',
+        metavar='COUNTER',
+        type=int,
+        default=None,
+        help='Start log file replay at this procedure counter (uses a byte-offset index)'
+    )
+
+    parser.add_argument(
+        '--counter-range',
+        metavar='FIRST:LAST',
+        default=None,
+        help='Only replay log file subevents with procedure counters in this inclusive range'
+    )
+
+    parser.add_argument(
+        '--parse-workers',
+        metavar='N',
+        type=int,
+        default=None,
+        help='Parse each text log file in N worker processes (full replays only)'
+    )
+
+    parser.add_argument(
+        '--parse-cache',
+        metavar='DIR',
+        nargs='?',
+        const=DEFAULT_CACHE_DIR,
+        default=None,
+        help=f'Cache parsed text logs and replay unchanged logs from the cache (default DIR: {DEFAULT_CACHE_DIR})'
+    )
+
+    parser.add_argument(
+        '--parse-cache-limit',
+        metavar='MB',
+        type=int,
+        default=512,
+        help='Evict least recently used parse cache entries above this total size (default: 512)'
+    )
+
+    parser.add_argument(
+        '--follow',
+        action='store_true',
+        help='Follow text log files that are still being written (like tail -f)'
+    )
+
+    parser.add_argument(
+        '--replay-speed',
+        metavar='FACTOR',
+        type=float,
+        default=None,
+        help='Replay log files in real time scaled by FACTOR (1 = as recorded, 10 = ten times faster, '
+             '0 = unthrottled). Pacing uses the logged procedure parameters or --replay-rate'
+    )
+
+    parser.add_argument(
+        '--replay-rate',
+        metavar='HZ',
+        type=float,
+        default=None,
+        help='Procedures per second for paced replay, overriding the logged procedure parameters'
+    )
+
+    parser.add_argument(
+        '--pairing-window',
+        metavar='COUNTERS',
+        type=int,
+        default=None,
+        help='Drop unpaired subevents once procedure counters moved on by more than this '
+             f'(default: {DEFAULT_PAIRING_WINDOW} with --uart, no limit when replaying files)'
+    )
+
+    parser.add_argument(
+        '--orphan-timeout',
+        metavar='SECONDS',
+        type=float,
+        default=None,
+        help='Drop unpaired subevents after waiting this long for their other half '
+             f'(default: {DEFAULT_ORPHAN_AGE_S:g} with --uart, no limit when replaying files)'
+    )
+
+    parser.add_argument(
+        '--estimator-workers',
+        metavar='N',
+        type=int,
+        default=None,
+        help='Compute phase slope, amplitude response, IFFT and MUSIC of every coupled pair in N worker processes '
+             'instead of on the consumer and GUI threads'
+    )
+
+    parser.add_argument(
+        '--queue-policy',
+        metavar='[STAGE=]POLICY',
+        action='append',
+        default=[],
+        help=f"What a full pipeline queue does with new data: {', '.join(QUEUE_POLICIES)} "
+             f"(default: block). Without STAGE it applies to every stage ({', '.join(QUEUE_STAGES)}); "
+             "may be repeated. Dropping or coalescing keeps the UART readers draining when processing falls behind; "
+             "coalesce replaces the oldest queued item of the same stream"
+    )
+
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        help='Print pipeline statistics (throughput, queue depths, stage latencies) periodically and on exit'
+    )
+
+    parser.add_argument(
+        '--stats-file',
+        metavar='FILE',
+        default=None,
+        help='Append pipeline statistics to FILE as JSON lines'
+    )
+
+    parser.add_argument(
+        '--stats-interval',
+        metavar='SECONDS',
+        type=float,
+        default=DEFAULT_STATS_INTERVAL_S,
+        help=f'Seconds between statistics snapshots (default: {DEFAULT_STATS_INTERVAL_S:g})'
+    )
+
     parser.add_argument(
         '--ml',
         action='store_true',
@@ -77,33 +253,101 @@ def main():
     # Validate arguments
     if args.log_uart and not args.uart:
         parser.error("--log-uart can only be used with --uart")
+    if args.log_compress and not args.log_uart:
+        parser.error("--log-compress requires --log-uart")
+    if args.log_binary and not args.uart:
+        parser.error("--log-binary can only be used with --uart")
     if args.ml and not args.uart:
         parser.error("--ml requires --uart")
     if args.ml_handler and not args.ml:
         parser.error("--ml-handler requires --ml")
-
-    # Create separate queues for each stream
-    initiator_queue = Queue(maxsize=100)
-    reflector_queue = Queue(maxsize=100)
+    if args.uart and (args.seek is not None or args.counter_range):
+        parser.error("--seek and --counter-range can only be used with log files")
+    if args.parse_workers is not None:
+        if args.uart:
+            parser.error("--parse-workers can only be used with log files")
+        if args.parse_workers < 1:
+            parser.error("--parse-workers must be at least 1")
+    if args.parse_cache and args.uart:
+        parser.error("--parse-cache can only be used with log files")
+    if args.stats_interval <= 0:
+        parser.error("--stats-interval must be positive")
+    if args.estimator_workers is not None and args.estimator_workers < 1:
+        parser.error("--estimator-workers must be at least 1")
+    if args.uart and (args.replay_speed is not None or args.replay_rate is not None):
+        parser.error("--replay-speed and --replay-rate can only be used with log files")
+    if args.follow:
+        if args.uart:
+            parser.error("--follow can only be used with log files")
+        if (args.seek is not None or args.counter_range or args.parse_workers is not None
+                or args.parse_cache or args.replay_speed is not None or args.replay_rate is not None):
+            parser.error("--follow cannot be combined with --seek, --counter-range, --parse-workers, "
+                         "--parse-cache, --replay-speed or --replay-rate")
+    if args.replay_speed is not None and args.replay_speed < 0:
+        parser.error("--replay-speed must not be negative")
+    if args.replay_rate is not None and args.replay_rate <= 0:
+        parser.error("--replay-rate must be positive")
+
+    try:
+        # Live data (UART, or a log being recorded) is bounded; replayed files may run far
+        # apart without losing data, so they pair without limits
+        if args.uart or args.follow:
+            pairing_engine = PairingEngine(
+                window=args.pairing_window if args.pairing_window is not None else DEFAULT_PAIRING_WINDOW,
+                max_age_s=args.orphan_timeout if args.orphan_timeout is not None else DEFAULT_ORPHAN_AGE_S)
+        else:
+            pairing_engine = PairingEngine(window=args.pairing_window, max_age_s=args.orphan_timeout)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        queue_policies = parse_queue_policies(args.queue_policy, QUEUE_STAGES)
+    except ValueError as e:
+        parser.error(str(e))
+
+    counter_range = None
+    if args.counter_range:
+        try:
+            first, last = args.counter_range.split(':')
+            counter_range = (int(first), int(last))
+        except ValueError:
+            parser.error("--counter-range expects FIRST:LAST, e.g. 100:200")
+
+    # One merged queue for both streams, so the consumer pairs subevents in arrival order.
+    # Items are (role, subevent, arrival time); once full, coalescing replaces the oldest subevent of the same role
+    merged_queue = PolicyQueue(maxsize=200, policy=queue_policies['pairing'],
+                               key=lambda item: item[0], is_sentinel=lambda item: item[1] is None)
+    initiator_queue = MergedQueueWriter(merged_queue, INITIATOR)
+    reflector_queue = MergedQueueWriter(merged_queue, REFLECTOR)
     stop_event = Event()
 
     # Setup raw logging if requested
     initiator_log_file = None
     reflector_log_file = None
+    initiator_capture_file = None
+    reflector_capture_file = None
+    log_dir = 'log'
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     if args.log_uart:
-        log_dir = 'log'
         os.makedirs(log_dir, exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        initiator_log_file = os.path.join(log_dir, f'{timestamp}_initiator.txt')
-        reflector_log_file = os.path.join(log_dir, f'{timestamp}_reflector.txt')
+        log_suffix = f'.txt.{args.log_compress}' if args.log_compress else '.txt'
+        initiator_log_file = os.path.join(log_dir, f'{timestamp}_initiator{log_suffix}')
+        reflector_log_file = os.path.join(log_dir, f'{timestamp}_reflector{log_suffix}')
         print(f"Raw logging enabled:")
         print(f"  Initiator: {initiator_log_file}")
         print(f"  Reflector: {reflector_log_file}")
+    if args.log_binary:
+        os.makedirs(log_dir, exist_ok=True)
+        initiator_capture_file = os.path.join(log_dir, f'{timestamp}_initiator{CAPTURE_SUFFIX}')
+        reflector_capture_file = os.path.join(log_dir, f'{timestamp}_reflector{CAPTURE_SUFFIX}')
+        print("Binary capture enabled:")
+        print(f"  Initiator: {initiator_capture_file}")
+        print(f"  Reflector: {reflector_capture_file}")
 
     if args.uart:
         print("Mode: Reading from COM-ports")
-        initiator_source = UartDataSource(args.initiator, baudrate=1000000)
-        reflector_source = UartDataSource(args.reflector, baudrate=1000000)
+        initiator_source = UartDataSource(args.initiator, baudrate=1000000, read_mode=args.uart_read_mode)
+        reflector_source = UartDataSource(args.reflector, baudrate=1000000, read_mode=args.uart_read_mode)
 
         initiator_source.set_stop_event(stop_event)
         reflector_source.set_stop_event(stop_event)
@@ -120,16 +364,37 @@ def main():
         reflector_source.flush_input()
         print("Buffers flushed.")
 
-        initiator_source.enable_logging(initiator_log_file)
-        reflector_source.enable_logging(reflector_log_file)
+        initiator_source.enable_logging(initiator_log_file, args.log_compress)
+        reflector_source.enable_logging(reflector_log_file, args.log_compress)
+        initiator_source.enable_binary_logging(initiator_capture_file)
+        reflector_source.enable_binary_logging(reflector_capture_file)
 
         print("Sending start command to initiator...")
         initiator_source.send(b's')
 
+    elif args.follow:
+        print("Mode: Following log files")
+        initiator_source = FollowFileDataSource(args.initiator)
+        reflector_source = FollowFileDataSource(args.reflector)
+        initiator_source.set_stop_event(stop_event)
+        reflector_source.set_stop_event(stop_event)
+
     else:
         print("Mode: Reading from log files")
-        initiator_source = FileDataSource(args.initiator)
-        reflector_source = FileDataSource(args.reflector)
+        parse_cache = None
+        if args.parse_cache:
+            parse_cache = ParseCache(args.parse_cache, max_bytes=args.parse_cache_limit * 1024 * 1024)
+        initiator_source = _log_file_source(args.initiator, counter_range, args.seek, args.parse_workers, parse_cache)
+        reflector_source = _log_file_source(args.reflector, counter_range, args.seek, args.parse_workers, parse_cache)
+
+        replay_speed = args.replay_speed
+        if replay_speed is None and args.replay_rate is not None:
+            replay_speed = 1.0
+        if replay_speed:
+            clock = ReplayClock(speed=replay_speed, rate_hz=args.replay_rate, stop_event=stop_event)
+            initiator_source = PacedDataSource(initiator_source, clock)
+            reflector_source = PacedDataSource(reflector_source, clock)
+            print(f"Paced replay at {replay_speed:g}x")
 
     def shutdown():
         """Signal all threads to stop and close open data sources."""
@@ -145,40 +410,90 @@ def main():
 
     signal.signal(signal.SIGINT, _sigint_handler)
 
-    initiator_producer = Thread(
-        target=producer_worker,
-        args=(initiator_source, initiator_queue, stop_event),
-        kwargs={
-            'status_callback': viewer.update_connection_status,
-            'capabilities_callback': viewer.update_capabilities_text,
-            'procedure_params_callback': viewer.update_procedure_params,
-        },
-        name="InitiatorProducer",
-        daemon=True,
-    )
-
-    reflector_producer = Thread(
-        target=producer_worker,
-        args=(reflector_source, reflector_queue, stop_event),
-        name="ReflectorProducer",
-        daemon=True,
-    )
+    initiator_callbacks = {
+        'status_callback': viewer.update_connection_status,
+        'capabilities_callback': viewer.update_capabilities_text,
+        'procedure_params_callback': viewer.update_procedure_params,
+    }
+
+    if args.uart and args.uart_read_mode == 'select':
+        # One thread waits on both COM-ports
+        producers = [Thread(
+            target=multiplexed_producer_worker,
+            args=([
+                (initiator_source, initiator_queue, initiator_callbacks),
+                (reflector_source, reflector_queue, {}),
+            ], stop_event),
+            name="UartProducer",
+            daemon=True,
+        )]
+    else:
+        initiator_producer = Thread(
+            target=producer_worker,
+            args=(initiator_source, initiator_queue, stop_event),
+            kwargs=initiator_callbacks,
+            name="InitiatorProducer",
+            daemon=True,
+        )
+
+        reflector_producer = Thread(
+            target=producer_worker,
+            args=(reflector_source, reflector_queue, stop_event),
+            name="ReflectorProducer",
+            daemon=True,
+        )
+        producers = [initiator_producer, reflector_producer]
+
+    estimator_stage = None
+    pair_handler = None
+    if args.estimator_workers:
+        estimator_stage = EstimatorStage(viewer.update_live_data, args.estimator_workers,
+                                         policy=queue_policies['estimator'])
+        pair_handler = estimator_stage.submit
+        print(f"Estimators running in {args.estimator_workers} worker processes")
 
     consumer = Thread(
-        target=dual_stream_consumer,
-        args=(initiator_queue, reflector_queue, viewer.update_live_data),
+        target=merged_stream_consumer,
+        args=(merged_queue, viewer.update_live_data, pairing_engine, pair_handler),
         name="Consumer",
         daemon=True,
     )
 
+    stats_dumper = None
+    if args.stats or args.stats_file:
+        STATS.gauge('queue.pairing', _queue_gauge(merged_queue))
+        if estimator_stage is not None:
+            STATS.gauge('queue.estimator', _queue_gauge(estimator_stage.pending))
+        for role, source in (('initiator', initiator_source), ('reflector', reflector_source)):
+            # Writer stats are captured now; close() drops the source's reference to the writers
+            capture_writer = getattr(source, 'capture_writer', None)
+            writers = (('log_writer', getattr(source, 'log_writer', None)),
+                       ('capture_writer', capture_writer.log_writer if capture_writer else None))
+            for name, writer in writers:
+                if writer is not None:
+                    STATS.gauge(f'uart.{role}.{name}', lambda stats=writer.stats: dataclasses.asdict(stats))
+        try:
+            stats_handle = open(args.stats_file, 'a') if args.stats_file else None
+        except OSError as e:
+            parser.error(f"Cannot open --stats-file: {e}")
+        stats_dumper = StatsDumper(STATS, stats_handle, args.stats_interval, echo=args.stats)
+
     print("Starting data processing pipeline...")
-    initiator_producer.start()
-    reflector_producer.start()
+    for producer in producers:
+        producer.start()
     consumer.start()
 
     viewer.run()
 
     shutdown()
+    _print_queue_stats('pairing', merged_queue)
+    if estimator_stage is not None:
+        # The consumer stops submitting once the producers' sentinels arrive
+        consumer.join(timeout=1.0)
+        estimator_stage.close(wait=False)
+        _print_queue_stats('estimator', estimator_stage.pending)
+    if stats_dumper is not None:
+        stats_dumper.close()
     print("\nProcessing complete!")
 
 
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from toolset.data_sources import BinaryDataSource, FileDataSource
+from toolset.data_sources.base import _AREAD_QUEUE_SIZE, DataSource
+from toolset.data_sources.binary_capture import convert_text_log
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.pipeline import run_async_pipeline
+
+
+async def _collect(source, limit=None):
+    events = []
+    async for event in source.aread():
+        events.append(event)
+        if limit is not None and len(events) == limit:
+            break
+    return events
+
+
+class TestAsyncRead:
+    """Tests for the async iterator counterpart of DataSource.read()."""
+
+    def test_file_source(self):
+        """Test that aread() yields exactly the events of read()."""
+        events = asyncio.run(_collect(FileDataSource('tests/ini.txt')))
+        assert events == list(FileDataSource('tests/ini.txt').read())
+
+    def test_file_source_parses_off_the_loop(self, monkeypatch):
+        """Test that the log is parsed in a helper thread, not on the event loop."""
+        read = FileDataSource.read
+        threads = set()
+
+        def _read(self):
+            threads.add(threading.current_thread())
+            yield from read(self)
+
+        monkeypatch.setattr(FileDataSource, 'read', _read)
+        assert asyncio.run(_collect(FileDataSource('tests/ini.txt'), limit=3))
+        assert threading.main_thread() not in threads
+
+    def test_threaded_default(self, tmp_path):
+        """Test the thread-backed default aread(), including stopping early."""
+        capture = str(tmp_path / 'ini.cscap')
+        convert_text_log('tests/ini.txt', capture)
+        expected = list(BinaryDataSource(capture).read())
+
+        assert asyncio.run(_collect(BinaryDataSource(capture))) == expected
+        threads = threading.active_count()
+        assert asyncio.run(_collect(BinaryDataSource(capture), limit=3)) == expected[:3]
+        # The helper thread notices the consumer left and exits
+        deadline = time.monotonic() + 1.0
+        while threading.active_count() > threads and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert threading.active_count() <= threads
+
+    def test_threaded_default_stopped_loop(self):
+        """Test that the helper thread exits when the loop stops while it waits on a full queue."""
+
+        class _Source(DataSource):
+            def read(self):
+                yield from range(10 * _AREAD_QUEUE_SIZE)
+
+            def close(self):
+                pass
+
+        loop = asyncio.new_event_loop()
+        events = _Source().aread()
+        try:
+            assert loop.run_until_complete(events.__anext__()) == 0
+            # The loop is stopped, so the queue fills up and is never drained
+            deadline = time.monotonic() + 2.0
+            while any(t.name == '_Source-aread' for t in threading.enumerate()) and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert not any(t.name == '_Source-aread' for t in threading.enumerate())
+        finally:
+            loop.run_until_complete(events.aclose())
+            loop.close()
+
+    def test_uart_source(self):
+        """Test that a serial port is read from the event loop, without helper threads."""
+        pytest.importorskip('termios')
+        from toolset.data_sources.uart_simulator import UartSimulator
+        from toolset.data_sources.uart_source import UartDataSource
+
+        simulator = UartSimulator('tests/ini.txt', 'tests/ref.txt', baudrate=0, rate_hz=0)
+        simulator.start()
+        source = UartDataSource(simulator.initiator.port)
+        expected = [e.subevent.procedure_counter for e in FileDataSource('tests/ini.txt').read()
+                    if isinstance(e, SubeventResultEvent)][:-1]
+
+        async def _read():
+            source.open()
+            source.send(b's')
+            counters = []
+            threads = threading.active_count()
+            async for event in source.aread():
+                assert threading.active_count() == threads
+                if isinstance(event, SubeventResultEvent):
+                    counters.append(event.subevent.procedure_counter)
+                    if len(counters) == len(expected):
+                        break
+            return counters
+
+        try:
+            assert asyncio.run(asyncio.wait_for(_read(), 10.0)) == expected
+        finally:
+            source.close()
+            simulator.close()
+
+
+class TestAsyncPipeline:
+    """Tests for running many source pairs on one event loop."""
+
+    def test_pairs_multiplexed(self):
+        """Test that every pair's subevents are coupled by procedure counter."""
+        coupled = {}
+
+        def _callback(index, initiator, reflector, phase_slope_data, amplitude_response_data):
+            assert initiator.procedure_counter == reflector.procedure_counter
+            coupled.setdefault(index, []).append(initiator.procedure_counter)
+
+        pairs = [(FileDataSource('tests/ini.txt'), FileDataSource('tests/ref.txt')) for _ in range(3)]
+        asyncio.run(run_async_pipeline(pairs, _callback))
+
+        expected = [e.subevent.procedure_counter for e in FileDataSource('tests/ini.txt').read()
+                    if isinstance(e, SubeventResultEvent)]
+        assert sorted(coupled) == [0, 1, 2]
+        assert all(coupled[index] == expected for index in coupled)
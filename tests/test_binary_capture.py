@@ -0,0 +1,81 @@
+import pytest
+
+from toolset.data_sources import FileDataSource, BinaryDataSource, BinaryCaptureWriter
+from toolset.data_sources.binary_capture import convert_text_log, is_binary_capture
+from toolset.data_sources.events import StatusEvent, SubeventResultEvent, ProcedureParamsEvent
+
+
+class TestBinaryCapture:
+    """Tests for the binary capture format."""
+
+    def test_convert_round_trip(self, tmp_path):
+        """Test that a converted text log replays the same events."""
+        capture = str(tmp_path / 'ini.cscap')
+        convert_text_log('tests/ini.txt', capture)
+        assert is_binary_capture(capture)
+        assert not is_binary_capture('tests/ini.txt')
+
+        text_events = list(FileDataSource('tests/ini.txt').read())
+        binary_events = list(BinaryDataSource(capture).read())
+        assert len(binary_events) == len(text_events)
+        for text_event, binary_event in zip(text_events, binary_events):
+            assert type(text_event) is type(binary_event)
+            if isinstance(text_event, SubeventResultEvent):
+                assert binary_event.subevent.raw_data == text_event.subevent.raw_data
+                assert binary_event.subevent.steps == text_event.subevent.steps
+                assert binary_event.subevent.procedure_counter == text_event.subevent.procedure_counter
+                assert binary_event.subevent.procedure_done_status == text_event.subevent.procedure_done_status
+                assert binary_event.subevent.reference_power_level == text_event.subevent.reference_power_level
+            else:
+                assert binary_event == text_event
+
+    def test_append_and_truncated_record(self, tmp_path):
+        """Test that captures can be appended to and tolerate a cut-off last record."""
+        capture = tmp_path / 'append.cscap'
+        writer = BinaryCaptureWriter(str(capture))
+        writer.write_event(StatusEvent('connection'))
+        writer.close()
+
+        writer = BinaryCaptureWriter(str(capture))
+        writer.write_event(ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10))
+        writer.close()
+
+        data = capture.read_bytes()
+        capture.write_bytes(data + data[-5:])  # partial record header + payload
+        events = list(BinaryDataSource(str(capture)).read())
+        assert events == [StatusEvent('connection'), ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10)]
+
+    @pytest.mark.parametrize('background', [False, True])
+    def test_append_after_truncated_record(self, tmp_path, background):
+        """Test that appending to a capture cut off mid-record drops the partial record and keeps new ones."""
+        capture = tmp_path / 'resumed.cscap'
+        convert_text_log('tests/ini.txt', str(capture))
+        recorded = list(BinaryDataSource(str(capture)).read())
+        data = capture.read_bytes()
+        capture.write_bytes(data[:-7])
+
+        writer = BinaryCaptureWriter(str(capture), background=background)
+        writer.write_event(ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10))
+        writer.write_event(StatusEvent('connection'))
+        writer.close()
+
+        events = list(BinaryDataSource(str(capture)).read())
+        assert len(events) == len(recorded) + 1
+        assert events[:len(recorded) - 1] == recorded[:-1]
+        assert events[-2:] == [ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10),
+                               StatusEvent('connection')]
+
+    def test_refuses_to_append_to_other_files(self, tmp_path):
+        """Test that a file that is not a capture is left alone rather than appended to."""
+        other = tmp_path / 'notes.cscap'
+        other.write_bytes(b'not a capture file')
+        with pytest.raises(ValueError):
+            BinaryCaptureWriter(str(other))
+        assert other.read_bytes() == b'not a capture file'
+
+    def test_counter_range(self, tmp_path):
+        """Test that subevents can be filtered by procedure counter."""
+        capture = str(tmp_path / 'ini.cscap')
+        convert_text_log('tests/ini.txt', capture)
+        events = BinaryDataSource(capture, counter_range=(5, 7)).read()
+        assert [e.subevent.procedure_counter for e in events if isinstance(e, SubeventResultEvent)] == [5, 6, 7]
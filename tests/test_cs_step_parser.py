@@ -1,4 +1,9 @@
+import pickle
+
+import pytest
+
 from toolset.cs_utils import cs_step_parser, cs_step
+from toolset.cs_utils.cs_subevent import SubeventResults
 
 
 class TestParseCSSteps:
@@ -170,3 +175,148 @@ class TestParseCSSteps:
         assert step.tones[1].quality_extension_slot == cs_step.ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
         assert "Invalid mode 4" in caplog.text
 
+    def test_bytes_input_matches_hex(self):
+        """Test raw bytes and memoryview input parse like the hex form."""
+        hex_input = "00050300ce01" + "02080900ff078000ff0f0012"
+        raw = bytes.fromhex(hex_input)
+        expected, expected_ranges = cs_step_parser.parse_cs_steps_with_ranges(hex_input)
+        for data in (raw, memoryview(raw)):
+            steps, ranges = cs_step_parser.parse_cs_steps_with_ranges(data)
+            assert steps == expected
+            assert ranges == expected_ranges == [(0, 6), (6, 18)]
+            assert raw[ranges[1][0]] == 2
+
+
+
+class TestDecodeMode2Tones:
+    """Tests for the columnar mode-2 tone decoder."""
+
+    def test_empty_stream(self):
+        """Test decoding empty data."""
+        columns = cs_step_parser.decode_mode2_tones(b"")
+        assert len(columns) == 0
+        assert len(columns.pct_i) == 0
+
+    def test_mode2_columns(self):
+        """Test tone columns match values parsed by the object path."""
+        data = bytes.fromhex("0205090000f0ff00ff0f001202200d00b8800703b3ff06030380ff13")
+        columns = cs_step_parser.decode_mode2_tones(data)
+        assert len(columns) == 2
+        assert list(columns.step_offsets) == [0, 12]
+        assert list(columns.step_tone_starts) == [0, 2, 5]
+        assert list(columns.step_index) == [0, 0, 1, 1, 1]
+        assert list(columns.channel) == [5, 5, 32, 32, 32]
+        assert list(columns.antenna_permutation_index) == [0, 0, 0, 0, 0]
+        assert list(columns.pct_i) == [0, -1, 184, -77, 3]
+        assert list(columns.pct_q) == [-1, 0, 120, 111, -8]
+        assert list(columns.quality) == [0, 2, 3, 3, 3]
+        assert list(columns.quality_extension_slot) == [0, 1, 0, 0, 1]
+
+    def test_skips_other_modes(self, caplog):
+        """Test that non mode-2 and invalid steps are skipped."""
+        hex_input = "00050300ce01" + "040a00" + "02080900ff078000ff0f0012"
+        columns = cs_step_parser.decode_mode2_tones(bytes.fromhex(hex_input))
+        assert len(columns) == 1
+        assert list(columns.step_offsets) == [9]
+        assert list(columns.pct_i) == [2047, -1]
+        assert list(columns.pct_q) == [-2048, 0]
+        assert "Invalid mode 4" in caplog.text
+
+    def test_steps_are_built_on_request(self):
+        """Test that step objects built from columns match parse_cs_steps."""
+        hex_input = "0205090000f0ff00ff0f001202200d00b8800703b3ff06030380ff13"
+        columns = cs_step_parser.decode_mode2_tones(bytes.fromhex(hex_input))
+        assert columns.steps() == cs_step_parser.parse_cs_steps(hex_input)
+        assert columns.step(1) == cs_step_parser.parse_cs_steps(hex_input)[1]
+
+    def test_columns_from_parsed_steps(self):
+        """Test that subevents without raw data build the same columns from their steps."""
+        data = bytes.fromhex("00050300ce01" + "0205090000f0ff00ff0f001202200d00b8800703b3ff06030380ff13")
+        steps, ranges = cs_step_parser.parse_cs_steps_with_ranges(data)
+        decoded = cs_step_parser.decode_mode2_tones(data)
+        subevent = SubeventResults(1, 0, 0, 0, 0, 0, len(steps), steps)
+
+        for columns in (cs_step_parser.mode2_tones_from_steps(steps, ranges), subevent.mode2_tones()):
+            assert columns.steps() == decoded.steps()
+            for name in ('step_tone_starts', 'step_index', 'channel', 'pct_i', 'pct_q', 'quality_extension_slot'):
+                assert list(getattr(columns, name)) == list(getattr(decoded, name))
+        assert list(cs_step_parser.mode2_tones_from_steps(steps, ranges).step_offsets) == [6, 18]
+        assert [list(a) for a in subevent.mode2_tones().average_iq()] == [list(a) for a in decoded.average_iq()]
+
+
+class TestStepStream:
+    """Tests for lazily decoded step sequences."""
+
+    HEX_INPUT = "00050300ce01" + "010a0200ff" + "02080900ff078000ff0f0012" + "020809000100000005000010"
+
+    def test_steps_built_on_first_access(self):
+        """Test steps match parse_cs_steps and are only built when accessed."""
+        stream = cs_step_parser.StepStream(bytes.fromhex(self.HEX_INPUT))
+        expected, expected_ranges = cs_step_parser.parse_cs_steps_with_ranges(self.HEX_INPUT)
+        assert len(stream) == 3
+        assert stream.byte_ranges == expected_ranges
+        assert stream._steps is None
+        assert stream == expected
+        assert stream[1] is stream[1]
+        assert [step.channel for step in stream] == [5, 8, 8]
+
+    def test_index_built_incrementally(self):
+        """Test a StepIndex fed byte by byte yields the same stream as a one-shot build."""
+        data = bytes.fromhex(self.HEX_INPUT)
+        index = cs_step_parser.StepIndex()
+        for end in range(len(data) + 1):
+            index.feed(data[:end])
+        stream = cs_step_parser.StepStream(data, index.finish(data))
+        assert stream.byte_ranges == cs_step_parser.StepStream(data).byte_ranges
+        assert stream == cs_step_parser.parse_cs_steps(data)
+
+    def test_invalid_mode0_length_is_logged(self, caplog):
+        """Test a mode-0 step of invalid length is skipped and logged like parse_cs_steps()."""
+        data = bytes.fromhex("00050400ce0100" + "02080900ff078000ff0f0012")
+        stream = cs_step_parser.StepStream(data)
+        assert "Invalid Mode 0 data length: 4" in caplog.text
+        assert len(stream) == 1
+        assert stream == cs_step_parser.parse_cs_steps(data)
+
+    def test_index_raises_invalid_packet_quality_on_finish(self):
+        """Test an invalid mode-0 packet quality fails the stream like parse_cs_steps()."""
+        data = bytes.fromhex("00050307ce01")
+        index = cs_step_parser.StepIndex()
+        index.feed(data)
+        with pytest.raises(ValueError):
+            index.finish(data)
+
+    def test_average_iq_skips_empty_extension_slots(self):
+        """Test columnar I/Q averages skip TONE_EXTENSION_NOT_EXPECTED tones."""
+        stream = cs_step_parser.StepStream(bytes.fromhex(self.HEX_INPUT))
+        avg_i, avg_q = stream.mode2.average_iq()
+        assert stream.mode2.step_channels().tolist() == [8, 8]
+        assert avg_i.tolist() == [2047.0, 1.0]
+        assert avg_q.tolist() == [-2048.0, 0.0]
+
+    def test_no_valid_tones_average_to_zero(self):
+        """Test a step made only of empty extension slots averages to (0, 0)."""
+        stream = cs_step_parser.StepStream(bytes.fromhex("02080900ff0f0010ff0f0010"))
+        avg_i, avg_q = stream.mode2.average_iq()
+        assert avg_i.tolist() == [0.0]
+        assert avg_q.tolist() == [0.0]
+
+    def test_invalid_tone_quality_fails_eagerly(self):
+        """Test invalid enum values raise on construction like parse_cs_steps."""
+        hex_input = "02080900ff078004ff0f0012"
+        with pytest.raises(ValueError):
+            cs_step_parser.parse_cs_steps(hex_input)
+        with pytest.raises(ValueError):
+            cs_step_parser.StepStream(bytes.fromhex(hex_input))
+
+    def test_compact_storage(self):
+        """Test steps, tones and ranges are slotted and survive pickling."""
+        stream = cs_step_parser.StepStream(bytes.fromhex(self.HEX_INPUT))
+        assert not hasattr(stream, '__dict__')
+        assert not hasattr(stream[0], '__dict__')
+        assert not hasattr(stream[1].tones[0], '__dict__')
+        assert stream.byte_ranges[1] == (11, 23)
+        assert stream.byte_ranges[1:] == [(11, 23), (23, 35)]
+        restored = pickle.loads(pickle.dumps(stream))
+        assert restored == stream
+        assert restored.byte_ranges == stream.byte_ranges
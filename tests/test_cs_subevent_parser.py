@@ -141,3 +141,39 @@ I:  - Num steps reported: 0
 """
         result = cs_subevent_parser.parse_cs_subevent_result(text_data)
         assert result is None
+
+    def test_parse_missing_field_reports_first_missing(self, caplog):
+        """Test that the first missing mandatory header field is reported."""
+        text_data = """
+I: CS Subevent result received:
+I:  - Procedure counter: 0
+I:  - Reference power level: -16
+I: Raw step data:
+  000b0500d301327f
+"""
+        assert cs_subevent_parser.parse_cs_subevent_result(text_data) is None
+        assert "Could not find Procedure done status in text data" in caplog.text
+
+    def test_parse_header(self):
+        """Test single-pass header extraction ignores lines after raw step data."""
+        text_data = """
+I: CS Subevent result received:
+I:  - Procedure counter: 7
+I:  - ACL conn counter: 120
+I:  - Procedure done status: 0
+I:  - Subevent done status: 1
+I:  - Procedure abort reason: 0
+I:  - Subevent abort reason: 0
+I:  - Reference power level: -18
+I:  - Num antenna paths: 1
+I:  - Num steps reported: 2
+I: Raw step data:
+  000b0500d301327f
+I:  - Procedure counter: 8
+"""
+        header = cs_subevent_parser.parse_subevent_header(text_data)
+        assert header.procedure_counter == 7
+        assert header.subevent_done_status == cs_subevent.SubeventDoneStatus.SUBEVENT_PARTIAL_RESULTS_TO_FOLLOW
+        assert header.reference_power_level == -18
+        assert header.num_steps_reported == 2
+        assert header.measured_freq_offset is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.pipeline import EstimatorStage
+from toolset.processing.cs_amplitude_response import calculate_amplitude_response_data
+from toolset.processing.cs_estimators import compact_subevent, run_estimators
+from toolset.processing.cs_music import compute_music_spectrum
+from toolset.processing.cs_phase_slope import calculate_phase_slope_data
+
+
+def _subevents(path):
+    return {e.subevent.procedure_counter: e.subevent
+            for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)}
+
+
+@pytest.fixture(scope='module')
+def pairs():
+    initiators, reflectors = _subevents('tests/ini.txt'), _subevents('tests/ref.txt')
+    return [(initiators[c], reflectors[c]) for c in sorted(initiators.keys() & reflectors.keys())]
+
+
+class TestRunEstimators:
+    """Tests for processing pairs from their compact form."""
+
+    def test_matches_inline_processing(self, pairs):
+        """Test that compact pairs give the same results as processing SubeventResults."""
+        for initiator, reflector in pairs[:10]:
+            result = run_estimators(compact_subevent(initiator), compact_subevent(reflector))
+            phase_slope_data = calculate_phase_slope_data(initiator, reflector)
+            amplitude_response_data = calculate_amplitude_response_data(initiator, reflector)
+            assert result.procedure_counter == initiator.procedure_counter
+            assert result.phase_slope_data == phase_slope_data
+            assert result.amplitude_response_data == amplitude_response_data
+            _, spectrum = compute_music_spectrum(phase_slope_data, amplitude_response_data)
+            np.testing.assert_array_equal(result.estimates['music'][1], spectrum)
+            assert set(result.estimates) == {'ifft', 'music'}
+
+    def test_failing_estimator(self, pairs):
+        """Test that a failing estimator yields None without losing the others."""
+        def broken(phase_slope_data, amplitude_response_data):
+            raise ValueError("broken")
+
+        initiator, reflector = pairs[0]
+        result = run_estimators(compact_subevent(initiator), compact_subevent(reflector),
+                                {'broken': broken, 'count': lambda phase, amplitude: len(phase)})
+        assert result.estimates == {'broken': None, 'count': len(result.phase_slope_data)}
+
+
+class TestEstimatorStage:
+    """Tests for running estimators in worker processes."""
+
+    def test_results_in_order(self, pairs):
+        """Test that every submitted pair is delivered once, in submission order."""
+        delivered = []
+        stage = EstimatorStage(lambda initiator, reflector, phase, amplitude, estimates:
+                               delivered.append((initiator.procedure_counter, estimates)), workers=2)
+        for initiator, reflector in pairs:
+            stage.submit(initiator, reflector)
+        stage.close()
+
+        assert [counter for counter, _ in delivered] == [initiator.procedure_counter for initiator, _ in pairs]
+        assert all(estimates['music'][0] is not None for _, estimates in delivered)
+        assert stage.failed == 0
@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.follow_source import FollowFileDataSource
+
+
+def _follow_subevents(source, count, timeout=10.0):
+    """Collect count subevents from source in a thread, then close it."""
+    subevents = []
+
+    def _reader():
+        for event in source.read():
+            if isinstance(event, SubeventResultEvent):
+                subevents.append(event.subevent)
+                if len(subevents) == count:
+                    source.close()
+
+    reader = threading.Thread(target=_reader, daemon=True)
+    reader.start()
+    return reader, subevents
+
+
+def _append_in_pieces(path, data, piece_size=997, delay=0.001):
+    with open(path, 'ab') as f:
+        for i in range(0, len(data), piece_size):
+            f.write(data[i:i + piece_size])
+            f.flush()
+            time.sleep(delay)
+
+
+class TestFollowFileDataSource:
+    """Tests for tail-following a growing log."""
+
+    @pytest.mark.parametrize('mode', [
+        'poll',
+        pytest.param('inotify', marks=pytest.mark.skipif(not sys.platform.startswith('linux'), reason='Linux only')),
+    ])
+    def test_follows_appends(self, tmp_path, mode):
+        """Test that blocks split across appends (mid-line) are parsed like a full read."""
+        log = tmp_path / 'ini.txt'
+        expected = [e.subevent for e in FileDataSource('tests/ini.txt').read() if isinstance(e, SubeventResultEvent)]
+        # The last block has no end marker, so a follower cannot know it is complete yet
+        expected = expected[:-1]
+
+        source = FollowFileDataSource(str(log), mode=mode, poll_interval=0.01)
+        reader, subevents = _follow_subevents(source, len(expected))
+        time.sleep(0.05)
+        _append_in_pieces(log, open('tests/ini.txt', 'rb').read())
+        reader.join(timeout=10.0)
+
+        assert not reader.is_alive()
+        assert subevents == expected
+
+    def test_restarts_after_truncation(self, tmp_path):
+        """Test that a truncated and rewritten log is followed from its start."""
+        log = tmp_path / 'ini.txt'
+        text = open('tests/ini.txt', 'rb').read()
+        marker = b'I: CS Subevent result received:'
+        third_block = text.index(marker, text.index(marker, text.index(marker) + 1) + 1)
+        log.write_bytes(text[:third_block])
+
+        source = FollowFileDataSource(str(log), mode='poll', poll_interval=0.01)
+        reader, subevents = _follow_subevents(source, 4)
+        time.sleep(0.1)
+        assert [s.procedure_counter for s in subevents] == [0, 1]
+
+        with open(log, 'wb') as f:
+            f.truncate()
+        time.sleep(0.1)
+        log.write_bytes(text[:third_block])
+        reader.join(timeout=5.0)
+
+        assert not reader.is_alive()
+        assert [s.procedure_counter for s in subevents] == [0, 1, 0, 1]
+
+    def test_close_stops_waiting(self, tmp_path):
+        """Test that close() ends a read blocked on a missing file."""
+        source = FollowFileDataSource(os.path.join(tmp_path, 'missing.txt'))
+        reader, _ = _follow_subevents(source, 1)
+        time.sleep(0.05)
+        source.close()
+        reader.join(timeout=1.0)
+        assert not reader.is_alive()
@@ -0,0 +1,188 @@
+import pytest
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import StatusEvent, CapabilitiesEvent, SubeventResultEvent, ProcedureParamsEvent
+from toolset.data_sources.log_stream import LogStreamParser, find_markers, SUBEVENT_START_MARKER
+
+SUBEVENT_LINES = [
+    "I: CS Subevent result received:",
+    "I:  - Procedure counter: 3",
+    "I:  - Procedure done status: 0",
+    "I:  - Subevent done status: 0",
+    "I:  - Procedure abort reason: 0",
+    "I:  - Subevent abort reason: 0",
+    "I:  - Reference power level: -16",
+    "I:  - Num antenna paths: 1",
+    "I:  - Num steps reported: 2",
+    "I:  - Step data buffer length: 21 bytes",
+    "I: Raw step data:",
+    "  000b0500d301327f02050900d2df0400",
+    "  ff5f0012",
+    "I: CS Subevent end",
+]
+
+
+def _feed(parser, lines):
+    events = []
+    for line in lines:
+        events.extend(parser.feed_line(line))
+    return events
+
+
+class TestLogStreamParser:
+    """Tests for the line-oriented log parser."""
+
+    def test_events_in_log_order(self):
+        """Test that status, capabilities, procedure params and subevents keep log order."""
+        lines = [
+            "I: Connected to 00:11:22:33:44:55 (random) (err 0x00)",
+            "I: Connection interval: 30 ms",
+            "I: CS capability exchange completed.",
+            "I:  - Num_Config_Supported: 4",
+            "I:  - Roles_Supported: 0x03",
+            "I: CS config creation complete.",
+            "I:  - procedure interval: 10",
+        ] + SUBEVENT_LINES
+        parser = LogStreamParser()
+        events = _feed(parser, lines) + list(parser.finish())
+
+        assert events[0] == StatusEvent('connection')
+        assert events[1] == StatusEvent('cs_capabilities')
+        assert events[2] == StatusEvent('cs_config')
+        assert events[3] == CapabilitiesEvent("Num_Config_Supported: 4\nRoles_Supported: 0x03")
+        assert events[4] == ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10)
+        assert isinstance(events[5], SubeventResultEvent)
+        assert events[5].subevent.procedure_counter == 3
+        assert len(events[5].subevent.steps) == 2
+        assert len(events) == 6
+
+    def test_subevent_emitted_at_end_marker(self):
+        """Test that a subevent is yielded as soon as its end marker is seen."""
+        parser = LogStreamParser()
+        assert _feed(parser, SUBEVENT_LINES[:-1]) == []
+        events = _feed(parser, SUBEVENT_LINES[-1:])
+        assert len(events) == 1
+        assert events[0].subevent.procedure_counter == 3
+
+    def test_unterminated_subevent_flushed_on_finish(self):
+        """Test that a block without end marker is parsed at end of input."""
+        parser = LogStreamParser()
+        assert _feed(parser, SUBEVENT_LINES[:-1]) == []
+        events = list(parser.finish())
+        assert len(events) == 1
+        assert events[0].subevent.procedure_counter == 3
+
+    def test_find_markers(self):
+        """Test that markers are found in one scan and hex rows are skipped."""
+        assert find_markers(SUBEVENT_LINES[0]) == [SUBEVENT_START_MARKER]
+        assert find_markers("I: CS config creation complete.") == ["CS config creation complete"]
+        assert find_markers("I:  - Procedure counter: 3") == []
+        assert find_markers("  I: CS Subevent end") == []
+
+
+class TestFileDataSource:
+    """Tests for streaming log file reader."""
+
+    def test_read_log(self):
+        """Test that all subevents of a recorded log are read in file order."""
+        events = list(FileDataSource('tests/ini.txt').read())
+        subevents = [e.subevent for e in events if isinstance(e, SubeventResultEvent)]
+        counters = [s.procedure_counter for s in subevents]
+        assert len(subevents) == 62
+        assert counters == sorted(counters)
+        assert isinstance(events[0], StatusEvent)
+
+    def test_read_counter_range(self, tmp_path):
+        """Test that indexed replay only yields the selected subevents."""
+        log = tmp_path / 'ini.txt'
+        log.write_bytes(open('tests/ini.txt', 'rb').read())
+
+        events = list(FileDataSource(str(log), counter_range=(10, 12)).read())
+        counters = [e.subevent.procedure_counter for e in events if isinstance(e, SubeventResultEvent)]
+        assert counters == [10, 11, 12]
+        assert isinstance(events[0], StatusEvent)
+        assert (tmp_path / 'ini.txt.idx').exists()
+
+    def test_read_seek(self, tmp_path):
+        """Test that seeking matches the tail of a full replay."""
+        log = tmp_path / 'ini.txt'
+        log.write_bytes(open('tests/ini.txt', 'rb').read())
+
+        full = [e.subevent for e in FileDataSource(str(log)).read() if isinstance(e, SubeventResultEvent)]
+        seek = [e.subevent for e in FileDataSource(str(log), seek_counter=55).read() if isinstance(e, SubeventResultEvent)]
+        assert [s.procedure_counter for s in seek] == list(range(55, 64))
+        assert [s.raw_data for s in seek] == [s.raw_data for s in full if s.procedure_counter >= 55]
+
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        """Test that the sidecar index is rebuilt when the log changes."""
+        from toolset.data_sources.log_index import load_log_index
+
+        log = tmp_path / 'ini.txt'
+        text = open('tests/ini.txt', 'rb').read()
+        log.write_bytes(text)
+        assert len(load_log_index(str(log)).entries) == 64
+
+        first_block = text.index(b'I: CS Subevent result received:')
+        log.write_bytes(text[first_block:])
+        index = load_log_index(str(log))
+        assert len(index.entries) == 64
+        assert index.first_offset() == 0
+
+    def test_read_parallel(self, tmp_path, monkeypatch):
+        """Test that parallel parsing yields the same event stream as a sequential read."""
+        from toolset.data_sources import file_source
+
+        monkeypatch.setattr(file_source, 'PARALLEL_CHUNK_BYTES', 16 * 1024)
+        for name in ('ini.txt', 'ref.txt'):
+            log = tmp_path / name
+            log.write_bytes(open(f'tests/{name}', 'rb').read())
+
+            sequential = list(FileDataSource(str(log)).read())
+            parallel = list(FileDataSource(str(log), workers=2).read())
+            assert [type(e) for e in parallel] == [type(e) for e in sequential]
+            assert ([e.subevent for e in parallel if isinstance(e, SubeventResultEvent)]
+                    == [e.subevent for e in sequential if isinstance(e, SubeventResultEvent)])
+
+    @pytest.mark.parametrize('compression', [None, 'gz'])
+    def test_read_parallel_carries_connection_interval(self, tmp_path, monkeypatch, compression):
+        """Test that procedure parameters split across parse chunks survive, without writing an index."""
+        from toolset.data_sources import file_source
+        from toolset.data_sources.compression import open_log_writer
+
+        monkeypatch.setattr(file_source, 'PARALLEL_CHUNK_BYTES', 16 * 1024)
+        text = open('tests/ini.txt', 'rb').read()
+        middle = text.index(b'I: CS Subevent result received:', len(text) // 2)
+        text = (b'I: Connection interval: 30\n' + text[:middle]
+                + b'I:  - procedure interval: 5\n' + text[middle:])
+        name = 'ini.txt' + (f'.{compression}' if compression else '')
+        log = tmp_path / name
+        with open_log_writer(str(log), compression) as f:
+            f.write(text)
+
+        sequential = list(FileDataSource(str(log)).read())
+        parallel = list(FileDataSource(str(log), workers=2).read())
+        params = [e for e in sequential if isinstance(e, ProcedureParamsEvent)]
+        assert params == [ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=10),
+                          ProcedureParamsEvent(connection_interval_ms=30, procedure_interval=5)]
+        assert [e for e in parallel if isinstance(e, ProcedureParamsEvent)] == params
+        assert [type(e) for e in parallel] == [type(e) for e in sequential]
+        assert not (tmp_path / f'{name}.idx').exists()
+
+    @pytest.mark.parametrize('compression', ['gz', 'bz2', 'xz'])
+    def test_read_compressed(self, tmp_path, compression):
+        """Test that compressed logs stream like the plain log, including counter filters."""
+        from toolset.data_sources.compression import open_log_writer
+
+        log = tmp_path / f'ini.txt.{compression}'
+        with open_log_writer(str(log), compression) as f:
+            f.write(open('tests/ini.txt', 'rb').read())
+
+        plain = list(FileDataSource('tests/ini.txt').read())
+        events = list(FileDataSource(str(log)).read())
+        assert [type(e) for e in events] == [type(e) for e in plain]
+        assert ([e.subevent for e in events if isinstance(e, SubeventResultEvent)]
+                == [e.subevent for e in plain if isinstance(e, SubeventResultEvent)])
+
+        selected = FileDataSource(str(log), counter_range=(10, 12), seek_counter=11).read()
+        assert [e.subevent.procedure_counter for e in selected if isinstance(e, SubeventResultEvent)] == [11, 12]
+        assert not (tmp_path / f'ini.txt.{compression}.idx').exists()
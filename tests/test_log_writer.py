@@ -0,0 +1,60 @@
+import io
+import threading
+
+from toolset.data_sources.log_writer import BackgroundLogWriter
+
+
+class _SlowHandle(io.BytesIO):
+    """In-memory file whose writes block until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, data):
+        self.release.wait()
+        return super().write(data)
+
+    def close(self):
+        self.final = self.getvalue()
+        super().close()
+
+
+class TestBackgroundLogWriter:
+    """Tests for the raw UART log writer thread."""
+
+    def test_writes_everything_on_close(self, tmp_path):
+        """Test that all queued chunks reach the file, in order, after close()."""
+        path = tmp_path / 'raw.txt'
+        writer = BackgroundLogWriter(open(path, 'wb'), batch_bytes=64)
+        chunks = [f"line {i}\r\n".encode() for i in range(1000)]
+        for chunk in chunks:
+            assert writer.write(chunk)
+        writer.close()
+
+        assert path.read_bytes() == b''.join(chunks)
+        assert writer.stats.written_bytes == len(b''.join(chunks))
+        assert writer.stats.dropped_bytes == 0
+        assert writer.stats.pending_bytes == 0
+        assert writer.stats.fsyncs >= 1
+
+    def test_full_queue_drops_and_counts(self):
+        """Test that a stalled disk drops new chunks instead of blocking the caller."""
+        handle = _SlowHandle()
+        writer = BackgroundLogWriter(handle, max_queue_bytes=100)
+        assert writer.write(b'a' * 60)
+        assert not writer.write(b'b' * 60)
+        assert writer.stats.dropped_bytes == 60
+        assert writer.stats.dropped_chunks == 1
+
+        handle.release.set()
+        writer.close()
+        assert handle.final == b'a' * 60
+        assert writer.stats.max_lag_s > 0
+
+    def test_write_after_close_is_dropped(self, tmp_path):
+        """Test that late chunks from a reader racing close() are counted, not written."""
+        writer = BackgroundLogWriter(open(tmp_path / 'raw.txt', 'wb'))
+        writer.close()
+        assert not writer.write(b'late')
+        assert writer.stats.dropped_bytes == 4
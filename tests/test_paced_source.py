@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from toolset.data_sources import FileDataSource, PacedDataSource, ReplayClock
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.events import ProcedureParamsEvent, SubeventResultEvent
+
+
+class _ListSource(DataSource):
+    def __init__(self, events):
+        self.events = events
+
+    def read(self):
+        yield from self.events
+
+    def close(self):
+        pass
+
+
+def _subevent_events(count):
+    events = [e for e in FileDataSource('tests/ini.txt').read() if isinstance(e, SubeventResultEvent)]
+    return events[:count]
+
+
+class TestPacedDataSource:
+    """Tests for real-time paced replay."""
+
+    def test_paced_by_explicit_rate(self):
+        """Test that procedures are released one period apart."""
+        clock = ReplayClock(speed=1.0, rate_hz=100)
+        source = PacedDataSource(_ListSource(_subevent_events(6)), clock)
+
+        release_times = []
+        for _ in source.read():
+            release_times.append(time.monotonic())
+        assert len(release_times) == 6
+        assert release_times[-1] - release_times[0] >= 5 * 0.01 - 0.002
+
+    def test_speed_factor_and_procedure_params(self):
+        """Test that the period comes from procedure parameters and is scaled by speed."""
+        clock = ReplayClock(speed=10.0)
+        events = [ProcedureParamsEvent(connection_interval_ms=20, procedure_interval=5)] + _subevent_events(3)
+        start = time.monotonic()
+        assert len(list(PacedDataSource(_ListSource(events), clock).read())) == 4
+        assert clock.procedure_period_s == pytest.approx(0.1)
+        assert clock.step() == pytest.approx(0.01)
+        assert time.monotonic() - start >= 2 * 0.01 - 0.002
+
+    def test_unthrottled(self):
+        """Test that speed 0 passes events through without waiting."""
+        clock = ReplayClock(speed=0, rate_hz=0.1)
+        start = time.monotonic()
+        assert len(list(PacedDataSource(_ListSource(_subevent_events(5)), clock).read())) == 5
+        assert time.monotonic() - start < 1.0
+
+    def test_stop_event_interrupts_wait(self):
+        """Test that setting the stop event ends a paced replay promptly."""
+        stop_event = threading.Event()
+        clock = ReplayClock(speed=1.0, rate_hz=0.5, stop_event=stop_event)
+        threading.Timer(0.05, stop_event.set).start()
+
+        start = time.monotonic()
+        events = list(PacedDataSource(_ListSource(_subevent_events(5)), clock).read())
+        assert len(events) == 1
+        assert time.monotonic() - start < 1.0
+
+    def test_closing_one_source_keeps_others_running(self):
+        """Test that a source closed after its last event does not stop a longer one sharing the clock."""
+        stop_event = threading.Event()
+        clock = ReplayClock(speed=1.0, rate_hz=200, stop_event=stop_event)
+        short = PacedDataSource(_ListSource(_subevent_events(10)), clock)
+        long = PacedDataSource(_ListSource(_subevent_events(30)), clock)
+        delivered = {}
+
+        def replay(name, source):
+            delivered[name] = len(list(source.read()))
+            source.close()
+
+        threads = [threading.Thread(target=replay, args=args) for args in (('short', short), ('long', long))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5.0)
+
+        assert delivered == {'short': 10, 'long': 30}
+        assert not stop_event.is_set()
+
+    def test_close_interrupts_wait(self):
+        """Test that closing a source ends its own paced replay promptly."""
+        clock = ReplayClock(speed=1.0, rate_hz=0.5)
+        source = PacedDataSource(_ListSource(_subevent_events(5)), clock)
+        threading.Timer(0.05, source.close).start()
+
+        start = time.monotonic()
+        assert len(list(source.read())) == 1
+        assert time.monotonic() - start < 1.0
+        assert not clock.stop_event.is_set()
@@ -0,0 +1,212 @@
+import re
+from queue import Queue
+from threading import Event, Thread
+from types import SimpleNamespace
+
+import pytest
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.pipeline.workers import producer_worker
+from toolset.processing.cs_subevent_data_consumer import (
+    INITIATOR, REFLECTOR, MergedQueueWriter, PairingEngine, counter_distance, dual_stream_consumer,
+    merged_stream_consumer,
+)
+
+
+def _subevent(counter):
+    return SimpleNamespace(procedure_counter=counter)
+
+
+def _subevents(path):
+    return {e.subevent.procedure_counter: e.subevent
+            for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)}
+
+
+@pytest.fixture(scope='module')
+def subevents():
+    return _subevents('tests/ini.txt'), _subevents('tests/ref.txt')
+
+
+class TestPairingEngine:
+    """Tests for coupling subevents by procedure counter."""
+
+    def test_pairs_in_any_order(self, subevents):
+        """Test that a pair is emitted by whichever half arrives second, with its join latency."""
+        initiators, reflectors = subevents
+        engine = PairingEngine()
+
+        assert engine.add(REFLECTOR, reflectors[3], arrived_at=10.0) is None
+        assert engine.add(INITIATOR, initiators[2], arrived_at=10.5) is None
+        pair = engine.add(INITIATOR, initiators[3], arrived_at=10.25)
+        assert pair.initiator is initiators[3]
+        assert pair.reflector is reflectors[3]
+        assert pair.join_latency_s == pytest.approx(0.25)
+
+        pair = engine.add(REFLECTOR, reflectors[2], arrived_at=11.0)
+        assert pair.initiator is initiators[2]
+        assert pair.join_latency_s == pytest.approx(0.5)
+
+        stats = engine.join_latency
+        assert stats.pairs == 2
+        assert stats.mean_s == pytest.approx(0.375)
+        assert stats.max_s == pytest.approx(0.5)
+        assert engine.buffers == ({}, {})
+
+    def test_counter_wraparound(self):
+        """Test pairing across the 16-bit counter wrap and eviction of the stale counter."""
+        assert counter_distance(2, 0xFFFE) == 4
+        assert counter_distance(0xFFFE, 2) == -4
+
+        engine = PairingEngine(window=8, max_age_s=None)
+        stale = _subevent(3)
+        assert engine.add(REFLECTOR, stale, arrived_at=0.0) is None
+        for counter in list(range(4, 0x10000)) + [0, 1, 2, 3]:
+            assert engine.add(INITIATOR, _subevent(counter), arrived_at=1.0) is None
+            pair = engine.add(REFLECTOR, _subevent(counter), arrived_at=1.0)
+            assert pair is not None and pair.initiator.procedure_counter == counter
+            # Counter 3 after the wrap pairs with the new reflector subevent, not the stale one
+            assert pair.reflector is not stale
+
+        assert engine.stats.evicted_by_window == 1
+        assert engine.stats.orphaned == [0, 1]
+        assert engine.buffers == ({}, {})
+
+    def test_bounded_buffers(self):
+        """Test that one side dropping subevents leaves the buffers at constant size."""
+        engine = PairingEngine(window=16, max_age_s=None)
+        for counter in range(10000):
+            engine.add(INITIATOR, _subevent(counter % 0x10000), arrived_at=float(counter))
+            if counter % 2:
+                engine.add(REFLECTOR, _subevent(counter), arrived_at=float(counter))
+            assert len(engine.buffers[INITIATOR]) <= 17
+
+        stats = engine.stats
+        assert engine.join_latency.pairs == 5000
+        assert stats.evicted_by_window + len(engine.buffers[INITIATOR]) == 5000
+        assert stats.orphan_rate(INITIATOR) == pytest.approx(0.5, abs=0.01)
+        assert stats.orphan_rate(REFLECTOR) == 0.0
+
+    def test_out_of_order_arrival_is_evicted(self):
+        """Test that a stale counter buffered behind a fresher one is evicted once out of the window."""
+        engine = PairingEngine(window=8, max_age_s=None)
+        engine.add(INITIATOR, _subevent(100), arrived_at=0.0)
+        engine.add(INITIATOR, _subevent(93), arrived_at=0.1)
+        assert list(engine.buffers[INITIATOR]) == [100, 93]
+
+        engine.add(REFLECTOR, _subevent(105), arrived_at=0.2)
+        assert list(engine.buffers[INITIATOR]) == [100]
+        assert engine.stats.evicted_by_window == 1
+        assert engine.stats.orphaned == [1, 0]
+
+    def test_age_eviction_and_duplicates(self):
+        """Test that orphans expire after max_age_s and repeated counters replace the buffered one."""
+        engine = PairingEngine(window=100, max_age_s=1.0)
+        engine.add(INITIATOR, _subevent(1), arrived_at=0.0)
+        engine.add(INITIATOR, _subevent(2), arrived_at=0.9)
+        engine.add(REFLECTOR, _subevent(5), arrived_at=1.5)
+        assert list(engine.buffers[INITIATOR]) == [2]
+        assert engine.stats.evicted_by_age == 1
+
+        replacement = _subevent(5)
+        engine.add(REFLECTOR, replacement, arrived_at=1.6)
+        assert engine.stats.duplicates == 1
+        assert engine.add(INITIATOR, _subevent(5), arrived_at=1.7).reflector is replacement
+        assert engine.stats.orphaned == [1, 1]
+
+    def test_invalid_limits(self):
+        """Test that windows of half the counter range or more are rejected."""
+        with pytest.raises(ValueError):
+            PairingEngine(window=0x8000)
+        with pytest.raises(ValueError):
+            PairingEngine(max_age_s=0)
+
+
+class TestMergedStreamConsumer:
+    """Tests for consuming both streams from one merged queue."""
+
+    @staticmethod
+    def _looped_log(tmp_path, name, copies):
+        """Write copies of a test log with procedure counters continuing across copies."""
+        text = open(f'tests/{name}').read()
+        path = tmp_path / name
+        path.write_text(''.join(
+            re.sub(r'Procedure counter: (\d+)', lambda m, k=k: f'Procedure counter: {int(m.group(1)) + 64 * k}', text)
+            for k in range(copies)))
+        return str(path)
+
+    def _replay(self, initiator_log, reflector_log, engine):
+        """Replay the initiator log completely before the reflector log starts; return the pairs."""
+        merged_queue = Queue()
+        pairs = []
+        consumer = Thread(target=merged_stream_consumer, daemon=True,
+                          args=(merged_queue, None, engine, lambda ini, ref: pairs.append(ini.procedure_counter)))
+        consumer.start()
+        for role, log in ((INITIATOR, initiator_log), (REFLECTOR, reflector_log)):
+            producer_worker(FileDataSource(log), MergedQueueWriter(merged_queue, role), Event())
+        consumer.join(timeout=30.0)
+        return pairs
+
+    def test_replay_sources_at_different_speeds_lose_no_pairs(self, tmp_path):
+        """Test that a replay pairs every common counter however far one file runs ahead."""
+        initiator_log = self._looped_log(tmp_path, 'ini.txt', 30)
+        reflector_log = self._looped_log(tmp_path, 'ref.txt', 30)
+        expected = sorted(set(_subevents(initiator_log)) & set(_subevents(reflector_log)))
+        assert len(expected) > 1024
+
+        engine = PairingEngine(window=None, max_age_s=None)
+        assert sorted(self._replay(initiator_log, reflector_log, engine)) == expected
+        assert engine.stats.evicted_by_window == engine.stats.evicted_by_age == 0
+
+        # The live limits would have dropped the pairs the reflector reached too late
+        assert len(self._replay(initiator_log, reflector_log, PairingEngine())) < len(expected)
+
+    def test_no_head_of_line_blocking(self, subevents):
+        """Test that a lost initiator subevent does not hold back later pairs."""
+        initiators, reflectors = subevents
+        merged_queue = Queue()
+        initiator = MergedQueueWriter(merged_queue, INITIATOR)
+        reflector = MergedQueueWriter(merged_queue, REFLECTOR)
+        coupled = []
+        emitted = Event()
+
+        def gui_callback(initiator, reflector, *data):
+            coupled.append(initiator.procedure_counter)
+            emitted.set()
+
+        consumer = Thread(target=merged_stream_consumer, args=(merged_queue, gui_callback), daemon=True)
+        consumer.start()
+
+        # Initiator subevent 1 is lost; reflector streams on
+        initiator.put(initiators[0])
+        reflector.put(reflectors[0])
+        reflector.put(reflectors[1])
+        reflector.put(reflectors[2])
+        initiator.put(initiators[2])
+        assert emitted.wait(2.0)
+        # Pair 2 is complete, so it must not wait for more initiator data
+        while len(coupled) < 2:
+            emitted.clear()
+            assert emitted.wait(2.0)
+        assert coupled == [0, 2]
+
+        initiator.put(None)
+        reflector.put(None)
+        consumer.join(timeout=2.0)
+        assert not consumer.is_alive()
+
+    def test_dual_queues(self, subevents):
+        """Test that the two-queue consumer couples every counter present in both logs."""
+        initiators, reflectors = subevents
+        queues = Queue(), Queue()
+        for queue, items in zip(queues, (initiators, reflectors)):
+            for subevent in items.values():
+                queue.put(subevent)
+            queue.put(None)
+
+        coupled = []
+        engine = dual_stream_consumer(*queues, lambda initiator, *data: coupled.append(initiator.procedure_counter))
+
+        assert sorted(coupled) == sorted(initiators.keys() & reflectors.keys())
+        assert engine.join_latency.pairs == len(coupled)
+        assert sorted(engine.buffers[REFLECTOR]) == sorted(reflectors.keys() - initiators.keys())
@@ -0,0 +1,73 @@
+import os
+
+from toolset.data_sources import FileDataSource, ParseCache
+from toolset.data_sources.events import SubeventResultEvent
+
+
+def _subevents(events):
+    return [e.subevent for e in events if isinstance(e, SubeventResultEvent)]
+
+
+class TestParseCache:
+    """Tests for the on-disk parse cache."""
+
+    def _log(self, tmp_path, name='ini.txt'):
+        log = tmp_path / name
+        log.write_bytes(open(f'tests/{name}', 'rb').read())
+        return str(log)
+
+    def test_replay_from_cache(self, tmp_path):
+        """Test that a second replay is served from the cache with the same events."""
+        log = self._log(tmp_path)
+        cache = ParseCache(str(tmp_path / 'cache'))
+
+        first = list(FileDataSource(log, cache=cache).read())
+        entry = cache.entry_path(log)
+        assert os.path.exists(entry)
+
+        second = list(FileDataSource(log, cache=cache).read())
+        assert [type(e) for e in second] == [type(e) for e in first]
+        assert _subevents(second) == _subevents(first)
+
+        seek = _subevents(FileDataSource(log, seek_counter=60, cache=cache).read())
+        assert [s.procedure_counter for s in seek] == [60, 61, 62, 63]
+
+    def test_changed_log_invalidates_entry(self, tmp_path):
+        """Test that editing the log replaces its cache entry."""
+        log = self._log(tmp_path)
+        cache = ParseCache(str(tmp_path / 'cache'))
+        list(FileDataSource(log, cache=cache).read())
+        old_entry = cache.entry_path(log)
+
+        text = open(log, 'rb').read()
+        first_block = text.index(b'I: CS Subevent result received:')
+        open(log, 'wb').write(text[:first_block])
+
+        new_entry = cache.entry_path(log)
+        assert new_entry != old_entry
+        assert _subevents(FileDataSource(log, cache=cache).read()) == []
+        assert os.listdir(cache.directory) == [os.path.basename(new_entry)]
+
+    def test_interrupted_replay_is_not_cached(self, tmp_path):
+        """Test that a partially consumed replay leaves no entry behind."""
+        log = self._log(tmp_path)
+        cache = ParseCache(str(tmp_path / 'cache'))
+
+        events = FileDataSource(log, cache=cache).read()
+        next(events)
+        events.close()
+        assert os.listdir(cache.directory) == []
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that entries are evicted oldest-use first once over the size limit."""
+        ini = self._log(tmp_path, 'ini.txt')
+        ref = self._log(tmp_path, 'ref.txt')
+        cache = ParseCache(str(tmp_path / 'cache'), max_bytes=100 * 1024)
+
+        list(FileDataSource(ini, cache=cache).read())
+        ini_entry = cache.entry_path(ini)
+        os.utime(ini_entry, ns=(0, 0))
+        list(FileDataSource(ref, cache=cache).read())
+
+        assert not os.path.exists(ini_entry)
+        assert os.path.exists(cache.entry_path(ref))
@@ -0,0 +1,126 @@
+import time
+from queue import Empty, Full
+from threading import Thread
+
+import pytest
+
+from toolset.pipeline import PolicyQueue, parse_queue_policies
+
+
+def _drain(queue):
+    items = []
+    while True:
+        try:
+            items.append(queue.get_nowait())
+        except Empty:
+            return items
+
+
+class TestPolicyQueue:
+    """Tests for the full-queue policies of PolicyQueue."""
+
+    def test_drop_oldest(self):
+        """Test that a full queue discards its oldest item but keeps the sentinel."""
+        queue = PolicyQueue(maxsize=3, policy='drop-oldest')
+        for item in range(5):
+            queue.put(item)
+        queue.put(None)
+        queue.put(5)
+
+        assert _drain(queue) == [3, 4, None, 5]
+        assert queue.stats.dropped == 3
+        assert queue.stats.max_depth == 4
+
+    def test_drop_newest(self):
+        """Test that a full queue discards the item being put, never a sentinel."""
+        queue = PolicyQueue(maxsize=2, policy='drop-newest')
+        for item in range(4):
+            queue.put(item)
+        queue.put(None)
+
+        assert _drain(queue) == [0, 1, None]
+        assert queue.stats.dropped == 2
+        assert queue.stats.put == 5
+        assert queue.stats.delivered == 3
+
+    def test_coalesce_per_stream(self):
+        """Test that a full queue replaces the oldest item of the same stream, and only when full."""
+        queue = PolicyQueue(maxsize=3, policy='coalesce', key=lambda item: item[0],
+                            is_sentinel=lambda item: item[1] is None)
+        queue.put(('ini', 1))
+        queue.put(('ini', 2))
+        queue.put(('ref', 1))
+        assert queue.stats.coalesced == 0
+        queue.put(('ini', 3))
+        queue.put(('ini', None))
+        queue.put(('ref', 2))
+
+        assert _drain(queue) == [('ini', 2), ('ini', 3), ('ini', None), ('ref', 2)]
+        assert queue.stats.coalesced == 2
+        assert queue.stats.dropped == 0
+
+    def test_coalesce_without_queued_stream(self):
+        """Test that a full coalescing queue drops the oldest item when the new item's stream has none queued."""
+        queue = PolicyQueue(maxsize=2, policy='coalesce', key=lambda item: item[0])
+        queue.put(('ini', 1))
+        queue.put(('ini', 2))
+        queue.put(('ref', 1))
+
+        assert _drain(queue) == [('ini', 2), ('ref', 1)]
+        assert queue.stats.dropped == 1
+
+    def test_on_drop(self):
+        """Test that every discarded or replaced item is reported."""
+        dropped = []
+        queue = PolicyQueue(maxsize=1, policy='drop-oldest', on_drop=dropped.append)
+        for item in range(3):
+            queue.put(item)
+        queue = PolicyQueue(maxsize=1, policy='coalesce', key=lambda item: item % 2, on_drop=dropped.append)
+        queue.put(3)
+        queue.put(5)
+        queue.put(6)
+        assert dropped == [0, 1, 3, 5]
+
+    def test_block(self):
+        """Test that the block policy waits for room and counts the wait."""
+        queue = PolicyQueue(maxsize=1)
+        queue.put(0)
+        with pytest.raises(Full):
+            queue.put(1, timeout=0.01)
+        with pytest.raises(Full):
+            queue.put(1, block=False)
+        assert queue.stats.blocked == 1
+
+        putter = Thread(target=queue.put, args=(2,))
+        putter.start()
+        deadline = time.monotonic() + 1.0
+        while queue.stats.blocked < 2 and time.monotonic() < deadline:
+            time.sleep(0.001)
+        assert queue.get(timeout=1.0) == 0
+        putter.join(timeout=1.0)
+        assert queue.get(timeout=1.0) == 2
+        assert queue.stats.blocked == 2
+        assert queue.stats.blocked_s >= 0.01
+
+    def test_unknown_policy(self):
+        """Test that an unknown policy is rejected."""
+        with pytest.raises(ValueError):
+            PolicyQueue(policy='latest')
+
+
+class TestParseQueuePolicies:
+    """Tests for parsing --queue-policy options."""
+
+    def test_stage_and_default(self):
+        """Test that plain policies apply to every stage and STAGE= overrides one."""
+        stages = ('pairing', 'estimator')
+        assert parse_queue_policies([], stages) == {'pairing': 'block', 'estimator': 'block'}
+        assert parse_queue_policies(['drop-oldest', 'pairing=coalesce'], stages) == \
+            {'pairing': 'coalesce', 'estimator': 'drop-oldest'}
+
+    def test_errors(self):
+        """Test that unknown stages and policies are reported."""
+        with pytest.raises(ValueError, match='stage'):
+            parse_queue_policies(['gui=block'], ('pairing',))
+        with pytest.raises(ValueError, match='policy'):
+            parse_queue_policies(['pairing=latest'], ('pairing',))
@@ -0,0 +1,125 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from toolset.data_sources import FileDataSource, file_source
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.stats import STATS, Histogram, StatsDumper, StatsRegistry, format_snapshot
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class TestHistogram:
+    """Tests for the log-bucketed latency histogram."""
+
+    def test_percentiles(self):
+        """Test that percentiles land within one bucket of the exact value."""
+        histogram = Histogram()
+        for i in range(1, 1001):
+            histogram.record(i * 1e-5)
+
+        assert histogram.count == 1000
+        assert histogram.mean == pytest.approx(5.005e-3)
+        assert histogram.max == pytest.approx(1e-2)
+        for q in (50, 90, 99):
+            exact = q * 1e-4
+            assert exact <= histogram.percentile(q) <= exact * 1.2
+        assert histogram.percentile(100) == pytest.approx(1e-2)
+
+    def test_merge_pickled(self):
+        """Test that a histogram shipped from another process merges into a local one."""
+        worker = Histogram()
+        for value in (1e-4, 2e-4, 5e-3):
+            worker.record(value)
+        local = Histogram()
+        local.record(1e-3)
+
+        local.merge(pickle.loads(pickle.dumps(worker)))
+        assert local.count == 4
+        assert local.total == pytest.approx(6.3e-3)
+        assert local.max == pytest.approx(5e-3)
+        assert 5e-3 <= local.percentile(100) <= 5e-3 * 1.2
+
+    def test_empty(self):
+        """Test that an empty histogram summarizes to zeros."""
+        assert Histogram().summary() == {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p90': 0.0, 'p99': 0.0, 'max': 0.0}
+
+
+class TestStatsRegistry:
+    """Tests for snapshots of the stats registry."""
+
+    def test_snapshot(self):
+        """Test that counters, histograms and gauges appear in a snapshot."""
+        registry = StatsRegistry()
+        registry.counter('uart.bytes_read').add(10)
+        registry.counter('uart.bytes_read').add(5)
+        registry.histogram('parse.subevent_s').record(0.002)
+        registry.gauge('queue.pairing', lambda: {'depth': 3})
+        registry.gauge('broken', lambda: 1 / 0)
+
+        snapshot = registry.snapshot()
+        assert snapshot['counters'] == {'uart.bytes_read': 15}
+        assert snapshot['histograms']['parse.subevent_s']['count'] == 1
+        assert snapshot['gauges'] == {'broken': None, 'queue.pairing': {'depth': 3}}
+        assert 'uart.bytes_read: 15' in format_snapshot(snapshot)
+
+    def test_reset_keeps_metrics(self):
+        """Test that reset zeroes metrics that stages still hold references to."""
+        registry = StatsRegistry()
+        counter = registry.counter('pairing.pairs')
+        counter.add(2)
+        registry.gauge('queue.pairing', lambda: 1)
+        registry.reset()
+
+        counter.add()
+        assert registry.snapshot()['counters'] == {'pairing.pairs': 1}
+        assert registry.snapshot()['gauges'] == {}
+
+    def test_parsing_is_counted(self):
+        """Test that reading a log file records subevents parsed and parse time."""
+        STATS.reset()
+        source = FileDataSource(os.path.join(TESTS_DIR, 'ini.txt'))
+        subevents = [e for e in source.read() if isinstance(e, SubeventResultEvent)]
+
+        snapshot = STATS.snapshot()
+        assert snapshot['counters']['parse.subevents'] == len(subevents)
+        assert snapshot['histograms']['parse.subevent_s']['count'] == len(subevents)
+
+
+    def test_parallel_parsing_is_counted(self, monkeypatch):
+        """Test that subevents parsed in worker processes are counted in this process."""
+        monkeypatch.setattr(file_source, 'PARALLEL_CHUNK_BYTES', 16 * 1024)
+        STATS.reset()
+        source = FileDataSource(os.path.join(TESTS_DIR, 'ini.txt'), workers=2)
+        subevents = [e for e in source.read() if isinstance(e, SubeventResultEvent)]
+
+        snapshot = STATS.snapshot()
+        assert len(subevents) > 1
+        assert snapshot['counters']['parse.subevents'] == len(subevents)
+        assert snapshot['histograms']['parse.subevent_s']['count'] == len(subevents)
+
+
+class TestStatsDumper:
+    """Tests for the periodic JSON lines dump."""
+
+    def test_dumps_json_lines(self, tmp_path):
+        """Test that snapshots are appended periodically and once more on close."""
+        registry = StatsRegistry()
+        registry.counter('pairing.pairs').add(4)
+        path = tmp_path / 'stats.jsonl'
+        dumper = StatsDumper(registry, open(path, 'w'), interval=0.01)
+        registry.counter('pairing.pairs').add(1)
+        dumper.close()
+        dumper.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines
+        assert lines[-1]['counters'] == {'pairing.pairs': 5}
+        assert all(set(line) == {'time', 'uptime_s', 'counters', 'histograms', 'gauges'} for line in lines)
+
+    def test_invalid_interval(self):
+        """Test that a non-positive interval is rejected."""
+        with pytest.raises(ValueError):
+            StatsDumper(StatsRegistry(), interval=0)
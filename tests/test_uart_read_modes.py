@@ -0,0 +1,217 @@
+import os
+import queue
+import threading
+import time
+
+import pytest
+
+# Pseudo-terminals are POSIX only
+pytest.importorskip('termios')
+import pty
+import tty
+
+import serial
+from toolset.data_sources.events import StatusEvent, SubeventResultEvent
+from toolset.data_sources.uart_source import READ_MODES, UartDataSource, read_multiplexed
+from toolset.pipeline.workers import multiplexed_producer_worker
+from test_uart_source import SUBEVENT
+
+
+class _Port:
+    """Pseudo-terminal standing in for a board; the test writes to its master end."""
+
+    def __init__(self):
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.path = os.ttyname(self.slave)
+
+    def write_chunks(self, data, size, delay=0.005):
+        for i in range(0, len(data), size):
+            os.write(self.master, data[i:i + size])
+            time.sleep(delay)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+@pytest.fixture
+def port():
+    port = _Port()
+    yield port
+    port.close()
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class _Reader:
+    """Collects the events of UartDataSource.read() in a thread."""
+
+    def __init__(self, source):
+        self.source = source
+        # Opening flushes the input buffer, so open before the test writes
+        source.open()
+        self.events = []
+        self.thread = threading.Thread(target=self._read, daemon=True)
+        self.thread.start()
+
+    def _read(self):
+        for event in self.source.read():
+            self.events.append(event)
+
+    def counters(self):
+        return [e.subevent.procedure_counter for e in self.events if isinstance(e, SubeventResultEvent)]
+
+
+@pytest.mark.parametrize('read_mode', READ_MODES)
+class TestUartReadModes:
+    """Tests for reading a pseudo-terminal port in every read mode."""
+
+    def test_chunked_reads(self, port, read_mode):
+        """Test that a subevent written in small pieces is framed once it is complete."""
+        stop_event = threading.Event()
+        source = UartDataSource(port.path, read_mode=read_mode, read_timeout=0.05)
+        source.set_stop_event(stop_event)
+        reader = _Reader(source)
+        try:
+            port.write_chunks(b'I: Connected to device\r\n' + SUBEVENT * 2, 37)
+            assert _wait_for(lambda: len(reader.counters()) == 2)
+            assert reader.counters() == [9, 9]
+            assert isinstance(reader.events[0], StatusEvent)
+        finally:
+            stop_event.set()
+            reader.thread.join(timeout=1.0)
+            source.close()
+        assert not reader.thread.is_alive()
+
+    def test_idle_timeout_checks_stop_event(self, port, read_mode):
+        """Test that an idle read wakes up every read timeout and ends once stopped."""
+        stop_event = threading.Event()
+        source = UartDataSource(port.path, read_mode=read_mode, read_timeout=0.05)
+        source.set_stop_event(stop_event)
+        reader = _Reader(source)
+        try:
+            time.sleep(0.2)
+            assert reader.thread.is_alive()
+            assert reader.events == []
+
+            stopped_at = time.monotonic()
+            stop_event.set()
+            reader.thread.join(timeout=1.0)
+            assert not reader.thread.is_alive()
+            assert time.monotonic() - stopped_at < 0.5
+        finally:
+            source.close()
+
+    def test_close_ends_read(self, port, read_mode):
+        """Test that closing the source ends a read waiting for data, without a stop event."""
+        source = UartDataSource(port.path, read_mode=read_mode, read_timeout=0.05)
+        reader = _Reader(source)
+        time.sleep(0.1)
+
+        source.close()
+        reader.thread.join(timeout=1.0)
+        assert not reader.thread.is_alive()
+
+    def test_read_after_close_ends_stream(self, port, read_mode):
+        """Test that a read reaching a port closed by another thread returns no data."""
+        source = UartDataSource(port.path, read_mode=read_mode, read_timeout=0.05)
+        source.open()
+        source.close()
+        read = source._read_ready if read_mode == 'select' else source._read_chunk
+        assert read() == b''
+
+    def test_close_during_read_is_quiet(self, port, read_mode, capsys):
+        """Test that a read failing because close() is under way ends without a serial error."""
+        source = UartDataSource(port.path, read_mode=read_mode, read_timeout=0.05)
+        closers = []
+
+        def _read(size=1):
+            # close() waits for this read to leave the port, as with a real reader
+            closer = threading.Thread(target=source.close, daemon=True)
+            closer.start()
+            closers.append(closer)
+            assert _wait_for(source._closing.is_set)
+            raise serial.SerialException('read failed: [Errno 9] Bad file descriptor')
+
+        source.open()
+        source.serial_conn.read = _read
+        reader = _Reader(source)
+        os.write(port.master, b'x')
+        reader.thread.join(timeout=2.0)
+        assert not reader.thread.is_alive()
+        for closer in closers:
+            closer.join(timeout=1.0)
+        assert not source.serial_conn.is_open
+        assert 'Serial error' not in capsys.readouterr().out
+
+
+class TestReadMultiplexed:
+    """Tests for reading several ports from one thread."""
+
+    def test_events_are_attributed_to_their_source(self):
+        """Test that interleaved chunks of two ports yield each port's events with its source."""
+        ports = [_Port(), _Port()]
+        sources = [UartDataSource(p.path, read_timeout=0.05) for p in ports]
+        for source in sources:
+            source.open()
+        stop_event = threading.Event()
+        received = []
+
+        def read():
+            for source, event in read_multiplexed(sources, stop_event, timeout=0.05):
+                if isinstance(event, SubeventResultEvent):
+                    received.append(sources.index(source))
+
+        thread = threading.Thread(target=read, daemon=True)
+        thread.start()
+        try:
+            for i in range(0, len(SUBEVENT), 50):
+                for p in ports:
+                    os.write(p.master, SUBEVENT[i:i + 50])
+                time.sleep(0.002)
+            ports[1].write_chunks(SUBEVENT, 64)
+            assert _wait_for(lambda: len(received) == 3)
+            assert sorted(received) == [0, 1, 1]
+        finally:
+            stop_event.set()
+            thread.join(timeout=1.0)
+            for source in sources:
+                source.close()
+            for p in ports:
+                p.close()
+        assert not thread.is_alive()
+
+    def test_producer_worker_routes_and_shuts_down(self):
+        """Test that multiplexed_producer_worker routes events per source and ends with sentinels."""
+        ports = [_Port(), _Port()]
+        sources = [UartDataSource(p.path, read_timeout=0.05) for p in ports]
+        for source in sources:
+            source.open()
+        queues = [queue.Queue(), queue.Queue()]
+        statuses = []
+        routes = [(sources[0], queues[0], {'status_callback': statuses.append}), (sources[1], queues[1], {})]
+        stop_event = threading.Event()
+        worker = threading.Thread(target=multiplexed_producer_worker, args=(routes, stop_event), daemon=True)
+        worker.start()
+        try:
+            ports[0].write_chunks(b'I: Connected to device\r\n' + SUBEVENT, 100)
+            ports[1].write_chunks(SUBEVENT, 100)
+            assert queues[0].get(timeout=5.0).procedure_counter == 9
+            assert queues[1].get(timeout=5.0).procedure_counter == 9
+            assert statuses == ['connection']
+        finally:
+            stop_event.set()
+            worker.join(timeout=1.0)
+            for p in ports:
+                p.close()
+
+        assert not worker.is_alive()
+        assert queues[0].get_nowait() is None and queues[1].get_nowait() is None
+        assert all(not source.serial_conn.is_open for source in sources)
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+# Pseudo-terminals are POSIX only
+pytest.importorskip('termios')
+
+from toolset.data_sources import FileDataSource
+from toolset.data_sources.events import SubeventResultEvent
+from toolset.data_sources.uart_simulator import UartSimulator, split_log
+from toolset.data_sources.uart_source import UartDataSource
+
+
+def _counters(path):
+    return [e.subevent.procedure_counter for e in FileDataSource(path).read() if isinstance(e, SubeventResultEvent)]
+
+
+class _Reader:
+    """Reads subevent counters from a UartDataSource in a thread."""
+
+    def __init__(self, port, stop_event):
+        self.source = UartDataSource(port)
+        self.source.set_stop_event(stop_event)
+        self.source.open()
+        self.counters = []
+        self.thread = threading.Thread(target=self._read, daemon=True)
+
+    def _read(self):
+        for event in self.source.read():
+            if isinstance(event, SubeventResultEvent):
+                self.counters.append(event.subevent.procedure_counter)
+
+
+class TestUartSimulator:
+    """Tests for the pseudo-terminal board simulator."""
+
+    def test_split_log_groups_procedures(self):
+        """Test that the preamble and one entry per procedure counter are split off."""
+        preamble, procedures = split_log('tests/ini.txt')
+        assert preamble.startswith(b'I: CS config creation complete.\r\n')
+        assert b'CS Subevent result received' not in preamble
+        assert [counter for counter, _ in procedures] == list(range(64))
+        assert all(text.endswith(b'\r\n') for _, text in procedures)
+
+    def test_reboot_and_start_like_run_py(self):
+        """Test the run.py command sequence streams both logs, and only after 's'."""
+        simulator = UartSimulator('tests/ini.txt', 'tests/ref.txt', baudrate=0, rate_hz=0)
+        simulator.start()
+        stop_event = threading.Event()
+        readers = [_Reader(port, stop_event) for port in simulator.ports]
+        try:
+            for reader in readers:
+                reader.source.send(b'r')
+                reader.thread.start()
+            # The reflector firmware ignores 's'; it streams once the initiator connects
+            readers[1].source.send(b's')
+            time.sleep(0.2)
+            assert readers[0].counters == [] and readers[1].counters == []
+
+            readers[0].source.send(b's')
+            # The last block of each log has no end marker
+            expected = [_counters('tests/ini.txt')[:-1], _counters('tests/ref.txt')[:-1]]
+            deadline = time.monotonic() + 5.0
+            while [len(r.counters) for r in readers] != [len(e) for e in expected] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert [r.counters for r in readers] == expected
+        finally:
+            stop_event.set()
+            for reader in readers:
+                reader.source.close()
+            simulator.close()
+
+    def test_procedure_rate_and_loop(self):
+        """Test that looping continues the procedure counters at the requested rate."""
+        simulator = UartSimulator('tests/ini.txt', 'tests/ref.txt', baudrate=0, rate_hz=200, loop=True)
+        simulator.start()
+        stop_event = threading.Event()
+        reader = _Reader(simulator.initiator.port, stop_event)
+        try:
+            reader.thread.start()
+            reader.source.send(b's')
+            time.sleep(0.5)
+        finally:
+            stop_event.set()
+            reader.source.close()
+            simulator.close()
+
+        # 100 procedures are due in 0.5 s, wrapping past the 64 in the log
+        assert 70 <= len(reader.counters) <= 101
+        assert reader.counters[:3] == [0, 1, 2]
+        assert reader.counters[-1] > 64
@@ -0,0 +1,104 @@
+from toolset.data_sources.events import StatusEvent, SubeventResultEvent
+from toolset.data_sources.uart_source import UartDataSource
+
+SUBEVENT = (
+    b"I: CS Subevent result received:\r\n"
+    b"I:  - Procedure counter: 9\r\n"
+    b"I:  - Procedure done status: 0\r\n"
+    b"I:  - Subevent done status: 0\r\n"
+    b"I:  - Procedure abort reason: 0\r\n"
+    b"I:  - Subevent abort reason: 0\r\n"
+    b"I:  - Reference power level: -16\r\n"
+    b"I:  - Num antenna paths: 1\r\n"
+    b"I:  - Num steps reported: 2\r\n"
+    b"I:  - Step data buffer length: 21 bytes\r\n"
+    b"I: Raw step data:\r\n"
+    b"  000b0500d301327f02050900d2df0400\r\n"
+    b"  ff5f0012\r\n"
+    b"I: CS Subevent end\r\n"
+)
+
+
+class TestUartFraming:
+    """Tests for byte-level framing of UART data."""
+
+    def test_frame_split_across_chunks(self):
+        """Test that a subevent is framed regardless of how bytes are chunked."""
+        data = b"I: CS security enabled.\r\n" + SUBEVENT + SUBEVENT.replace(b"counter: 9", b"counter: 10")
+        for chunk_size in (1, 7, 64, len(data)):
+            source = UartDataSource('unused')
+            events = []
+            for i in range(0, len(data), chunk_size):
+                events.extend(source._feed(data[i:i + chunk_size]))
+
+            assert events[0] == StatusEvent('cs_security')
+            subevents = [e.subevent for e in events if isinstance(e, SubeventResultEvent)]
+            assert [s.procedure_counter for s in subevents] == [9, 10]
+            assert subevents[0].raw_data == bytes.fromhex("000b0500d301327f02050900d2df0400ff5f0012")
+            assert len(subevents[0].steps) == 2
+            assert len(source._rx) == 0
+
+    def test_incomplete_frame_waits_for_end_marker(self):
+        """Test that no subevent is emitted before the end marker arrives."""
+        source = UartDataSource('unused')
+        head, tail = SUBEVENT[:-len(b"I: CS Subevent end\r\n")], b"I: CS Subevent end\r\n"
+        assert list(source._feed(head)) == []
+        events = list(source._feed(tail))
+        assert len(events) == 1
+        assert events[0].subevent.procedure_counter == 9
+
+    def test_restarted_frame_drops_truncated_subevent(self):
+        """Test that a start marker inside an open frame restarts framing."""
+        truncated = SUBEVENT.split(b"I: Raw step data:")[0]
+        source = UartDataSource('unused')
+        events = list(source._feed(truncated + SUBEVENT))
+        assert len(events) == 1
+        assert events[0].subevent.procedure_counter == 9
+
+    def test_hex_rows_decoded_on_arrival(self):
+        """Test that step rows are decoded as they arrive and not kept in the receive buffer."""
+        head, tail = SUBEVENT.split(b"I: CS Subevent end\r\n")[0], b"I: CS Subevent end\r\n"
+        source = UartDataSource('unused')
+        assert list(source._feed(head)) == []
+        assert len(source._rx) == 0
+        events = list(source._feed(tail))
+        assert events[0].subevent.raw_data == bytes.fromhex("000b0500d301327f02050900d2df0400ff5f0012")
+
+    def test_byte_split_across_rows_and_interleaved_lines(self):
+        """Test that a byte split over two rows decodes and other log lines in step data are ignored."""
+        data = SUBEVENT.replace(
+            b"  000b0500d301327f02050900d2df0400\r\n  ff5f0012\r\n",
+            b"  000b0500d301327f02050900d2df0400f\r\nW: unrelated 00ff\r\n  f5f0012\r\n",
+        )
+        events = list(UartDataSource('unused')._feed(data))
+        subevents = [e.subevent for e in events if isinstance(e, SubeventResultEvent)]
+        assert subevents[0].raw_data == bytes.fromhex("000b0500d301327f02050900d2df0400ff5f0012")
+
+    def test_compressed_raw_log(self, tmp_path):
+        """Test that a compressed raw UART log replays through FileDataSource."""
+        from toolset.data_sources import FileDataSource
+
+        log = tmp_path / 'initiator.txt.xz'
+        source = UartDataSource('unused')
+        source.enable_logging(str(log), 'xz')
+        for i in range(0, len(SUBEVENT), 100):
+            list(source._handle_chunk(SUBEVENT[i:i + 100]))
+        source.close()
+
+        events = list(FileDataSource(str(log)).read())
+        assert [e.subevent.procedure_counter for e in events] == [9]
+
+    def test_binary_capture_written_in_background(self, tmp_path):
+        """Test that the binary capture is written by a writer thread and replays after close."""
+        from toolset.data_sources import BinaryDataSource
+
+        capture = tmp_path / 'initiator.cscap'
+        source = UartDataSource('unused')
+        source.enable_binary_logging(str(capture))
+        assert source.capture_writer.log_writer is not None
+        for i in range(0, len(SUBEVENT), 100):
+            list(source._handle_chunk(SUBEVENT[i:i + 100]))
+        source.close()
+
+        events = list(BinaryDataSource(str(capture)).read())
+        assert [e.subevent.procedure_counter for e in events] == [9]
@@ -50,7 +50,7 @@ class ToneQualityIndicatorExtensionSlot(IntEnum):
     TONE_EXTENSION_EXPECTED = 0x02
 
 
-@dataclass
+@dataclass(slots=True)
 class ToneData:
     pct_i: int # in signed int 12-bit format
     pct_q: int # in signed int 12-bit format
@@ -66,7 +66,7 @@ class ToneData:
     __repr__ = __str__
 
 
-@dataclass
+@dataclass(slots=True)
 class CSStep:
     mode: CSMode
     channel: int
@@ -77,7 +77,7 @@ class CSStep:
     __repr__ = __str__
 
 
-@dataclass
+@dataclass(slots=True)
 class CSStepMode0(CSStep):
     packet_quality: PacketQuality
     packet_rssi: Optional[int]  # in dBm, None if not available (0x7F)
@@ -92,7 +92,7 @@ class CSStepMode0(CSStep):
         return f"\n{self.__str__()}"
 
 
-@dataclass
+@dataclass(slots=True)
 class CSStepMode1(CSStep):
     raw_data: bytes
     # TODO: add mode-1 specific fields
@@ -102,7 +102,7 @@ class CSStepMode1(CSStep):
 
     __repr__ = __str__
 
-@dataclass
+@dataclass(slots=True)
 class CSStepMode2(CSStep):
     antenna_permutation_index: int
     tones: list[ToneData]
@@ -113,7 +113,7 @@ class CSStepMode2(CSStep):
     def __repr__(self):
         return f"\n{self.__str__()}"
 
-@dataclass
+@dataclass(slots=True)
 class CSStepMode3(CSStep):
     raw_data: bytes
     # TODO: add mode-3 specific fields
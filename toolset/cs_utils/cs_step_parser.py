@@ -1,65 +1,162 @@
 import logging
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
 from . import cs_step
 
 logger = logging.getLogger(__name__)
 
+STEP_HEADER_SIZE = 3  # mode (1) + channel (1) + data_len (1)
+MODE2_TONE_SIZE = 4   # PCT (3) + Tone_Quality_Indicator (1)
 
-def _parse_steps_internal(hex_data: str) -> Tuple[List[cs_step.CSStep], List[Tuple[int, int]]]:
-    """Parse CS step stream, returning steps and their byte ranges.
+# Step stream as raw bytes or hexadecimal text
+StepData = Union[str, bytes, bytearray, memoryview]
 
-    Returns:
-        Tuple of (steps, byte_ranges) where byte_ranges[i] = (start, end) byte
-        offsets in the raw data for steps[i]. Only successfully parsed steps
-        are included (skipped/invalid steps are omitted from both lists).
-    """
-    HEADER_SIZE = 3  # mode (1) + channel (1) + data_len (1)
 
-    data = bytes.fromhex(hex_data)
-    steps = []
-    byte_ranges = []
-    offset = 0
-
-    while offset < len(data):
-        if offset + HEADER_SIZE > len(data):
-            logger.error(f"Incomplete step header at offset {offset}")
-            break
+def _walk_complete_steps(data: StepData, offset: int, headers: List[Tuple[int, int, int, int]]) -> int:
+    """Append headers of the complete steps in data starting at offset.
 
+    Returns:
+        Offset of the first step whose header or payload is not complete yet
+    """
+    while offset + STEP_HEADER_SIZE <= len(data):
         mode_value = data[offset]
         channel = data[offset + 1]
         data_len = data[offset + 2]
 
         if mode_value > 3:
             logger.error(f"Invalid mode {mode_value} at offset {offset}, skipping step")
-            offset += HEADER_SIZE + data_len
+            offset += STEP_HEADER_SIZE + data_len
             continue
 
         if channel > 78:
             logger.error(f"Invalid channel {channel} at offset {offset}, skipping step")
-            offset += HEADER_SIZE + data_len
+            offset += STEP_HEADER_SIZE + data_len
             continue
 
-        mode = cs_step.CSMode(mode_value)
-
-        if offset + HEADER_SIZE + data_len > len(data):
-            logger.error(f"Incomplete step data at offset {offset}")
+        if offset + STEP_HEADER_SIZE + data_len > len(data):
             break
 
-        step_data = data[offset + HEADER_SIZE : offset + HEADER_SIZE + data_len]
-        step = parse_cs_step_from_bytes(step_data, mode, channel)
+        headers.append((offset, mode_value, channel, data_len))
+        offset += STEP_HEADER_SIZE + data_len
+
+    return offset
+
+
+def _log_incomplete_step(data: StepData, offset: int):
+    if offset + STEP_HEADER_SIZE > len(data):
+        logger.error(f"Incomplete step header at offset {offset}")
+    else:
+        logger.error(f"Incomplete step data at offset {offset}")
+
+
+def _walk_step_headers(data: StepData) -> List[Tuple[int, int, int, int]]:
+    """Walk step headers of a CS step stream without decoding step payloads.
+
+    Returns:
+        List of (offset, mode, channel, data_len) for every step with a valid
+        header and complete payload. Invalid steps are logged and omitted.
+    """
+    headers = []
+    offset = _walk_complete_steps(data, 0, headers)
+    if offset < len(data):
+        _log_incomplete_step(data, offset)
+    return headers
+
+
+class StepIndex:
+    """Index of the steps of a CS step stream, built as its bytes arrive.
+
+    For every complete step, records what StepStream needs besides the bulk
+    tone decode: byte ranges of the steps that parse, and offsets and tone
+    counts of the mode-2 steps. Call feed() whenever bytes were appended to
+    the buffer and finish() once the stream is complete.
+    """
+
+    __slots__ = ('headers', 'ranges', 'mode2_offsets', 'mode2_counts', '_offset', '_error')
+
+    def __init__(self):
+        self.headers: List[Tuple[int, int, int, int]] = []
+        self.ranges: List[Tuple[int, int]] = []
+        self.mode2_offsets: List[int] = []
+        self.mode2_counts: List[int] = []
+        self._offset = 0
+        self._error: Optional[ValueError] = None
+
+    def feed(self, data: StepData):
+        """Index the steps completed by bytes appended to data."""
+        first = len(self.headers)
+        self._offset = _walk_complete_steps(data, self._offset, self.headers)
+        for i in range(first, len(self.headers)):
+            offset, mode_value, _, data_len = self.headers[i]
+            end = offset + STEP_HEADER_SIZE + data_len
+            if mode_value == cs_step.CSMode.MODE_2:
+                k = _mode2_tone_count(data_len)
+                if k is not None:
+                    self.mode2_offsets.append(offset)
+                    self.mode2_counts.append(k)
+                    self.ranges.append((offset, end))
+            elif mode_value == cs_step.CSMode.MODE_0:
+                if data_len not in (3, 5):
+                    logger.error(f"Invalid Mode 0 data length: {data_len}, expected 3 or 5")
+                    continue
+                # Validated as parse_mode0() would; raised from finish()
+                if self._error is None:
+                    try:
+                        cs_step.PacketQuality(data[offset + STEP_HEADER_SIZE])
+                    except ValueError as e:
+                        self._error = e
+                self.ranges.append((offset, end))
+
+    def finish(self, data: StepData) -> 'StepIndex':
+        """Index the rest of the complete data.
+
+        Raises:
+            ValueError: If a step holds an invalid enum value
+        """
+        self.feed(data)
+        if self._offset < len(data):
+            _log_incomplete_step(data, self._offset)
+        if self._error is not None:
+            raise self._error
+        return self
+
+
+def _as_step_bytes(data: StepData) -> StepData:
+    """Return step stream bytes, decoding hex text if needed."""
+    return bytes.fromhex(data) if isinstance(data, str) else data
+
+
+def _parse_steps_internal(data: StepData) -> Tuple[List[cs_step.CSStep], List[Tuple[int, int]]]:
+    """Parse CS step stream, returning steps and their byte ranges.
+
+    Returns:
+        Tuple of (steps, byte_ranges) where byte_ranges[i] = (start, end) byte
+        offsets in the raw data for steps[i]. Only successfully parsed steps
+        are included (skipped/invalid steps are omitted from both lists).
+    """
+    data = _as_step_bytes(data)
+    # Step payloads are zero-copy slices of the caller's buffer
+    view = memoryview(data)
+    steps = []
+    byte_ranges = []
+
+    for offset, mode_value, channel, data_len in _walk_step_headers(data):
+        start = offset + STEP_HEADER_SIZE
+        step = parse_cs_step_from_bytes(view[start:start + data_len], cs_step.CSMode(mode_value), channel)
         if step is not None:
             steps.append(step)
-            byte_ranges.append((offset, offset + HEADER_SIZE + data_len))
-        offset += HEADER_SIZE + data_len
+            byte_ranges.append((offset, start + data_len))
 
     return steps, byte_ranges
 
 
-def parse_cs_steps(hex_data: str) -> List[cs_step.CSStep]:
+def parse_cs_steps(data: StepData) -> List[cs_step.CSStep]:
     """Parse stream of CS steps, returning all at once.
 
     Args:
-        hex_data: Hexadecimal string representation of data stream
+        data: Raw step stream bytes (bytes/memoryview) or its hexadecimal
+            string representation
 
     Returns:
         List of all CSStep objects parsed from stream
@@ -67,22 +164,299 @@ def parse_cs_steps(hex_data: str) -> List[cs_step.CSStep]:
     Raises:
         ValueError: If data is malformed or contains invalid mode
     """
-    steps, _ = _parse_steps_internal(hex_data)
+    steps, _ = _parse_steps_internal(data)
     return steps
 
 
-def parse_cs_steps_with_ranges(hex_data: str) -> Tuple[List[cs_step.CSStep], List[Tuple[int, int]]]:
+def parse_cs_steps_with_ranges(data: StepData) -> Tuple[List[cs_step.CSStep], List[Tuple[int, int]]]:
     """Parse stream of CS steps, returning steps paired with their byte ranges.
 
     Args:
-        hex_data: Hexadecimal string representation of data stream
+        data: Raw step stream bytes (bytes/memoryview) or its hexadecimal
+            string representation
 
     Returns:
         Tuple of (steps, byte_ranges). byte_ranges[i] = (start, end) exclusive
-        byte offsets in the raw data for steps[i].
+        byte offsets into data (the decoded bytes when given hex) for steps[i].
+    """
+    return _parse_steps_internal(data)
+
+
+@dataclass(slots=True)
+class Mode2ToneColumns:
+    """Columnar decode of all mode-2 tones in a CS step stream.
+
+    Per-tone arrays share one index: entry t describes tone t of mode-2 step
+    step_index[t]. Per-step arrays are indexed by mode-2 step number.
+    CSStepMode2/ToneData objects are only built on request via step()/steps().
+    """
+    # Per mode-2 step
+    step_offsets: np.ndarray      # byte offset of the step header in the raw data
+    step_tone_starts: np.ndarray  # index of the step's first tone, len = num steps + 1
+    # Per tone
+    step_index: np.ndarray
+    channel: np.ndarray
+    antenna_permutation_index: np.ndarray
+    pct_i: np.ndarray             # sign-extended 12-bit
+    pct_q: np.ndarray             # sign-extended 12-bit
+    quality: np.ndarray
+    quality_extension_slot: np.ndarray
+    _average_iq: Optional[Tuple[np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.step_offsets)
+
+    def step(self, n: int) -> cs_step.CSStepMode2:
+        """Build the CSStepMode2 object for mode-2 step n."""
+        first, last = self.step_tone_starts[n], self.step_tone_starts[n + 1]
+        tones = [
+            cs_step.ToneData(
+                pct_i=int(self.pct_i[t]),
+                pct_q=int(self.pct_q[t]),
+                quality=cs_step.ToneQualityIndicator(int(self.quality[t])),
+                quality_extension_slot=cs_step.ToneQualityIndicatorExtensionSlot(int(self.quality_extension_slot[t])),
+            )
+            for t in range(first, last)
+        ]
+        return cs_step.CSStepMode2(
+            mode=cs_step.CSMode.MODE_2,
+            channel=int(self.channel[first]),
+            antenna_permutation_index=int(self.antenna_permutation_index[first]),
+            tones=tones,
+        )
+
+    def steps(self) -> List[cs_step.CSStepMode2]:
+        """Build CSStepMode2 objects for all mode-2 steps."""
+        return [self.step(n) for n in range(len(self))]
+
+    def step_channels(self) -> np.ndarray:
+        """Return the channel of every mode-2 step."""
+        return self.channel[self.step_tone_starts[:-1]]
+
+    def average_iq(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Average I/Q per mode-2 step, skipping TONE_EXTENSION_NOT_EXPECTED slots.
+
+        Returns:
+            Tuple of (avg_i, avg_q) arrays indexed by mode-2 step number.
+            Steps without valid tones average to (0, 0). Computed once and cached.
+        """
+        if self._average_iq is not None:
+            return self._average_iq
+        valid = self.quality_extension_slot != cs_step.ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
+        num_steps = len(self)
+        step_index = self.step_index[valid]
+        counts = np.bincount(step_index, minlength=num_steps)
+        sum_i = np.bincount(step_index, weights=self.pct_i[valid], minlength=num_steps)
+        sum_q = np.bincount(step_index, weights=self.pct_q[valid], minlength=num_steps)
+        divisor = np.maximum(counts, 1)
+        self._average_iq = (sum_i / divisor, sum_q / divisor)
+        return self._average_iq
+
+
+def decode_mode2_tones(data: StepData,
+                       headers: Optional[List[Tuple[int, int, int, int]]] = None) -> Mode2ToneColumns:
+    """Decode all mode-2 tones of a CS step stream into NumPy arrays.
+
+    Step headers are walked once; tone payloads of every valid mode-2 step are
+    then decoded in bulk with NumPy bit operations. Steps of other modes are
+    skipped, invalid steps are logged and omitted as in parse_cs_steps().
+
+    Args:
+        data: Raw step stream bytes (bytes/memoryview) or its hexadecimal
+            string representation
+        headers: Result of walking data's step headers, if already known
+
+    Returns:
+        Mode2ToneColumns holding every decoded tone
+    """
+    data = _as_step_bytes(data)
+    if headers is None:
+        headers = _walk_step_headers(data)
+    offsets = []
+    counts = []
+    for offset, mode_value, _, data_len in headers:
+        if mode_value != cs_step.CSMode.MODE_2:
+            continue
+        k = _mode2_tone_count(data_len)
+        if k is not None:
+            offsets.append(offset)
+            counts.append(k)
+    return _decode_mode2_columns(data, offsets, counts)
+
+
+def _decode_mode2_columns(data: StepData, offsets: List[int], counts: List[int]) -> Mode2ToneColumns:
+    """Bulk-decode the tones of the mode-2 steps at offsets, with counts tones each."""
+    step_offsets = np.array(offsets, dtype=np.int32)
+    tone_counts = np.array(counts, dtype=np.int32)
+    step_tone_starts = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(tone_counts, out=step_tone_starts[1:])
+
+    num_tones = int(step_tone_starts[-1])
+    step_index = np.repeat(np.arange(len(counts), dtype=np.int32), tone_counts)
+    tone_in_step = np.arange(num_tones, dtype=np.int32) - step_tone_starts[:-1][step_index]
+    step_pos = step_offsets[step_index]
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    tone_pos = step_pos + STEP_HEADER_SIZE + 1 + MODE2_TONE_SIZE * tone_in_step
+    b0 = buf[tone_pos].astype(np.int16)
+    b1 = buf[tone_pos + 1].astype(np.int16)
+    b2 = buf[tone_pos + 2].astype(np.int16)
+    quality_byte = buf[tone_pos + 3]
+
+    # PCT is 24-bit little-endian: I in bits 0-11, Q in bits 12-23
+    raw_i = b0 | ((b1 & 0x0F) << 8)
+    raw_q = (b1 >> 4) | (b2 << 4)
+
+    return Mode2ToneColumns(
+        step_offsets=step_offsets,
+        step_tone_starts=step_tone_starts,
+        step_index=step_index,
+        channel=buf[step_pos + 1],
+        antenna_permutation_index=buf[step_pos + STEP_HEADER_SIZE],
+        pct_i=(raw_i ^ 0x800) - 0x800,
+        pct_q=(raw_q ^ 0x800) - 0x800,
+        quality=quality_byte & 0x0F,
+        quality_extension_slot=quality_byte >> 4,
+    )
+
+
+def mode2_tones_from_steps(steps: Sequence[cs_step.CSStep],
+                           byte_ranges: Optional[Sequence[Tuple[int, int]]] = None) -> Mode2ToneColumns:
+    """Build Mode2ToneColumns from already parsed steps, e.g. when no raw data is kept.
+
+    Args:
+        steps: Parsed steps; steps of other modes are skipped
+        byte_ranges: (start, end) byte range of every step, giving
+            step_offsets; offsets are -1 if None
+
+    Returns:
+        Mode2ToneColumns of the mode-2 steps, as decode_mode2_tones() would
+        return for their raw data
     """
-    return _parse_steps_internal(hex_data)
+    offsets = []
+    counts = []
+    tones: List[Tuple[int, int, cs_step.ToneData]] = []
+    for i, step in enumerate(steps):
+        if not isinstance(step, cs_step.CSStepMode2):
+            continue
+        offsets.append(byte_ranges[i][0] if byte_ranges is not None else -1)
+        counts.append(len(step.tones))
+        tones.extend((step.channel, step.antenna_permutation_index, tone) for tone in step.tones)
+
+    step_tone_starts = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=step_tone_starts[1:])
+    return Mode2ToneColumns(
+        step_offsets=np.array(offsets, dtype=np.int32),
+        step_tone_starts=step_tone_starts,
+        step_index=np.repeat(np.arange(len(counts), dtype=np.int32), np.array(counts, dtype=np.int32)),
+        channel=np.array([channel for channel, _, _ in tones], dtype=np.uint8),
+        antenna_permutation_index=np.array([antenna for _, antenna, _ in tones], dtype=np.uint8),
+        pct_i=np.array([tone.pct_i for _, _, tone in tones], dtype=np.int16),
+        pct_q=np.array([tone.pct_q for _, _, tone in tones], dtype=np.int16),
+        quality=np.array([tone.quality for _, _, tone in tones], dtype=np.uint8),
+        quality_extension_slot=np.array([tone.quality_extension_slot for _, _, tone in tones], dtype=np.uint8),
+    )
+
+
+class StepByteRanges(Sequence):
+    """Read-only sequence of (start, end) step byte ranges backed by an (n, 2) array."""
+
+    __slots__ = ('_ranges',)
+
+    def __init__(self, ranges: np.ndarray):
+        self._ranges = ranges
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [tuple(r) for r in self._ranges[index].tolist()]
+        start, end = self._ranges[index].tolist()
+        return start, end
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return (tuple(r) for r in self._ranges.tolist())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
 
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class StepStream(Sequence):
+    """Read-only sequence of CS steps decoded lazily from a raw step stream.
+
+    Step headers are walked and mode-2 tones decoded into Mode2ToneColumns
+    up front; enum values are validated at that point, so malformed data
+    fails on construction exactly as parse_cs_steps() would. CSStep objects
+    are only built on first item access and then cached.
+    """
+
+    __slots__ = ('data', 'mode2', '_ranges', '_steps')
+
+    def __init__(self, data: StepData, index: Optional[StepIndex] = None):
+        """
+        Args:
+            data: Raw step stream bytes or its hexadecimal string representation
+            index: Finished StepIndex of data, if already built while the
+                bytes arrived
+
+        Raises:
+            ValueError: If a step holds an invalid enum value
+        """
+        self.data = _as_step_bytes(data)
+        if index is None:
+            index = StepIndex().finish(self.data)
+        self.mode2 = _decode_mode2_columns(self.data, index.mode2_offsets, index.mode2_counts)
+        if len(self.mode2):
+            cs_step.ToneQualityIndicator(int(self.mode2.quality.max()))
+            cs_step.ToneQualityIndicatorExtensionSlot(int(self.mode2.quality_extension_slot.max()))
+        self._ranges = np.array(index.ranges, dtype=np.int32).reshape(-1, 2)
+        self._steps: Optional[List[cs_step.CSStep]] = None
+
+    @property
+    def byte_ranges(self) -> StepByteRanges:
+        """(start, end) byte offsets into data for every step, in step order."""
+        return StepByteRanges(self._ranges)
+
+    def _materialize(self) -> List[cs_step.CSStep]:
+        """Build (once) and return the CSStep objects of the stream."""
+        if self._steps is None:
+            # Every retained range is a valid mode-0 or mode-2 step, in order
+            view = memoryview(self.data)
+            mode2_step = 0
+            steps = []
+            for start, end in self._ranges.tolist():
+                if self.data[start] == cs_step.CSMode.MODE_2:
+                    steps.append(self.mode2.step(mode2_step))
+                    mode2_step += 1
+                else:
+                    steps.append(parse_mode0(view[start + STEP_HEADER_SIZE:end], self.data[start + 1]))
+            self._steps = steps
+        return self._steps
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __iter__(self) -> Iterator[cs_step.CSStep]:
+        return iter(self._materialize())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StepStream):
+            return self.data == other.data
+        if isinstance(other, Sequence):
+            return self._materialize() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._materialize())
 
 
 def parse_cs_step_from_bytes(data: bytes, mode: cs_step.CSMode, channel: int) -> cs_step.CSStep:
@@ -162,6 +536,22 @@ def parse_mode1(data: bytes, channel: int) -> cs_step.CSStepMode1:
     pass
 
 
+def _mode2_tone_count(data_len: int) -> Optional[int]:
+    """Return number of tones in a Mode 2 step payload, or None if invalid."""
+    # data_len = 1 (antenna) + k * 4 (where k is number of tones)
+    # k can be 2, 3, 4, or 5
+    if data_len < 1 or (data_len - 1) % MODE2_TONE_SIZE != 0:
+        logger.error(f"Invalid Mode 2 data length: {data_len}")
+        return None
+
+    k = (data_len - 1) // MODE2_TONE_SIZE
+    if k not in (2, 3, 4, 5):
+        logger.error(f"Invalid number of tones in Mode 2: {k}, expected 2-5")
+        return None
+
+    return k
+
+
 def parse_mode2(data: bytes, channel: int) -> cs_step.CSStepMode2:
     """Parse Mode 2 CS step data.
 
@@ -177,15 +567,8 @@ def parse_mode2(data: bytes, channel: int) -> cs_step.CSStepMode2:
         return value - 0x1000 if value >= 0x800 else value
 
 
-    # data_len = 1 (antenna) + k * 4 (where k is number of tones)
-    # k can be 2, 3, 4, or 5
-    if len(data) < 1 or (len(data) - 1) % 4 != 0:
-        logger.error(f"Invalid Mode 2 data length: {len(data)}")
-        return None
-
-    k = (len(data) - 1) // 4
-    if k not in (2, 3, 4, 5):
-        logger.error(f"Invalid number of tones in Mode 2: {k}, expected 2-5")
+    k = _mode2_tone_count(len(data))
+    if k is None:
         return None
 
     antenna_permutation_index = data[0]
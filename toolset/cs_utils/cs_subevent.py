@@ -1,7 +1,7 @@
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Optional, Sequence, Tuple
 from enum import IntEnum
-from . import cs_step
+from . import cs_step, cs_step_parser
 
 class ProcedureDoneStatus(IntEnum):
     PROC_ALL_RESULTS_COMPLETED = 0x00
@@ -28,7 +28,7 @@ class SubeventAbortReason(IntEnum):
     SUBEVENT_ABORT_UNSPECIFIED = 0x0F
 
 
-@dataclass
+@dataclass(slots=True)
 class SubeventResults:
     procedure_counter: int
     reference_power_level: int
@@ -37,10 +37,18 @@ class SubeventResults:
     procedure_abort_reason: ProcedureAbortReason
     subevent_abort_reason: SubeventAbortReason
     num_steps_reported: int
-    steps: list[cs_step.CSStep]
+    steps: Sequence[cs_step.CSStep]  # cs_step_parser.StepStream when parsed from raw_data
     measured_freq_offset: Optional[float] = None  # in 0.01 ppm. Only available on Initiator
     raw_data: Optional[bytes] = None
-    step_byte_ranges: Optional[List[Tuple[int, int]]] = None
+    step_byte_ranges: Optional[Sequence[Tuple[int, int]]] = None
+
+    def mode2_tones(self) -> cs_step_parser.Mode2ToneColumns:
+        """Return columnar mode-2 tone data without building CSStep objects."""
+        if isinstance(self.steps, cs_step_parser.StepStream):
+            return self.steps.mode2
+        if self.raw_data is None:
+            return cs_step_parser.mode2_tones_from_steps(self.steps, self.step_byte_ranges)
+        return cs_step_parser.decode_mode2_tones(self.raw_data)
 
     def __str__(self):
         return f"SubeventResults(proc:{self.procedure_counter} steps:{len(self.steps)})"
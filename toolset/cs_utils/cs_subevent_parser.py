@@ -1,11 +1,267 @@
+import binascii
 import logging
 import re
-from typing import Optional
+from dataclasses import dataclass
+from typing import List, Optional, Union
 from . import cs_step_parser
 from . import cs_subevent
 
 logger = logging.getLogger(__name__)
 
+RAW_STEP_DATA_MARKER = 'Raw step data:'
+SUBEVENT_END_MARKER = 'I: CS Subevent end'
+
+# Fixed-format firmware header lines: "I:  - <Key>: <value>"
+_HEADER_LINE_RE = re.compile(r'^I:\s+-\s+([A-Za-z][A-Za-z ]*?):\s*(-?\d+(?:\.\d+)?)', re.MULTILINE)
+_NON_HEX_RE = re.compile(r'[^0-9a-fA-F]')
+_NON_HEX_BYTES_RE = re.compile(rb'[^0-9a-fA-F]')
+_HEX_WHITESPACE = b' \t\r\n'
+
+# Header key -> SubeventHeader field name
+_HEADER_KEYS = {
+    'Procedure counter': 'procedure_counter',
+    'Measured frequency offset': 'measured_freq_offset',
+    'Procedure done status': 'procedure_done_status',
+    'Subevent done status': 'subevent_done_status',
+    'Procedure abort reason': 'procedure_abort_reason',
+    'Subevent abort reason': 'subevent_abort_reason',
+    'Reference power level': 'reference_power_level',
+    'Num steps reported': 'num_steps_reported',
+}
+
+# Mandatory header keys, in the order they are reported when missing
+_REQUIRED_KEYS = (
+    'Procedure counter',
+    'Procedure done status',
+    'Subevent done status',
+    'Procedure abort reason',
+    'Subevent abort reason',
+    'Reference power level',
+    'Num steps reported',
+)
+
+
+@dataclass
+class SubeventHeader:
+    """Header fields of a CS subevent result as printed by the firmware."""
+    procedure_counter: int
+    procedure_done_status: cs_subevent.ProcedureDoneStatus
+    subevent_done_status: cs_subevent.SubeventDoneStatus
+    procedure_abort_reason: cs_subevent.ProcedureAbortReason
+    subevent_abort_reason: cs_subevent.SubeventAbortReason
+    reference_power_level: int
+    num_steps_reported: int
+    measured_freq_offset: Optional[float] = None
+
+
+def parse_subevent_header(text_data: str) -> Optional[SubeventHeader]:
+    """Extract subevent header fields in a single pass over the header lines.
+
+    Only the text before the "Raw step data:" marker is scanned.
+
+    Args:
+        text_data: Text log data containing subevent result header
+
+    Returns:
+        SubeventHeader object or None if a mandatory field is missing
+
+    Raises:
+        ValueError: If a field holds a value outside its enumeration
+    """
+    header_end = text_data.find(RAW_STEP_DATA_MARKER)
+    if header_end == -1:
+        header_end = len(text_data)
+
+    values = {}
+    for match in _HEADER_LINE_RE.finditer(text_data, 0, header_end):
+        key = match.group(1)
+        if key in _HEADER_KEYS and key not in values:
+            values[key] = match.group(2)
+
+    for key in _REQUIRED_KEYS:
+        if key not in values:
+            logger.error(f"Could not find {key} in text data")
+            return None
+
+    measured_freq_offset = values.get('Measured frequency offset')
+
+    return SubeventHeader(
+        procedure_counter=int(values['Procedure counter']),
+        procedure_done_status=cs_subevent.ProcedureDoneStatus(int(values['Procedure done status'])),
+        subevent_done_status=cs_subevent.SubeventDoneStatus(int(values['Subevent done status'])),
+        procedure_abort_reason=cs_subevent.ProcedureAbortReason(int(values['Procedure abort reason'])),
+        subevent_abort_reason=cs_subevent.SubeventAbortReason(int(values['Subevent abort reason'])),
+        reference_power_level=int(values['Reference power level']),
+        num_steps_reported=int(values['Num steps reported']),
+        measured_freq_offset=float(measured_freq_offset) if measured_freq_offset is not None else None,
+    )
+
+
+def _find_step_hex(text_data: str) -> Optional[str]:
+    """Return the hex section following "Raw step data:", or None if absent."""
+    start = text_data.find(RAW_STEP_DATA_MARKER)
+    if start == -1:
+        return None
+    start += len(RAW_STEP_DATA_MARKER)
+
+    # Section ends at a blank line, the end marker or the end of text
+    end = len(text_data)
+    for terminator in ('\n\n', SUBEVENT_END_MARKER):
+        idx = text_data.find(terminator, start, end)
+        if idx != -1:
+            end = idx
+    return text_data[start:end]
+
+
+def decode_step_hex(hex_section: Union[str, bytes]) -> bytes:
+    """Decode hex rows of a "Raw step data:" section into step bytes.
+
+    Accepts text or raw UART bytes. Firmware prints plain hex rows; the slower
+    cleanup of other characters (e.g. comments) only runs when needed.
+
+    Raises:
+        ValueError: If the section does not hold a whole number of hex bytes
+    """
+    if isinstance(hex_section, str):
+        try:
+            return bytes.fromhex(hex_section)
+        except ValueError:
+            return bytes.fromhex(_NON_HEX_RE.sub('', hex_section))
+
+    try:
+        return binascii.unhexlify(hex_section.translate(None, _HEX_WHITESPACE))
+    except binascii.Error:
+        try:
+            return binascii.unhexlify(_NON_HEX_BYTES_RE.sub(b'', hex_section))
+        except binascii.Error as e:
+            raise ValueError(str(e)) from e
+
+
+def build_subevent_result(header: SubeventHeader, raw_data: bytes,
+                          step_index: Optional[cs_step_parser.StepIndex] = None) -> cs_subevent.SubeventResults:
+    """Combine a parsed header and decoded step bytes into SubeventResults.
+
+    Steps are decoded lazily from raw_data (see cs_step_parser.StepStream),
+    and step_byte_ranges index into that same buffer. step_index may carry
+    the finished StepIndex of raw_data.
+    """
+    steps = cs_step_parser.StepStream(raw_data, step_index)
+
+    return cs_subevent.SubeventResults(
+        procedure_counter=header.procedure_counter,
+        reference_power_level=header.reference_power_level,
+        procedure_done_status=header.procedure_done_status,
+        subevent_done_status=header.subevent_done_status,
+        procedure_abort_reason=header.procedure_abort_reason,
+        subevent_abort_reason=header.subevent_abort_reason,
+        num_steps_reported=header.num_steps_reported,
+        steps=steps,
+        measured_freq_offset=header.measured_freq_offset,
+        raw_data=raw_data,
+        step_byte_ranges=steps.byte_ranges,
+    )
+
+
+def parse_cs_subevent_parts(header_text: str, step_hex: Optional[Union[str, bytes]]) -> Optional[cs_subevent.SubeventResults]:
+    """Parse CS subevent result from separately framed header text and step hex rows.
+
+    Args:
+        header_text: Header lines of the subevent result
+        step_hex: Hex rows following "Raw step data:", or None if absent
+
+    Returns:
+        SubeventResults object or None if parsing fails
+    """
+    try:
+        header = parse_subevent_header(header_text)
+        if header is None:
+            return None
+
+        if step_hex is None:
+            if header.num_steps_reported > 0:
+                logger.error("Could not find Raw step data in text data")
+            return None
+
+        return build_subevent_result(header, decode_step_hex(step_hex))
+
+    except (ValueError, KeyError) as e:
+        logger.error(f"Error parsing text data: {e}")
+        return None
+
+
+class SubeventAssembler:
+    """Builds a subevent result from firmware lines fed as they arrive.
+
+    The header is parsed as soon as the "Raw step data:" marker is seen, and
+    every hex row is decoded and its completed steps indexed on arrival, so
+    only the bulk tone decode is left when the end marker comes in. Errors are logged and the subevent dropped,
+    as in parse_cs_subevent_parts().
+    """
+
+    __slots__ = ('_header_lines', '_header', '_step_data', '_carry', '_steps', '_failed')
+
+    def __init__(self, first_line: str):
+        self._header_lines: List[str] = [first_line]
+        self._header: Optional[SubeventHeader] = None
+        self._step_data: Optional[bytearray] = None
+        # Odd trailing hex digit of the previous row
+        self._carry = b''
+        self._steps = cs_step_parser.StepIndex()
+        self._failed = False
+
+    @property
+    def in_steps(self) -> bool:
+        """True once the "Raw step data:" marker has been seen."""
+        return self._step_data is not None
+
+    def add_header_line(self, line: str):
+        self._header_lines.append(line)
+
+    def start_steps(self):
+        """Parse the collected header and start collecting step data."""
+        self._step_data = bytearray()
+        try:
+            self._header = parse_subevent_header('\n'.join(self._header_lines))
+        except (ValueError, KeyError) as e:
+            logger.error(f"Error parsing text data: {e}")
+        self._failed = self._header is None
+
+    def add_hex_row(self, row: Union[bytes, bytearray]):
+        """Decode one hex row of step data."""
+        if self._failed:
+            return
+        digits = self._carry + row.translate(None, _HEX_WHITESPACE)
+        try:
+            self._step_data += binascii.unhexlify(digits)
+            self._carry = b''
+        except binascii.Error:
+            # Odd digit count (a byte split across rows) or non-hex characters
+            digits = _NON_HEX_BYTES_RE.sub(b'', digits)
+            whole = len(digits) & ~1
+            self._step_data += binascii.unhexlify(digits[:whole])
+            self._carry = bytes(digits[whole:])
+        self._steps.feed(self._step_data)
+
+    def finish(self) -> Optional[cs_subevent.SubeventResults]:
+        """Build the subevent once its end marker arrived.
+
+        Returns:
+            SubeventResults object or None if parsing fails
+        """
+        if self._step_data is None:
+            return parse_cs_subevent_parts('\n'.join(self._header_lines), None)
+        if self._failed:
+            return None
+        if self._carry:
+            logger.error("Error parsing text data: Odd-length hex step data")
+            return None
+        try:
+            raw_data = bytes(self._step_data)
+            return build_subevent_result(self._header, raw_data, self._steps.finish(raw_data))
+        except (ValueError, KeyError) as e:
+            logger.error(f"Error parsing text data: {e}")
+            return None
+
 
 def parse_cs_subevent_result(text_data: str) -> Optional[cs_subevent.SubeventResults]:
     """Parse CS subevent result from text log format.
@@ -30,84 +286,4 @@ def parse_cs_subevent_result(text_data: str) -> Optional[cs_subevent.SubeventRes
     Returns:
         SubeventResults object or None if parsing fails
     """
-    try:
-        # Extract procedure counter
-        match = re.search(r'Procedure counter:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Procedure counter in text data")
-            return None
-        procedure_counter = int(match.group(1))
-
-        # Extract procedure done status
-        match = re.search(r'Procedure done status:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Procedure done status in text data")
-            return None
-        procedure_done_status = cs_subevent.ProcedureDoneStatus(int(match.group(1)))
-
-        # Extract subevent done status
-        match = re.search(r'Subevent done status:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Subevent done status in text data")
-            return None
-        subevent_done_status = cs_subevent.SubeventDoneStatus(int(match.group(1)))
-
-        # Extract procedure abort reason
-        match = re.search(r'Procedure abort reason:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Procedure abort reason in text data")
-            return None
-        procedure_abort_reason = cs_subevent.ProcedureAbortReason(int(match.group(1)))
-
-        # Extract subevent abort reason
-        match = re.search(r'Subevent abort reason:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Subevent abort reason in text data")
-            return None
-        subevent_abort_reason = cs_subevent.SubeventAbortReason(int(match.group(1)))
-
-        # Extract reference power level
-        match = re.search(r'Reference power level:\s*(-?\d+)', text_data)
-        if not match:
-            logger.error("Could not find Reference power level in text data")
-            return None
-        reference_power_level = int(match.group(1))
-
-        # Extract num steps reported
-        match = re.search(r'Num steps reported:\s*(\d+)', text_data)
-        if not match:
-            logger.error("Could not find Num steps reported in text data")
-            return None
-        num_steps_reported = int(match.group(1))
-
-        # Extract raw step data (hex string)
-        # Find "Raw step data:" and collect all hex data after it, but stop before end marker
-        match = re.search(r'Raw step data:(.+?)(?:\n\n|I: CS Subevent end|\Z)', text_data, re.DOTALL)
-        if not match:
-            if num_steps_reported > 0:
-                logger.error("Could not find Raw step data in text data")
-            return None
-
-        # Extract hex data, removing comments, whitespace, and non-hex characters
-        hex_section = match.group(1)
-        hex_data = re.sub(r'[^0-9a-fA-F]', '', hex_section)
-
-        # Parse steps using cs_step_parser
-        steps, step_byte_ranges = cs_step_parser.parse_cs_steps_with_ranges(hex_data)
-
-        return cs_subevent.SubeventResults(
-            procedure_counter=procedure_counter,
-            reference_power_level=reference_power_level,
-            procedure_done_status=procedure_done_status,
-            subevent_done_status=subevent_done_status,
-            procedure_abort_reason=procedure_abort_reason,
-            subevent_abort_reason=subevent_abort_reason,
-            num_steps_reported=num_steps_reported,
-            steps=steps,
-            raw_data=bytes.fromhex(hex_data),
-            step_byte_ranges=step_byte_ranges,
-        )
-
-    except (ValueError, KeyError) as e:
-        logger.error(f"Error parsing text data: {e}")
-        return None
+    return parse_cs_subevent_parts(text_data, _find_step_hex(text_data))
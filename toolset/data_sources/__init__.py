@@ -3,5 +3,11 @@
 from .base import DataSource
 from .events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent
 from .file_source import FileDataSource
+from .binary_capture import BinaryDataSource, BinaryCaptureWriter
+from .parse_cache import ParseCache
+from .paced_source import PacedDataSource, ReplayClock
+from .follow_source import FollowFileDataSource
 
-__all__ = ['DataSource', 'CSEvent', 'StatusEvent', 'CapabilitiesEvent', 'SubeventResultEvent', 'FileDataSource']
+__all__ = ['DataSource', 'CSEvent', 'StatusEvent', 'CapabilitiesEvent', 'SubeventResultEvent', 'FileDataSource',
+           'BinaryDataSource', 'BinaryCaptureWriter', 'ParseCache',
+           'PacedDataSource', 'ReplayClock', 'FollowFileDataSource']
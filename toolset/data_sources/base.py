@@ -1,7 +1,15 @@
+import asyncio
+import concurrent.futures
 from abc import ABC, abstractmethod
-from typing import Iterator
+from threading import Event, Thread
+from typing import AsyncIterator, Iterator
 from toolset.data_sources.events import CSEvent
 
+# Events a threaded aread() may buffer ahead of its consumer
+_AREAD_QUEUE_SIZE = 100
+# Interval at which a blocked aread() thread checks that its loop still runs
+_AREAD_POLL_S = 0.1
+
 _STATUS_MARKERS = {
     'connection': 'Connected to',
     'encryption': 'Security changed',
@@ -23,7 +31,69 @@ class DataSource(ABC):
         """
         pass
 
+    async def aread(self) -> AsyncIterator[CSEvent]:
+        """
+        Async counterpart of read(), yielding the same CSEvent objects.
+        This default runs read() in a helper thread; sources that can wait
+        without blocking the event loop override it.
+        """
+        async for event in _aread_in_thread(self):
+            yield event
+
     @abstractmethod
     def close(self):
         """Clean up resources."""
         pass
+
+
+async def _aread_in_thread(source: DataSource) -> AsyncIterator[CSEvent]:
+    """Iterate source.read() in a thread, with back-pressure from the consumer."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=_AREAD_QUEUE_SIZE)
+    stopped = Event()
+    done = object()
+
+    def _put(item) -> bool:
+        try:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        except RuntimeError:
+            # Event loop closed
+            return False
+        while True:
+            try:
+                future.result(timeout=_AREAD_POLL_S)
+                return True
+            except concurrent.futures.TimeoutError:
+                # A stopped loop never runs the put, nor the consumer's cleanup
+                if stopped.is_set() or not loop.is_running():
+                    future.cancel()
+                    return False
+            except concurrent.futures.CancelledError:
+                # Consumer gone
+                return False
+
+    def _produce():
+        try:
+            for event in source.read():
+                if stopped.is_set() or not _put(event):
+                    return
+        except Exception as e:
+            _put(e)
+        finally:
+            if not stopped.is_set():
+                _put(done)
+
+    Thread(target=_produce, name=f'{type(source).__name__}-aread', daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        # Release a producer blocked on a full queue
+        while not queue.empty():
+            queue.get_nowait()
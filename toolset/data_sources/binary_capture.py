@@ -0,0 +1,295 @@
+"""Compact binary container for recording and replaying CS data.
+
+Layout:
+    file header:  MAGIC (8 bytes) + format version (u16, little-endian)
+    records:      type (u8) + payload length (u32, little-endian) + payload
+
+Records carry status keys, capabilities text, procedure parameters and
+subevents (fixed header fields followed by the raw step bytes). Records are
+self-delimiting, so a capture can be appended to; a record cut short by an
+interrupted write is ignored on replay.
+"""
+
+import os
+import struct
+import sys
+import time
+from typing import BinaryIO, Iterator, Optional, Tuple
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent, ProcedureParamsEvent
+from toolset.cs_utils import cs_subevent
+from toolset.cs_utils.cs_subevent_parser import SubeventHeader, build_subevent_result
+from toolset.data_sources.log_stream import SUBEVENTS_PARSED, SUBEVENT_PARSE_TIME
+from toolset.data_sources.log_writer import BackgroundLogWriter
+
+CAPTURE_SUFFIX = '.cscap'
+MAGIC = b'WAVESCAP'
+FORMAT_VERSION = 1
+
+RECORD_STATUS = 1
+RECORD_CAPABILITIES = 2
+RECORD_PROCEDURE_PARAMS = 3
+RECORD_SUBEVENT = 4
+
+_FILE_HEADER = struct.Struct('<8sH')
+_RECORD_HEADER = struct.Struct('<BI')
+_PROCEDURE_PARAMS = struct.Struct('<II')
+# procedure_counter, reference_power_level, procedure/subevent done status,
+# procedure/subevent abort reason, num_steps_reported, has_freq_offset, freq_offset
+_SUBEVENT_HEADER = struct.Struct('<IbBBBBHBd')
+
+
+def is_binary_capture(filepath: str) -> bool:
+    """Return True if the file starts with the capture magic."""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def encode_event(event: CSEvent) -> Optional[bytes]:
+    """Encode one event as a framed record, or None for unsupported events."""
+    if isinstance(event, StatusEvent):
+        record_type, payload = RECORD_STATUS, event.key.encode('utf-8')
+    elif isinstance(event, CapabilitiesEvent):
+        record_type, payload = RECORD_CAPABILITIES, event.text.encode('utf-8')
+    elif isinstance(event, ProcedureParamsEvent):
+        record_type = RECORD_PROCEDURE_PARAMS
+        payload = _PROCEDURE_PARAMS.pack(event.connection_interval_ms, event.procedure_interval)
+    elif isinstance(event, SubeventResultEvent):
+        record_type, payload = RECORD_SUBEVENT, _encode_subevent(event.subevent)
+    else:
+        return None
+    return _RECORD_HEADER.pack(record_type, len(payload)) + payload
+
+
+def _encode_subevent(subevent: cs_subevent.SubeventResults) -> bytes:
+    has_freq_offset = subevent.measured_freq_offset is not None
+    header = _SUBEVENT_HEADER.pack(
+        subevent.procedure_counter,
+        subevent.reference_power_level,
+        subevent.procedure_done_status,
+        subevent.subevent_done_status,
+        subevent.procedure_abort_reason,
+        subevent.subevent_abort_reason,
+        subevent.num_steps_reported,
+        has_freq_offset,
+        subevent.measured_freq_offset if has_freq_offset else 0.0,
+    )
+    return header + (subevent.raw_data or b'')
+
+
+def _decode_subevent_header(payload: bytes) -> SubeventHeader:
+    (procedure_counter, reference_power_level, procedure_done_status, subevent_done_status,
+     procedure_abort_reason, subevent_abort_reason, num_steps_reported,
+     has_freq_offset, measured_freq_offset) = _SUBEVENT_HEADER.unpack_from(payload)
+    return SubeventHeader(
+        procedure_counter=procedure_counter,
+        procedure_done_status=cs_subevent.ProcedureDoneStatus(procedure_done_status),
+        subevent_done_status=cs_subevent.SubeventDoneStatus(subevent_done_status),
+        procedure_abort_reason=cs_subevent.ProcedureAbortReason(procedure_abort_reason),
+        subevent_abort_reason=cs_subevent.SubeventAbortReason(subevent_abort_reason),
+        reference_power_level=reference_power_level,
+        num_steps_reported=num_steps_reported,
+        measured_freq_offset=measured_freq_offset if has_freq_offset else None,
+    )
+
+
+def decode_record(record_type: int, payload: bytes) -> Optional[CSEvent]:
+    """Decode a record payload into an event, or None for unknown record types."""
+    if record_type == RECORD_STATUS:
+        return StatusEvent(payload.decode('utf-8'))
+    if record_type == RECORD_CAPABILITIES:
+        return CapabilitiesEvent(payload.decode('utf-8'))
+    if record_type == RECORD_PROCEDURE_PARAMS:
+        connection_interval_ms, procedure_interval = _PROCEDURE_PARAMS.unpack(payload)
+        return ProcedureParamsEvent(connection_interval_ms=connection_interval_ms, procedure_interval=procedure_interval)
+    if record_type == RECORD_SUBEVENT:
+        start = time.perf_counter()
+        header = _decode_subevent_header(payload)
+        subevent = build_subevent_result(header, payload[_SUBEVENT_HEADER.size:])
+        SUBEVENT_PARSE_TIME.record(time.perf_counter() - start)
+        SUBEVENTS_PARSED.add()
+        return SubeventResultEvent(subevent)
+    return None
+
+
+class BinaryCaptureWriter:
+    """Appends events to a binary capture file."""
+
+    def __init__(self, filepath: str, background: bool = False):
+        """
+        Args:
+            filepath: Path to the capture file, appended to if it exists. A
+                record cut short by an earlier session is truncated away
+                first, so new records stay readable
+            background: Write records from a BackgroundLogWriter thread, so
+                write_event() never touches the disk; records are dropped
+                whole if the disk cannot keep up
+
+        Raises:
+            ValueError: If the existing file is not a capture of this format version
+        """
+        self.filepath = filepath
+        self._handle: Optional[BinaryIO] = open(filepath, 'ab')
+        try:
+            end = _complete_end(filepath)
+        except ValueError:
+            self._handle.close()
+            raise
+        if end < self._handle.tell():
+            print(f"{filepath}: discarding {self._handle.tell() - end} bytes of an incomplete record before appending")
+            self._handle.truncate(end)
+            self._handle.seek(end)
+        if end == 0:
+            self._handle.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION))
+        self.log_writer: Optional[BackgroundLogWriter] = BackgroundLogWriter(self._handle) if background else None
+
+    def write_event(self, event: CSEvent):
+        """Append one event. Events without a record type are ignored."""
+        record = encode_event(event)
+        if record is None or not self._handle:
+            return
+        if self.log_writer is not None:
+            self.log_writer.write(record)
+        else:
+            self._handle.write(record)
+
+    def flush(self):
+        # A background writer flushes after every batch
+        if self._handle and self.log_writer is None:
+            self._handle.flush()
+
+    def close(self):
+        if self.log_writer is not None:
+            # Writes what is queued and closes the handle
+            self.log_writer.close()
+            self._handle = None
+        if self._handle:
+            try:
+                self._handle.close()
+            except OSError:
+                pass
+            self._handle = None
+
+
+class BinaryDataSource(DataSource):
+    """Replays CS data from a binary capture file."""
+
+    def __init__(
+        self,
+        filepath: str,
+        counter_range: Optional[Tuple[int, int]] = None,
+        seek_counter: Optional[int] = None,
+    ):
+        """
+        Args:
+            filepath: Path to the capture file
+            counter_range: Only replay subevents with procedure counter in
+                this inclusive (first, last) range
+            seek_counter: Skip subevents before the first one with this
+                procedure counter
+        """
+        self.filepath = filepath
+        self.counter_range = counter_range
+        self.seek_counter = seek_counter
+
+    def read(self) -> Iterator[CSEvent]:
+        """Yield events in capture order."""
+        seeking = self.seek_counter is not None
+        with open(self.filepath, 'rb') as f:
+            magic, version = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.filepath} is not a CS capture file")
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Unsupported CS capture version {version} in {self.filepath}")
+
+            for record_type, payload in _read_records(f):
+                if record_type == RECORD_SUBEVENT:
+                    # Filter on the counter before building SubeventResults
+                    (counter,) = struct.unpack_from('<I', payload)
+                    if seeking:
+                        if counter != self.seek_counter:
+                            continue
+                        seeking = False
+                    if self.counter_range is not None and not (self.counter_range[0] <= counter <= self.counter_range[1]):
+                        continue
+                event = decode_record(record_type, payload)
+                if event is not None:
+                    yield event
+
+    def close(self):
+        pass
+
+
+def _complete_end(filepath: str) -> int:
+    """Return the offset after the last complete record of a capture, 0 if it has no valid file header.
+
+    Raises:
+        ValueError: If the file is not a capture of this format version
+    """
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        header = f.read(_FILE_HEADER.size)
+        if len(header) < _FILE_HEADER.size:
+            # Empty, or interrupted while writing the file header
+            if MAGIC.startswith(header[:len(MAGIC)]):
+                return 0
+            raise ValueError(f"{filepath} is not a CS capture file")
+        magic, version = _FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} is not a CS capture file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Cannot append to CS capture version {version} in {filepath}")
+
+        end = f.tell()
+        while end + _RECORD_HEADER.size <= size:
+            _, length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+            if end + _RECORD_HEADER.size + length > size:
+                break
+            end += _RECORD_HEADER.size + length
+            f.seek(end)
+        return end
+
+
+def _read_records(f: BinaryIO) -> Iterator[Tuple[int, bytes]]:
+    while True:
+        header = f.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            return
+        record_type, length = _RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            # Truncated final record from an interrupted write
+            return
+        yield record_type, payload
+
+
+def convert_text_log(text_path: str, capture_path: str) -> int:
+    """Convert a text UART log into a binary capture. Returns number of records written."""
+    from toolset.data_sources.file_source import FileDataSource
+
+    if os.path.exists(capture_path):
+        os.remove(capture_path)
+    writer = BinaryCaptureWriter(capture_path)
+    count = 0
+    try:
+        for event in FileDataSource(text_path).read():
+            writer.write_event(event)
+            count += 1
+    finally:
+        writer.close()
+    return count
+
+
+if __name__ == '__main__':
+    # Convert text logs: python3 -m toolset.data_sources.binary_capture LOG [OUTPUT]
+    if len(sys.argv) not in (2, 3):
+        print(f"usage: {sys.argv[0]} LOG [OUTPUT]")
+        sys.exit(2)
+    source_path = sys.argv[1]
+    output_path = sys.argv[2] if len(sys.argv) == 3 else os.path.splitext(source_path)[0] + CAPTURE_SUFFIX
+    records = convert_text_log(source_path, output_path)
+    print(f"{output_path}: {records} records, {os.path.getsize(output_path)} bytes "
+          f"(text log {os.path.getsize(source_path)} bytes)")
@@ -0,0 +1,53 @@
+"""Transparent compression of text logs.
+
+Logs compressed with gzip, bzip2 or xz are recognised by their magic bytes,
+whatever their file name, and are decompressed as a stream while reading.
+"""
+
+import bz2
+import gzip
+import lzma
+from typing import BinaryIO, Optional, TextIO
+
+COMPRESSIONS = ('gz', 'bz2', 'xz')
+
+_MAGIC = {
+    'gz': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+}
+_OPENERS = {
+    'gz': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+
+def compression_of(filepath: str) -> Optional[str]:
+    """Return the compression format of a file ('gz', 'bz2' or 'xz'), or None."""
+    try:
+        with open(filepath, 'rb') as f:
+            head = f.read(max(len(magic) for magic in _MAGIC.values()))
+    except OSError:
+        return None
+    for compression, magic in _MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_log(filepath: str) -> TextIO:
+    """Open a text log for reading, decompressing it on the fly if needed."""
+    compression = compression_of(filepath)
+    if compression is None:
+        return open(filepath)
+    return _OPENERS[compression](filepath, 'rt', encoding='utf-8', errors='replace')
+
+
+def open_log_writer(filepath: str, compression: Optional[str] = None) -> BinaryIO:
+    """Open a raw log for writing, compressing it with the given format if any."""
+    if compression is None:
+        return open(filepath, 'wb')
+    if compression not in _OPENERS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {COMPRESSIONS}")
+    return _OPENERS[compression](filepath, 'wb')
@@ -1,69 +1,286 @@
+import mmap
+import multiprocessing
 import re
-from typing import Iterator
-from toolset.data_sources.base import DataSource, _STATUS_MARKERS
-from toolset.data_sources.events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, TextIO, Tuple
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.binary_capture import BinaryDataSource
+from toolset.data_sources.compression import compression_of, open_log
+from toolset.data_sources.events import CSEvent, SubeventResultEvent
+from toolset.data_sources.log_index import LogIndex, load_log_index
+from toolset.data_sources.log_stream import (
+    LogStreamParser, CONNECTION_INTERVAL_MARKER, SUBEVENT_START_MARKER, SUBEVENTS_PARSED, SUBEVENT_PARSE_TIME,
+    _CONNECTION_INTERVAL_RE,
+)
+from toolset.data_sources.parse_cache import ParseCache
 from toolset.cs_utils.cs_subevent_parser import parse_cs_subevent_result
+from toolset.stats import Histogram
+
+# Target size of the log chunks handed to parse workers
+PARALLEL_CHUNK_BYTES = 1 << 20
+# Connection interval lines, searched in the raw bytes of uncompressed logs
+_CONNECTION_INTERVAL_BYTES_RE = re.compile(_CONNECTION_INTERVAL_RE.pattern.encode())
 
 
 class FileDataSource(DataSource):
-    """Reads CS data from log file."""
+    """Reads CS data from log file.
+
+    The file is streamed line by line; events are yielded in file order as
+    soon as they are complete. When counter_range or seek_counter is given,
+    a byte-offset index (see log_index) is used to parse only the selected
+    subevent blocks. When workers is given, a full replay is split at
+    subevent block boundaries and the chunks are parsed in a process pool;
+    events are still yielded in file order. With a ParseCache, a full parse
+    is stored as a binary capture and later replays of the unchanged file
+    are read from it.
+
+    gzip, bzip2 and xz compressed logs are decompressed as a stream. They
+    cannot be indexed, so counter_range/seek_counter filter the stream
+    instead, and parallel parsing ships decompressed text to the workers.
+    """
 
-    def __init__(self, filepath: str):
+    def __init__(
+        self,
+        filepath: str,
+        counter_range: Optional[Tuple[int, int]] = None,
+        seek_counter: Optional[int] = None,
+        workers: Optional[int] = None,
+        cache: Optional[ParseCache] = None,
+    ):
+        """
+        Args:
+            filepath: Path to the log file
+            counter_range: Only replay subevents with procedure counter in
+                this inclusive (first, last) range
+            seek_counter: Start replay at the first subevent with this
+                procedure counter
+            workers: Number of parse processes for a full replay, or None to
+                parse in the calling thread
+            cache: Parse cache to replay from and populate
+        """
         self.filepath = filepath
+        self.counter_range = counter_range
+        self.seek_counter = seek_counter
+        self.workers = workers
+        self.cache = cache
 
     def read(self) -> Iterator[CSEvent]:
         """Yield events from file."""
-        with open(self.filepath) as f:
-            raw_text = f.read()
+        if self.cache is None:
+            yield from self._read_log()
+            return
+
+        entry = self.cache.entry_path(self.filepath)
+        if self.cache.lookup(entry):
+            yield from BinaryDataSource(entry, counter_range=self.counter_range, seek_counter=self.seek_counter).read()
+        elif self.counter_range is None and self.seek_counter is None:
+            yield from self.cache.record(entry, self.filepath, self._read_log())
+        else:
+            # Partial replays are not cached
+            yield from self._read_log()
+
+    def _read_log(self) -> Iterator[CSEvent]:
+        """Parse the text log itself."""
+        compressed = compression_of(self.filepath) is not None
+        if self.counter_range is not None or self.seek_counter is not None:
+            if compressed:
+                yield from self._read_filtered()
+            else:
+                yield from self._read_indexed()
+            return
+        if self.workers is not None:
+            yield from self._read_parallel(compressed)
+            return
+        yield from self._read_sequential()
 
-        yield from _parse_log_lines(raw_text)
+    def _read_sequential(self) -> Iterator[CSEvent]:
+        """Parse the log line by line in the calling thread."""
+        parser = LogStreamParser()
+        with open_log(self.filepath) as f:
+            for line in _log_lines(f, self.filepath):
+                yield from parser.feed_line(line.rstrip('\r\n'))
+        yield from parser.finish()
 
-        for subevent in _parse_subevents(raw_text):
-            if subevent is not None:
-                yield SubeventResultEvent(subevent)
+    def _read_filtered(self) -> Iterator[CSEvent]:
+        """Stream the whole log, dropping subevents outside counter_range/seek_counter."""
+        seeking = self.seek_counter is not None
+        for event in self._read_sequential():
+            if isinstance(event, SubeventResultEvent):
+                counter = event.subevent.procedure_counter
+                if seeking:
+                    if counter != self.seek_counter:
+                        continue
+                    seeking = False
+                if self.counter_range is not None and not (self.counter_range[0] <= counter <= self.counter_range[1]):
+                    continue
+            yield event
+
+    def _read_indexed(self) -> Iterator[CSEvent]:
+        """Yield setup events before the first subevent, then the selected subevents."""
+        index = load_log_index(self.filepath)
+        if index.size == 0:
+            return
+
+        with open(self.filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Status, capabilities and procedure params precede the first block
+            preamble_end = index.first_offset()
+            parser = LogStreamParser()
+            preamble = mm[:preamble_end if preamble_end is not None else len(mm)]
+            for line in preamble.decode('utf-8', errors='replace').splitlines():
+                yield from parser.feed_line(line)
+            yield from parser.finish()
+
+            spans = index.block_spans(len(mm))
+            for i in index.select(self.counter_range, self.seek_counter):
+                _, start, end = spans[i]
+                parse_start = time.perf_counter()
+                subevent = parse_cs_subevent_result(mm[start:end].decode('utf-8', errors='replace'))
+                if subevent is not None:
+                    SUBEVENT_PARSE_TIME.record(time.perf_counter() - parse_start)
+                    SUBEVENTS_PARSED.add()
+                    yield SubeventResultEvent(subevent)
+
+    def _read_parallel(self, compressed: bool) -> Iterator[CSEvent]:
+        """Parse chunks of whole subevent blocks in worker processes, yielding in file order."""
+        # spawn: the caller may be running GUI and producer threads
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        pending = deque()
+        f = None
+        try:
+            if compressed:
+                # Workers cannot seek into the stream; decompress here and ship text
+                f = open_log(self.filepath)
+                jobs = ((_parse_log_text, chunk, interval)
+                        for chunk, interval in _text_chunks(_log_lines(f, self.filepath), PARALLEL_CHUNK_BYTES))
+            else:
+                # The index is only kept in memory; sidecar files are written for --seek/--counter-range
+                bounds = _chunk_bounds(load_log_index(self.filepath, save=False), PARALLEL_CHUNK_BYTES)
+                intervals = _connection_intervals_at(self.filepath, [start for start, _ in bounds])
+                jobs = ((_parse_log_chunk, self.filepath, start, end, interval)
+                        for (start, end), interval in zip(bounds, intervals))
+            for job in jobs:
+                pending.append(pool.submit(*job))
+                # Bound the parsed-but-unconsumed events held in memory
+                if len(pending) >= 2 * self.workers:
+                    yield from _chunk_events(pending.popleft().result())
+            while pending:
+                yield from _chunk_events(pending.popleft().result())
+        finally:
+            if f is not None:
+                f.close()
+            pool.shutdown(cancel_futures=True)
 
     def close(self):
         pass
 
 
-def _parse_log_lines(text: str) -> Iterator[CSEvent]:
-    """Scan log text for status markers and capabilities."""
-    collecting_capabilities = False
-    capabilities_lines: list[str] = []
+def _chunk_bounds(index: LogIndex, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """Split a log into (start, end) byte ranges that begin at subevent block boundaries.
 
-    for line in text.splitlines():
-        for key, marker in _STATUS_MARKERS.items():
-            markers = marker if isinstance(marker, tuple) else (marker,)
-            if any(m in line for m in markers):
-                yield StatusEvent(key)
-
-        if collecting_capabilities:
-            if 'I:  - ' in line:
-                capabilities_lines.append(line.split('I:  - ', 1)[1])
-            else:
-                if capabilities_lines:
-                    yield CapabilitiesEvent('\n'.join(capabilities_lines))
-                collecting_capabilities = False
-                capabilities_lines = []
+    The first chunk also holds everything before the first block (status,
+    capabilities and procedure parameters).
+    """
+    bounds = []
+    start = 0
+    for _, offset in index.entries:
+        if offset - start >= chunk_bytes:
+            bounds.append((start, offset))
+            start = offset
+    if index.size > start:
+        bounds.append((start, index.size))
+    return bounds
+
+
+def _connection_intervals_at(filepath: str, offsets: List[int]) -> List[Optional[int]]:
+    """Return the connection interval logged before each of the ascending byte offsets.
+
+    Procedure parameters combine it with a later procedure interval line,
+    which may fall into another parse chunk.
+    """
+    intervals = []
+    current = None
+    if not offsets:
+        return intervals
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        matches = _CONNECTION_INTERVAL_BYTES_RE.finditer(mm)
+        match = next(matches, None)
+        for offset in offsets:
+            while match is not None and match.start() < offset:
+                current = int(match.group(1))
+                match = next(matches, None)
+            intervals.append(current)
+    return intervals
+
+
+def _log_lines(f: TextIO, filepath: str) -> Iterator[str]:
+    """Iterate lines of an open log, ending quietly at a truncated compressed stream."""
+    try:
+        yield from f
+    except EOFError:
+        # e.g. a compressed UART log whose recording was interrupted
+        print(f"{filepath}: compressed stream ended early, replaying data up to that point")
 
-        if _STATUS_MARKERS['cs_capabilities'] in line:
-            collecting_capabilities = True
-            capabilities_lines = []
 
-    if capabilities_lines:
-        yield CapabilitiesEvent('\n'.join(capabilities_lines))
+def _text_chunks(lines: Iterator[str], chunk_size: int) -> Iterator[Tuple[str, Optional[int]]]:
+    """Group log lines into text chunks of about chunk_size that start at subevent blocks.
 
+    Yields:
+        (chunk text, connection interval logged before the chunk)
+    """
+    chunk = []
+    size = 0
+    interval = None
+    chunk_interval = None
+    for line in lines:
+        if size >= chunk_size and SUBEVENT_START_MARKER in line:
+            yield ''.join(chunk), chunk_interval
+            chunk = []
+            size = 0
+            chunk_interval = interval
+        chunk.append(line)
+        size += len(line)
+        if CONNECTION_INTERVAL_MARKER in line:
+            match = _CONNECTION_INTERVAL_RE.search(line)
+            if match:
+                interval = int(match.group(1))
+    if chunk:
+        yield ''.join(chunk), chunk_interval
 
-def _parse_subevents(text: str):
-    """Extract CS Subevent blocks from log text and parse them."""
-    pattern = r'(?=I: CS Subevent result received:)'
-    blocks = re.split(pattern, text)
 
-    for block in blocks:
-        if not block.strip() or 'CS Subevent result received:' not in block:
-            continue
+def _chunk_events(result: Tuple[List[CSEvent], Histogram]) -> List[CSEvent]:
+    """Record a worker's parse statistics in this process' STATS and return its events."""
+    events, parse_times = result
+    SUBEVENTS_PARSED.add(parse_times.count)
+    SUBEVENT_PARSE_TIME.merge(parse_times)
+    return events
 
-        next_marker = block.find('I: CS Subevent result received:', 1)
-        subevent_text = block[:next_marker] if next_marker != -1 else block
 
-        yield parse_cs_subevent_result(subevent_text)
+def _parse_log_chunk(filepath: str, start: int, end: int,
+                     connection_interval_ms: Optional[int] = None) -> Tuple[List[CSEvent], Histogram]:
+    """Parse log bytes [start, end) into events. Runs in a worker process."""
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='replace')
+    return _parse_log_text(text, connection_interval_ms)
+
+
+def _parse_log_text(text: str, connection_interval_ms: Optional[int] = None) -> Tuple[List[CSEvent], Histogram]:
+    """Parse a chunk of log text into events. Runs in a worker process.
+
+    Args:
+        text: Log text starting at a line boundary
+        connection_interval_ms: Connection interval logged before the chunk
+
+    Returns:
+        Tuple of (events, parse time of every subevent of the chunk); the
+        worker's STATS never reach the parent otherwise
+    """
+    SUBEVENT_PARSE_TIME.reset()
+    parser = LogStreamParser(connection_interval_ms)
+    events = []
+    for line in text.splitlines():
+        events.extend(parser.feed_line(line))
+    events.extend(parser.finish())
+    return events, SUBEVENT_PARSE_TIME
@@ -0,0 +1,172 @@
+"""Tail-follow reader for CS logs that are still being written.
+
+FollowFileDataSource reads a log like `tail -f`: complete lines are fed to a
+LogStreamParser that is kept across reads, so a subevent block split over
+several appends is emitted once its end marker arrives. At end of file it
+waits for the file to change using inotify (Linux, through libc) or a cheap
+stat poll, and starts over when the file is truncated or replaced.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+from threading import Event
+from typing import BinaryIO, Iterator, Optional
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.events import CSEvent
+from toolset.data_sources.log_stream import LogStreamParser
+
+FOLLOW_MODES = ('auto', 'inotify', 'poll')
+
+_READ_SIZE = 64 * 1024
+# Upper bound on a single wait, so stop requests are noticed
+_MAX_WAIT_S = 0.2
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_DELETE_SELF | _IN_MOVE_SELF
+
+
+class _InotifyWatch:
+    """inotify watch on a single file, via libc (Linux only)."""
+
+    def __init__(self, filepath: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        if libc.inotify_add_watch(self._fd, os.fsencode(filepath), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, os.strerror(errno), filepath)
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for a change. Returns True if one was seen."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        # Drain queued events; only the wakeup matters
+        try:
+            while os.read(self._fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class FollowFileDataSource(DataSource):
+    """Reads CS data from a log file that is still being written."""
+
+    def __init__(self, filepath: str, mode: str = 'auto', poll_interval: float = 0.05):
+        """
+        Args:
+            filepath: Path to the log file; it may not exist yet
+            mode: 'inotify' to wake on file change notifications, 'poll' to
+                stat the file every poll_interval, 'auto' for inotify with
+                fallback to polling
+            poll_interval: Seconds between checks in poll mode
+        """
+        if mode not in FOLLOW_MODES:
+            raise ValueError(f"Unknown follow mode {mode!r}, expected one of {FOLLOW_MODES}")
+        self.filepath = filepath
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self._stop_event: Optional[Event] = None
+        self._closed = Event()
+
+    def set_stop_event(self, stop_event: Event):
+        """Provide a threading.Event that signals the read loop to exit."""
+        self._stop_event = stop_event
+
+    def _stopped(self) -> bool:
+        return self._closed.is_set() or (self._stop_event is not None and self._stop_event.is_set())
+
+    def read(self) -> Iterator[CSEvent]:
+        """Yield events as lines are appended to the file, until closed."""
+        f = watch = None
+        try:
+            while not self._stopped():
+                # (Re)open; the watch is set up first so no append is missed
+                watch = self._watch()
+                f = self._open()
+                if f is not None:
+                    yield from self._follow(f, watch)
+                    f.close()
+                    f = None
+                else:
+                    self._wait(watch)
+                if watch is not None:
+                    watch.close()
+                    watch = None
+        finally:
+            if f is not None:
+                f.close()
+            if watch is not None:
+                watch.close()
+
+    def _follow(self, f: BinaryIO, watch: Optional[_InotifyWatch]) -> Iterator[CSEvent]:
+        """Read one file until stopped or until it is truncated or replaced."""
+        parser = LogStreamParser()
+        pending = bytearray()
+        while not self._stopped():
+            chunk = f.read(_READ_SIZE)
+            if chunk:
+                pending += chunk
+                end = pending.rfind(b'\n')
+                if end < 0:
+                    continue
+                text = pending[:end].decode('utf-8', errors='replace')
+                del pending[:end + 1]
+                # A partial last line stays pending; open blocks stay in parser
+                for line in text.split('\n'):
+                    yield from parser.feed_line(line.rstrip('\r'))
+                continue
+
+            if self._replaced(f):
+                return
+            self._wait(watch)
+
+    def _open(self) -> Optional[BinaryIO]:
+        try:
+            return open(self.filepath, 'rb', buffering=0)
+        except FileNotFoundError:
+            return None
+
+    def _watch(self) -> Optional[_InotifyWatch]:
+        if self.mode == 'poll' or not sys.platform.startswith('linux'):
+            return None
+        try:
+            return _InotifyWatch(self.filepath)
+        except OSError as e:
+            if self.mode == 'inotify' and not isinstance(e, FileNotFoundError):
+                raise
+            return None
+
+    def _replaced(self, f: BinaryIO) -> bool:
+        """Return True if the path now refers to another file or the file shrank."""
+        try:
+            stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            return False
+        opened = os.fstat(f.fileno())
+        return (stat.st_ino, stat.st_dev) != (opened.st_ino, opened.st_dev) or stat.st_size < f.tell()
+
+    def _wait(self, watch: Optional[_InotifyWatch]):
+        if watch is not None:
+            watch.wait(_MAX_WAIT_S)
+        else:
+            self._closed.wait(min(self.poll_interval, _MAX_WAIT_S))
+
+    def close(self):
+        self._closed.set()
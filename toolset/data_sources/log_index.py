@@ -0,0 +1,140 @@
+"""Byte-offset index of subevent blocks in recorded CS logs.
+
+The index maps every "CS Subevent result received" block to its byte offset
+so a log can be replayed from any procedure counter without parsing what
+comes before it. It is stored next to the log as a JSON sidecar file and
+rebuilt when the log's size or modification time changes.
+"""
+
+import json
+import mmap
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+INDEX_SUFFIX = '.idx'
+INDEX_VERSION = 1
+
+_START_MARKER = b'I: CS Subevent result received:'
+_COUNTER_RE = re.compile(rb'Procedure counter:\s*(\d+)')
+# Header lines before the counter are short; bound the search per block
+_COUNTER_SEARCH_LEN = 256
+
+
+@dataclass
+class LogIndex:
+    """Subevent block offsets of one log file, in file order."""
+    size: int
+    mtime_ns: int
+    entries: List[Tuple[int, int]]  # (procedure_counter, byte_offset)
+
+    def block_spans(self, file_size: int) -> List[Tuple[int, int, int]]:
+        """Return (procedure_counter, start, end) byte spans of all blocks."""
+        ends = [offset for _, offset in self.entries[1:]] + [file_size]
+        return [(counter, offset, end) for (counter, offset), end in zip(self.entries, ends)]
+
+    def first_offset(self) -> Optional[int]:
+        return self.entries[0][1] if self.entries else None
+
+    def select(self, counter_range: Optional[Tuple[int, int]] = None, seek_counter: Optional[int] = None) -> List[int]:
+        """Return positions in entries of the blocks to replay.
+
+        Args:
+            counter_range: Inclusive (first, last) procedure counters
+            seek_counter: Start at the first block with this counter and
+                replay everything after it
+
+        Returns:
+            Entry positions in file order
+        """
+        positions = range(len(self.entries))
+        if seek_counter is not None:
+            start = next((i for i, (counter, _) in enumerate(self.entries) if counter == seek_counter), len(self.entries))
+            positions = range(start, len(self.entries))
+        if counter_range is not None:
+            first, last = counter_range
+            positions = [i for i in positions if first <= self.entries[i][0] <= last]
+        return list(positions)
+
+
+def index_path(filepath: str) -> str:
+    return filepath + INDEX_SUFFIX
+
+
+def build_log_index(filepath: str) -> LogIndex:
+    """Scan a log file for subevent blocks and record their byte offsets."""
+    stat = os.stat(filepath)
+    entries = []
+    if stat.st_size == 0:
+        return LogIndex(size=0, mtime_ns=stat.st_mtime_ns, entries=entries)
+
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offset = mm.find(_START_MARKER)
+        while offset != -1:
+            next_offset = mm.find(_START_MARKER, offset + len(_START_MARKER))
+            search_end = offset + len(_START_MARKER) + _COUNTER_SEARCH_LEN
+            if next_offset != -1:
+                search_end = min(search_end, next_offset)
+            match = _COUNTER_RE.search(mm, offset, search_end)
+            if match:
+                entries.append((int(match.group(1)), offset))
+            offset = next_offset
+
+    return LogIndex(size=stat.st_size, mtime_ns=stat.st_mtime_ns, entries=entries)
+
+
+def save_log_index(filepath: str, index: LogIndex):
+    """Write the index to the log's sidecar file."""
+    data = {
+        'version': INDEX_VERSION,
+        'size': index.size,
+        'mtime_ns': index.mtime_ns,
+        'entries': index.entries,
+    }
+    with open(index_path(filepath), 'w') as f:
+        json.dump(data, f)
+
+
+def load_log_index(filepath: str, save: bool = True) -> LogIndex:
+    """Return the index of a log file, rebuilding it if the sidecar is missing or stale.
+
+    Args:
+        filepath: Path to the log file
+        save: Write a rebuilt index to the sidecar file; if False, the index
+            is only built in memory
+    """
+    stat = os.stat(filepath)
+    try:
+        with open(index_path(filepath)) as f:
+            data = json.load(f)
+        if (data.get('version') == INDEX_VERSION
+                and data['size'] == stat.st_size
+                and data['mtime_ns'] == stat.st_mtime_ns):
+            return LogIndex(size=data['size'], mtime_ns=data['mtime_ns'],
+                            entries=[tuple(entry) for entry in data['entries']])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_log_index(filepath)
+    if not save:
+        return index
+    try:
+        save_log_index(filepath, index)
+    except OSError as e:
+        print(f"Could not write log index {index_path(filepath)}: {e}")
+    return index
+
+
+if __name__ == '__main__':
+    # Prebuild sidecar indexes: python3 -m toolset.data_sources.log_index LOG...
+    from toolset.data_sources.compression import compression_of
+
+    for path in sys.argv[1:]:
+        if compression_of(path) is not None:
+            print(f"{path}: compressed logs are streamed, not indexed")
+            continue
+        idx = build_log_index(path)
+        save_log_index(path, idx)
+        print(f"{index_path(path)}: {len(idx.entries)} subevent blocks")
@@ -0,0 +1,144 @@
+import re
+import time
+from typing import Iterator, List, Optional
+from toolset.data_sources.base import _STATUS_MARKERS
+from toolset.data_sources.events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent, ProcedureParamsEvent
+from toolset.cs_utils.cs_subevent_parser import parse_cs_subevent_result, RAW_STEP_DATA_MARKER
+from toolset.stats import STATS
+
+SUBEVENT_START_MARKER = 'I: CS Subevent result received:'
+SUBEVENT_END_MARKER = 'I: CS Subevent end'
+CONNECTION_INTERVAL_MARKER = 'Connection interval:'
+PROCEDURE_INTERVAL_MARKER = 'procedure interval:'
+CAPABILITY_ITEM_PREFIX = 'I:  - '
+# Step data rows ("  0a1b...") start with a space and never carry markers
+HEX_ROW_PREFIX = ' '
+
+# Shared by every data source that parses subevents
+SUBEVENTS_PARSED = STATS.counter('parse.subevents')
+SUBEVENT_PARSE_TIME = STATS.histogram('parse.subevent_s')
+
+# Status marker text -> StatusEvent key
+_STATUS_KEYS = {
+    marker: key
+    for key, markers in _STATUS_MARKERS.items()
+    for marker in (markers if isinstance(markers, tuple) else (markers,))
+}
+# All markers the parsers react to, matched with a single scan per line
+_MARKER_RE = re.compile('|'.join(re.escape(marker) for marker in (
+    SUBEVENT_START_MARKER, SUBEVENT_END_MARKER, RAW_STEP_DATA_MARKER,
+    CONNECTION_INTERVAL_MARKER, PROCEDURE_INTERVAL_MARKER, *_STATUS_KEYS,
+)))
+_CONNECTION_INTERVAL_RE = re.compile(r'Connection interval:\s*(\d+)')
+_PROCEDURE_INTERVAL_RE = re.compile(r'procedure interval:\s*(\d+)')
+
+
+def find_markers(line: str) -> List[str]:
+    """Return the known markers contained in a log line, in order of appearance.
+
+    Hex step data rows are recognised by their leading space and returned
+    without scanning.
+    """
+    if line.startswith(HEX_ROW_PREFIX):
+        return []
+    return _MARKER_RE.findall(line)
+
+
+class LogStreamParser:
+    """Incremental parser turning firmware log lines into CSEvents.
+
+    Lines are fed one at a time and events are yielded in log order, so only
+    the subevent block currently being collected is kept in memory.
+    """
+
+    def __init__(self, connection_interval_ms: Optional[int] = None):
+        """
+        Args:
+            connection_interval_ms: Connection interval logged before the
+                first line fed, e.g. when parsing a log in chunks
+        """
+        self._collecting_capabilities = False
+        self._capabilities_lines: List[str] = []
+        self._connection_interval_ms = connection_interval_ms
+        self._procedure_interval: Optional[int] = None
+        self._subevent_lines: Optional[List[str]] = None
+
+    def feed_line(self, line: str) -> Iterator[CSEvent]:
+        """Process one log line (without line terminator)."""
+        markers = find_markers(line)
+        if SUBEVENT_START_MARKER in markers:
+            yield from self._finish_subevent()
+            self._subevent_lines = [line]
+        elif self._subevent_lines is not None:
+            self._subevent_lines.append(line)
+            if SUBEVENT_END_MARKER in markers:
+                yield from self._finish_subevent()
+
+        yield from self.process_line(line, markers)
+
+    def finish(self) -> Iterator[CSEvent]:
+        """Flush state at end of input."""
+        yield from self._finish_subevent()
+        if self._capabilities_lines:
+            yield CapabilitiesEvent('\n'.join(self._capabilities_lines))
+        self._collecting_capabilities = False
+        self._capabilities_lines = []
+
+    def process_line(self, line: str, markers: Optional[List[str]] = None) -> Iterator[CSEvent]:
+        """Check a line for status markers, capabilities and procedure parameters.
+
+        Args:
+            line: Log line without line terminator
+            markers: find_markers(line), if the caller already has it
+        """
+        if markers is None:
+            markers = find_markers(line)
+
+        for marker in markers:
+            key = _STATUS_KEYS.get(marker)
+            if key is not None:
+                yield StatusEvent(key)
+
+        if self._collecting_capabilities:
+            if CAPABILITY_ITEM_PREFIX in line:
+                self._capabilities_lines.append(line.split(CAPABILITY_ITEM_PREFIX, 1)[1])
+            else:
+                if self._capabilities_lines:
+                    yield CapabilitiesEvent('\n'.join(self._capabilities_lines))
+                self._collecting_capabilities = False
+                self._capabilities_lines = []
+
+        if not markers:
+            return
+
+        if _STATUS_MARKERS['cs_capabilities'] in markers:
+            self._collecting_capabilities = True
+            self._capabilities_lines = []
+
+        if CONNECTION_INTERVAL_MARKER in markers:
+            m = _CONNECTION_INTERVAL_RE.search(line)
+            if m:
+                self._connection_interval_ms = int(m.group(1))
+
+        if PROCEDURE_INTERVAL_MARKER in markers:
+            m = _PROCEDURE_INTERVAL_RE.search(line)
+            if m:
+                self._procedure_interval = int(m.group(1))
+                if self._connection_interval_ms is not None:
+                    yield ProcedureParamsEvent(
+                        connection_interval_ms=self._connection_interval_ms,
+                        procedure_interval=self._procedure_interval,
+                    )
+
+    def _finish_subevent(self) -> Iterator[CSEvent]:
+        if self._subevent_lines is None:
+            return
+        subevent_text = '\n'.join(self._subevent_lines)
+        self._subevent_lines = None
+
+        start = time.perf_counter()
+        parsed = parse_cs_subevent_result(subevent_text)
+        if parsed is not None:
+            SUBEVENT_PARSE_TIME.record(time.perf_counter() - start)
+            SUBEVENTS_PARSED.add()
+            yield SubeventResultEvent(parsed)
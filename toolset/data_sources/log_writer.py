@@ -0,0 +1,177 @@
+"""Background writer for raw UART logs and binary captures.
+
+BackgroundLogWriter takes chunks from the serial read loop without touching
+the disk: chunks are queued and a dedicated thread writes them in large
+batches, flushing after each batch and calling fsync periodically. The queue
+is bounded in bytes; when the disk cannot keep up, new chunks are dropped
+and counted rather than stalling serial draining.
+"""
+
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Condition, Thread
+from typing import BinaryIO, Deque, Optional, Tuple
+
+DEFAULT_QUEUE_BYTES = 8 * 1024 * 1024
+DEFAULT_BATCH_BYTES = 256 * 1024
+DEFAULT_FSYNC_INTERVAL_S = 1.0
+
+
+@dataclass
+class LogWriterStats:
+    """Counters of a BackgroundLogWriter."""
+    written_bytes: int = 0
+    dropped_bytes: int = 0
+    dropped_chunks: int = 0
+    # Bytes accepted but not yet written
+    pending_bytes: int = 0
+    # Time from write() to the chunk reaching the file, last and worst case
+    last_lag_s: float = 0.0
+    max_lag_s: float = 0.0
+    fsyncs: int = 0
+
+
+class BackgroundLogWriter:
+    """Writes a byte stream to a file handle from a dedicated thread."""
+
+    def __init__(
+        self,
+        handle: BinaryIO,
+        max_queue_bytes: int = DEFAULT_QUEUE_BYTES,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        fsync_interval: Optional[float] = DEFAULT_FSYNC_INTERVAL_S,
+        flush_batches: bool = True,
+    ):
+        """
+        Args:
+            handle: Open binary file, e.g. from open_log_writer(); closed by close()
+            max_queue_bytes: Bytes that may wait for the disk before new
+                chunks are dropped
+            batch_bytes: Target size of a single write
+            fsync_interval: Seconds between fsync calls, None to never fsync
+                before close
+            flush_batches: Flush the handle after each batch; disable for
+                compressed handles, where flushing hurts the ratio
+        """
+        if max_queue_bytes <= 0:
+            raise ValueError(f"Queue size must be positive, got {max_queue_bytes}")
+        self.handle = handle
+        self.max_queue_bytes = max_queue_bytes
+        self.batch_bytes = batch_bytes
+        self.fsync_interval = fsync_interval
+        self.flush_batches = flush_batches
+        self.stats = LogWriterStats()
+        self._queue: Deque[Tuple[float, bytes]] = deque()
+        self._cond = Condition()
+        self._closing = False
+        self._error: Optional[OSError] = None
+        self._last_fsync = time.monotonic()
+        self._thread = Thread(target=self._run, name='uart-log-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, data: bytes) -> bool:
+        """Queue a chunk for writing without blocking.
+
+        Returns:
+            False if the chunk was dropped because the queue is full, the
+            writer is closed or writing failed
+        """
+        if not data:
+            return True
+        with self._cond:
+            stats = self.stats
+            if self._closing or self._error is not None or stats.pending_bytes + len(data) > self.max_queue_bytes:
+                stats.dropped_bytes += len(data)
+                stats.dropped_chunks += 1
+                return False
+            self._queue.append((time.monotonic(), bytes(data)))
+            stats.pending_bytes += len(data)
+            self._cond.notify()
+        return True
+
+    def _next_batch(self) -> Optional[Tuple[float, bytes]]:
+        """Wait for queued data; return (oldest enqueue time, joined bytes), or None once closed and drained."""
+        with self._cond:
+            while not self._queue:
+                if self._closing:
+                    return None
+                self._cond.wait(self.fsync_interval)
+                if not self._queue and not self._closing:
+                    # Idle: use the pause to sync what was written
+                    return 0.0, b''
+
+            queued_at = self._queue[0][0]
+            chunks = []
+            size = 0
+            while self._queue and size < self.batch_bytes:
+                _, chunk = self._queue.popleft()
+                chunks.append(chunk)
+                size += len(chunk)
+            return queued_at, b''.join(chunks)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            queued_at, data = batch
+            try:
+                if data:
+                    self.handle.write(data)
+                    if self.flush_batches:
+                        self.handle.flush()
+                self._maybe_fsync()
+            except OSError as e:
+                print(f"Raw log write failed, dropping further data: {e}")
+                with self._cond:
+                    self._error = e
+                    self.stats.dropped_bytes += self.stats.pending_bytes
+                    self.stats.pending_bytes = 0
+                    self._queue.clear()
+                return
+
+            if data:
+                lag = time.monotonic() - queued_at
+                with self._cond:
+                    stats = self.stats
+                    stats.written_bytes += len(data)
+                    stats.pending_bytes -= len(data)
+                    stats.last_lag_s = lag
+                    stats.max_lag_s = max(stats.max_lag_s, lag)
+
+    def _maybe_fsync(self, force: bool = False):
+        # Compressed streams are not synced mid-stream; closing them writes the trailer
+        if not self.flush_batches:
+            return
+        now = time.monotonic()
+        if not force and (self.fsync_interval is None or now - self._last_fsync < self.fsync_interval):
+            return
+        self._last_fsync = now
+        self.handle.flush()
+        try:
+            os.fsync(self.handle.fileno())
+        except (AttributeError, OSError, ValueError):
+            # Handle without a real file descriptor
+            return
+        self.stats.fsyncs += 1
+
+    def close(self):
+        """Write everything queued, flush and fsync, then close the handle."""
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify()
+        self._thread.join()
+        try:
+            if self._error is None:
+                self._maybe_fsync(force=True)
+        except OSError as e:
+            print(f"Raw log flush failed: {e}")
+        finally:
+            try:
+                self.handle.close()
+            except OSError:
+                pass
@@ -0,0 +1,127 @@
+"""Real-time paced replay of recorded CS data.
+
+PacedDataSource wraps a log or capture source and releases one procedure per
+procedure period, the way the boards emit them live. The period comes from
+ProcedureParamsEvent (connection interval x procedure interval) or from an
+explicit rate, and can be scaled with a speed-up factor. Sources replayed
+together share a ReplayClock so initiator and reflector stay aligned even
+though only the initiator log carries the procedure parameters.
+"""
+
+import time
+from threading import Event
+from typing import Iterator, Optional
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.events import CSEvent, ProcedureParamsEvent, SubeventResultEvent
+
+# Used until procedure parameters are known: 25 ms connection interval x
+# procedure interval 2, as configured by the cs_ini sample
+DEFAULT_PROCEDURE_PERIOD_S = 0.05
+
+# How often a source waiting on its own interrupt checks the clock's stop event
+_STOP_POLL_S = 0.05
+
+
+class ReplayClock:
+    """Procedure timing shared by the sources of one replay."""
+
+    def __init__(self, speed: float = 1.0, rate_hz: Optional[float] = None, stop_event: Optional[Event] = None):
+        """
+        Args:
+            speed: Speed-up factor over real time; 0 disables pacing
+            rate_hz: Explicit procedure rate, overriding procedure parameters
+            stop_event: Event that interrupts waiting of every source, e.g.
+                the pipeline's shutdown event; sources never set it
+        """
+        if speed < 0:
+            raise ValueError(f"Replay speed must not be negative, got {speed}")
+        if rate_hz is not None and rate_hz <= 0:
+            raise ValueError(f"Replay rate must be positive, got {rate_hz}")
+        self.speed = speed
+        self.rate_hz = rate_hz
+        self.stop_event = stop_event if stop_event is not None else Event()
+        self._procedure_period_s = 1.0 / rate_hz if rate_hz is not None else DEFAULT_PROCEDURE_PERIOD_S
+        self._origin: Optional[float] = None
+
+    @property
+    def unthrottled(self) -> bool:
+        return self.speed == 0
+
+    @property
+    def procedure_period_s(self) -> float:
+        """Real-time procedure period in seconds."""
+        return self._procedure_period_s
+
+    def set_procedure_params(self, connection_interval_ms: int, procedure_interval: int):
+        """Take the procedure period from the device configuration unless a rate was given."""
+        if self.rate_hz is None and connection_interval_ms > 0 and procedure_interval > 0:
+            self._procedure_period_s = connection_interval_ms * procedure_interval / 1000
+
+    def origin(self) -> float:
+        """Replay start time, fixed by the first source to ask for it."""
+        if self._origin is None:
+            self._origin = time.monotonic()
+        return self._origin
+
+    def step(self) -> float:
+        """Time between two procedures at the current speed."""
+        return self._procedure_period_s / self.speed
+
+    def wait_until(self, deadline: float, interrupt: Optional[Event] = None) -> bool:
+        """Sleep until the monotonic deadline.
+
+        Args:
+            deadline: time.monotonic() value to wait for
+            interrupt: Event of a single source that also ends the wait
+
+        Returns:
+            False if the stop event or interrupt was set
+        """
+        if interrupt is None:
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                return not self.stop_event.wait(delay)
+            return not self.stop_event.is_set()
+
+        while not self.stop_event.is_set():
+            delay = deadline - time.monotonic()
+            if delay <= 0:
+                return not interrupt.is_set()
+            if interrupt.wait(min(delay, _STOP_POLL_S)):
+                return False
+        return False
+
+
+class PacedDataSource(DataSource):
+    """Yields events of another source no faster than the procedure rate."""
+
+    def __init__(self, source: DataSource, clock: ReplayClock):
+        """
+        Args:
+            source: Source to replay, e.g. FileDataSource or BinaryDataSource
+            clock: Timing shared with the other sources of the replay
+        """
+        self.source = source
+        self.clock = clock
+        # Set by close(); the clock's stop event is shared with the other sources
+        self._closed = Event()
+
+    def read(self) -> Iterator[CSEvent]:
+        """Yield events, holding back each new procedure until it is due."""
+        due: Optional[float] = None
+        procedure_counter: Optional[int] = None
+        for event in self.source.read():
+            if isinstance(event, ProcedureParamsEvent):
+                self.clock.set_procedure_params(event.connection_interval_ms, event.procedure_interval)
+            elif isinstance(event, SubeventResultEvent) and not self.clock.unthrottled:
+                # Subevents of one procedure are released together
+                if event.subevent.procedure_counter != procedure_counter:
+                    procedure_counter = event.subevent.procedure_counter
+                    due = self.clock.origin() if due is None else due + self.clock.step()
+                    if not self.clock.wait_until(due, self._closed):
+                        return
+            yield event
+
+    def close(self):
+        self._closed.set()
+        self.source.close()
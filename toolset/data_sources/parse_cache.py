@@ -0,0 +1,145 @@
+"""On-disk cache of parsed text logs.
+
+A full parse of a text log is stored as a binary capture (see binary_capture)
+in the cache directory. Entry names are derived from the log's absolute path
+plus its size, modification time and content hash, so a changed log misses
+the cache and its stale entry is replaced. Least recently used entries are
+evicted once the directory grows beyond its size limit.
+"""
+
+import hashlib
+import os
+from typing import Iterator, List, Optional, Tuple
+from toolset.data_sources.binary_capture import CAPTURE_SUFFIX, BinaryCaptureWriter
+from toolset.data_sources.events import CSEvent
+
+# Bump when text log parsing changes so entries from older parsers are not used
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'waves', 'parse')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_HASH_CHUNK = 1 << 20
+
+
+def _file_state(filepath: str) -> Tuple[int, int]:
+    stat = os.stat(filepath)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _content_digest(filepath: str) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Directory of parsed-log captures with a total size limit."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: Cache directory, created on first store
+            max_bytes: Evict least recently used entries above this total size
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def entry_path(self, filepath: str) -> str:
+        """Return the cache entry path for the current contents of a log file."""
+        path_key = hashlib.blake2b(os.path.abspath(filepath).encode('utf-8'), digest_size=8).hexdigest()
+        size, mtime_ns = _file_state(filepath)
+        state = f'{CACHE_VERSION}:{size}:{mtime_ns}:{_content_digest(filepath)}'
+        state_key = hashlib.blake2b(state.encode('ascii'), digest_size=8).hexdigest()
+        return os.path.join(self.directory, f'{path_key}-{state_key}{CAPTURE_SUFFIX}')
+
+    def lookup(self, entry: str) -> bool:
+        """Return True if the entry exists, marking it as recently used."""
+        try:
+            os.utime(entry)
+        except OSError:
+            return False
+        return True
+
+    def record(self, entry: str, filepath: str, events: Iterator[CSEvent]) -> Iterator[CSEvent]:
+        """Pass events through while writing them to a new cache entry.
+
+        The entry is only committed when events are exhausted and the log did
+        not change while being parsed; an interrupted replay leaves no entry.
+        """
+        state = _file_state(filepath)
+        tmp_path = f'{entry}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            writer = BinaryCaptureWriter(tmp_path)
+        except OSError as e:
+            print(f"Parse cache disabled, could not create {tmp_path}: {e}")
+            yield from events
+            return
+
+        complete = False
+        try:
+            for event in events:
+                if writer is not None:
+                    try:
+                        writer.write_event(event)
+                    except OSError as e:
+                        print(f"Parse cache disabled, could not write {tmp_path}: {e}")
+                        writer.close()
+                        writer = None
+                yield event
+            complete = writer is not None
+        finally:
+            if writer is not None:
+                writer.close()
+            self._commit(entry, tmp_path, complete and _file_state(filepath) == state)
+
+    def _commit(self, entry: str, tmp_path: str, keep: bool):
+        try:
+            if not keep:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+            os.replace(tmp_path, entry)
+            # Older entries for the same log can never be valid again
+            path_key = os.path.basename(entry).split('-', 1)[0]
+            for path in self._entries():
+                if path != entry and os.path.basename(path).startswith(path_key + '-'):
+                    os.remove(path)
+            self.evict(keep_entry=entry)
+        except OSError as e:
+            print(f"Could not update parse cache {self.directory}: {e}")
+
+    def _entries(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [os.path.join(self.directory, name) for name in names if name.endswith(CAPTURE_SUFFIX)]
+
+    def evict(self, keep_entry: Optional[str] = None):
+        """Remove least recently used entries until the cache fits max_bytes."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep_entry:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,317 @@
+"""Pseudo-terminal simulator of the cs_ini and cs_ref boards.
+
+UartSimulator opens a pseudo-terminal pair per role and plays back recorded
+or synthetic logs on it at a chosen baud rate and procedure rate, so the
+UART path (UartDataSource, the reboot/start commands of run.py, the
+consumer and the viewer) can run without boards attached. The boards
+answer the console commands of the firmware: 'r' reboots a board, 's'
+starts the initiator, and the reflector starts streaming once the
+initiator has connected to it.
+
+Linux/POSIX only. Run it standalone and point run.py at the printed ports:
+
+    python3 -m toolset.data_sources.uart_simulator INI_LOG REF_LOG [--rate HZ] [--loop]
+    python3 run.py -i <initiator port> -r <reflector port> --uart
+"""
+
+import os
+import pty
+import re
+import select
+import time
+import tty
+from dataclasses import dataclass
+from threading import Condition, Event, Lock, Thread
+from typing import List, Optional, Tuple
+from toolset.data_sources.compression import open_log
+from toolset.data_sources.log_stream import SUBEVENT_START_MARKER
+from toolset.data_sources.paced_source import ReplayClock
+
+DEFAULT_BAUDRATE = 1000000
+# 8N1: start bit + 8 data bits + stop bit
+_BITS_PER_BYTE = 10
+_WRITE_CHUNK = 256
+_COUNTER_MAX = 0x10000
+_COUNTER_RE = re.compile(rb'(Procedure counter: )(\d+)')
+_START_LINE = b'I: Starting\r\n'
+
+
+def split_log(filepath: str) -> Tuple[bytes, List[Tuple[int, bytes]]]:
+    """Split a log into its preamble and its procedures.
+
+    Returns:
+        Tuple of (preamble, procedures). The preamble is everything before
+        the first subevent; each procedure is (procedure counter, text) with
+        all its subevent blocks and the lines following them. Line endings
+        are converted to the firmware's CRLF.
+    """
+    with open_log(filepath) as f:
+        text = f.read().replace('\r\n', '\n').replace('\n', '\r\n').encode('utf-8')
+    # A log cut mid-line must not glue its last line to the next one played
+    if text and not text.endswith(b'\r\n'):
+        text += b'\r\n'
+
+    marker = SUBEVENT_START_MARKER.encode('ascii')
+    starts = [m.start() for m in re.finditer(re.escape(marker), text)]
+    if not starts:
+        return text, []
+
+    procedures = []
+    for i, start in enumerate(starts):
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        match = _COUNTER_RE.search(text, start, end)
+        counter = int(match.group(2)) if match else (procedures[-1][0] if procedures else 0)
+        if procedures and procedures[-1][0] == counter:
+            # Further subevent of the same procedure
+            procedures[-1] = (counter, procedures[-1][1] + text[start:end])
+        else:
+            procedures.append((counter, text[start:end]))
+    return text[:starts[0]], procedures
+
+
+@dataclass
+class BoardStats:
+    """Counters of a SimulatedBoard."""
+    bytes_sent: int = 0
+    procedures_sent: int = 0
+    # Procedures finished writing more than a procedure period after they were due
+    late_procedures: int = 0
+    max_lag_s: float = 0.0
+
+
+class SimulatedBoard:
+    """One board: the master side of a pseudo-terminal playing back a log."""
+
+    def __init__(self, simulator: 'UartSimulator', role: str, preamble: bytes, procedures: List[Tuple[int, bytes]]):
+        self.simulator = simulator
+        self.role = role
+        self.preamble = preamble
+        self.procedures = procedures
+        self.stats = BoardStats()
+        self._master, self._slave = pty.openpty()
+        # No echo or line discipline until the host configures the port
+        tty.setraw(self._master)
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._generation = 0
+        self._line_free_at = 0.0
+        self._lock = Lock()
+        self._threads = [
+            Thread(target=self._console, name=f'sim-{role}-console', daemon=True),
+            Thread(target=self._playback, name=f'sim-{role}-playback', daemon=True),
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def reboot(self):
+        """Abort playback and wait for the next start, like a cold reboot."""
+        with self._lock:
+            self._generation += 1
+
+    def _console(self):
+        """Handle console commands written by the host."""
+        while not self.simulator.closed.is_set():
+            try:
+                ready, _, _ = select.select([self._master], [], [], 0.1)
+                if not ready:
+                    continue
+                commands = os.read(self._master, 64)
+            except OSError:
+                return
+            for command in commands:
+                if command == ord('r'):
+                    self.reboot()
+                    self.simulator.board_rebooted(self)
+                elif command == ord('s') and self.role == 'initiator':
+                    self.simulator.start_session()
+
+    def _playback(self):
+        simulator = self.simulator
+        session = 0
+        while True:
+            with simulator.session_started:
+                simulator.session_started.wait_for(
+                    lambda: simulator.closed.is_set() or (simulator.started and simulator.session != session))
+                if simulator.closed.is_set():
+                    return
+                session = simulator.session
+                clock = simulator.clock
+            with self._lock:
+                generation = self._generation
+            try:
+                if self.role == 'initiator' and not self._send(_START_LINE, generation):
+                    continue
+                if self._send(self.preamble, generation):
+                    self._play_procedures(clock, generation)
+            except OSError:
+                return
+
+    def _play_procedures(self, clock: ReplayClock, generation: int):
+        simulator = self.simulator
+        span = simulator.counter_span
+        loop = 0
+        while True:
+            for counter, text in self.procedures:
+                if simulator.loop and counter >= simulator.counter_base + span:
+                    break
+                index = counter - simulator.counter_base + loop * span
+                due = clock.origin() + index * clock.step() if not clock.unthrottled else 0.0
+                if not clock.wait_until(due):
+                    return
+                if loop:
+                    text = _COUNTER_RE.sub(
+                        lambda m: m.group(1) + b'%d' % ((int(m.group(2)) + loop * span) % _COUNTER_MAX), text)
+                if not self._send(text, generation):
+                    return
+                lag = time.monotonic() - due if due else 0.0
+                stats = self.stats
+                stats.procedures_sent += 1
+                stats.max_lag_s = max(stats.max_lag_s, lag)
+                if not clock.unthrottled and lag > clock.step():
+                    stats.late_procedures += 1
+            if not simulator.loop or not self.procedures:
+                return
+            loop += 1
+
+    def _send(self, data: bytes, generation: int) -> bool:
+        """Write data at the line rate. Returns False if rebooted or closed meanwhile."""
+        baudrate = self.simulator.baudrate
+        for i in range(0, len(data), _WRITE_CHUNK):
+            if self._generation != generation or self.simulator.closed.is_set():
+                return False
+            chunk = data[i:i + _WRITE_CHUNK]
+            if baudrate:
+                now = time.monotonic()
+                if self._line_free_at > now:
+                    time.sleep(self._line_free_at - now)
+                self._line_free_at = max(now, self._line_free_at) + len(chunk) * _BITS_PER_BYTE / baudrate
+            # Blocks while the host does not drain the port, like RTS/CTS flow control
+            view = memoryview(chunk)
+            while view:
+                written = os.write(self._master, view)
+                view = view[written:]
+            self.stats.bytes_sent += len(chunk)
+        return True
+
+    def close(self):
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class UartSimulator:
+    """Simulated initiator and reflector boards on a pseudo-terminal pair each."""
+
+    def __init__(
+        self,
+        initiator_log: str,
+        reflector_log: str,
+        baudrate: int = DEFAULT_BAUDRATE,
+        rate_hz: Optional[float] = None,
+        loop: bool = False,
+    ):
+        """
+        Args:
+            initiator_log: Log played back by the initiator, e.g. a --log-uart recording
+            reflector_log: Log played back by the reflector
+            baudrate: Line rate limiting how fast bytes are written; 0 for no limit
+            rate_hz: Procedures per second; None for the procedure period of
+                paced replay, 0 for as fast as the line allows
+            loop: Replay the logs endlessly with increasing procedure
+                counters. Both logs are cut to their common counter range so
+                they stay paired.
+        """
+        if baudrate < 0:
+            raise ValueError(f"Baud rate must not be negative, got {baudrate}")
+        if rate_hz is not None and rate_hz < 0:
+            raise ValueError(f"Procedure rate must not be negative, got {rate_hz}")
+        self.baudrate = baudrate
+        self.rate_hz = rate_hz
+        self.loop = loop
+        self.closed = Event()
+        # Guards started, session and clock
+        self.session_started = Condition()
+        self.started = False
+        self.session = 0
+        self.clock: Optional[ReplayClock] = None
+
+        initiator_preamble, initiator_procedures = split_log(initiator_log)
+        reflector_preamble, reflector_procedures = split_log(reflector_log)
+        counters = [p[0] for p in initiator_procedures + reflector_procedures]
+        self.counter_base = min(counters, default=0)
+        last = min(initiator_procedures[-1][0] if initiator_procedures else 0,
+                   reflector_procedures[-1][0] if reflector_procedures else 0)
+        self.counter_span = max(last - self.counter_base + 1, 1)
+
+        self.initiator = SimulatedBoard(self, 'initiator', initiator_preamble, initiator_procedures)
+        self.reflector = SimulatedBoard(self, 'reflector', reflector_preamble, reflector_procedures)
+
+    @property
+    def ports(self) -> Tuple[str, str]:
+        """(initiator, reflector) device paths to open as serial ports."""
+        return self.initiator.port, self.reflector.port
+
+    def start(self):
+        """Start answering commands on both ports."""
+        self.initiator.start()
+        self.reflector.start()
+
+    def start_session(self):
+        """Initiator received 's': connect and let both boards stream."""
+        if self.rate_hz == 0:
+            clock = ReplayClock(speed=0, stop_event=self.closed)
+        else:
+            clock = ReplayClock(rate_hz=self.rate_hz, stop_event=self.closed)
+        with self.session_started:
+            self.clock = clock
+            self.session += 1
+            self.started = True
+            self.session_started.notify_all()
+
+    def board_rebooted(self, board: SimulatedBoard):
+        """A reboot of the initiator ends the connection, so the reflector stops too."""
+        if board is self.initiator:
+            with self.session_started:
+                self.started = False
+            self.reflector.reboot()
+
+    def close(self):
+        with self.session_started:
+            self.closed.set()
+            self.session_started.notify_all()
+        self.initiator.close()
+        self.reflector.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulate the initiator and reflector boards on pseudo-terminals')
+    parser.add_argument('initiator_log', help='Log played back by the initiator')
+    parser.add_argument('reflector_log', help='Log played back by the reflector')
+    parser.add_argument('--baud', type=int, default=DEFAULT_BAUDRATE, help='Line rate in baud, 0 for no limit')
+    parser.add_argument('--rate', type=float, default=None, metavar='HZ',
+                        help='Procedures per second, 0 for as fast as the line allows')
+    parser.add_argument('--loop', action='store_true', help='Replay the logs endlessly')
+    args = parser.parse_args()
+
+    simulator = UartSimulator(args.initiator_log, args.reflector_log, args.baud, args.rate, args.loop)
+    simulator.start()
+    print(f"Initiator: {simulator.initiator.port}")
+    print(f"Reflector: {simulator.reflector.port}")
+    print("Waiting for commands, Ctrl-C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        for board in (simulator.initiator, simulator.reflector):
+            stats = board.stats
+            print(f"{board.role}: {stats.procedures_sent} procedures, {stats.bytes_sent} bytes, "
+                  f"{stats.late_procedures} late, max lag {stats.max_lag_s * 1000:.1f} ms")
@@ -1,42 +1,78 @@
-import re
+import asyncio
+import os
+import select
+import selectors
 import time
-from threading import Event
-from typing import Iterator, Optional
+from threading import Event, Lock
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 import serial
-from toolset.data_sources.base import DataSource, _STATUS_MARKERS
-from toolset.data_sources.events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent, ProcedureParamsEvent
-from toolset.cs_utils.cs_subevent_parser import parse_cs_subevent_result
+from toolset.data_sources.base import DataSource
+from toolset.data_sources.binary_capture import BinaryCaptureWriter
+from toolset.data_sources.compression import open_log_writer
+from toolset.data_sources.events import CSEvent, SubeventResultEvent
+from toolset.data_sources.log_writer import BackgroundLogWriter
+from toolset.data_sources.log_stream import (
+    LogStreamParser, find_markers, HEX_ROW_PREFIX, SUBEVENT_START_MARKER, SUBEVENT_END_MARKER,
+    SUBEVENTS_PARSED, SUBEVENT_PARSE_TIME,
+)
+from toolset.cs_utils.cs_subevent_parser import SubeventAssembler, RAW_STEP_DATA_MARKER
+from toolset.stats import STATS
+
+
+# 'poll': check in_waiting and sleep 10 ms when idle
+# 'blocking': block in read() until data arrives or read_timeout expires
+# 'select': wait on the port file descriptor with a selector (POSIX only)
+READ_MODES = ('poll', 'blocking', 'select')
+
+_HEX_ROW_PREFIX = HEX_ROW_PREFIX.encode('ascii')
+
+_BYTES_READ = STATS.counter('uart.bytes_read')
 
 
 class UartDataSource(DataSource):
-    START_MARKER = "I: CS Subevent result received:"
-    END_MARKER = "I: CS Subevent end"
+    START_MARKER = SUBEVENT_START_MARKER
+    END_MARKER = SUBEVENT_END_MARKER
 
-    def __init__(self, port: str, baudrate: int = 1000000):
+    def __init__(self, port: str, baudrate: int = 1000000, read_mode: str = 'blocking', read_timeout: float = 0.1):
+        if read_mode not in READ_MODES:
+            raise ValueError(f"Unknown read mode {read_mode!r}, expected one of {READ_MODES}")
         self.port = port
         self.baudrate = baudrate
+        self.read_mode = read_mode
+        self.read_timeout = read_timeout
         self.serial_conn = None
-        self.buffer = ""
-        self.log_handle = None
-        self._line_buffer = ""
-        self._collecting_capabilities = False
-        self._capabilities_lines: list[str] = []
+        self.log_writer: Optional[BackgroundLogWriter] = None
+        self.capture_writer: Optional[BinaryCaptureWriter] = None
+        self._rx = bytearray()
+        self._frame: Optional[SubeventAssembler] = None
+        self._line_parser = LogStreamParser()
         self._stop_event: Optional[Event] = None
-        self._connection_interval_ms: Optional[int] = None
-        self._procedure_interval: Optional[int] = None
+        self._io_lock = Lock()
+        # Set once close() starts; read errors past that point are the close itself
+        self._closing = Event()
 
     def set_stop_event(self, stop_event: Event):
         """Provide a threading.Event that signals the read loop to exit."""
         self._stop_event = stop_event
 
-    def enable_logging(self, log_file: Optional[str]):
-        """Start logging raw UART data to a file."""
+    def enable_logging(self, log_file: Optional[str], compression: Optional[str] = None):
+        """Start logging raw UART data to a file, optionally compressed ('gz', 'bz2' or 'xz')."""
         if log_file:
-            self.log_handle = open(log_file, 'w', encoding='utf-8')
+            # Disk writes happen on a writer thread so they never stall serial draining.
+            # Flushing a compressor per batch would ruin the compression ratio.
+            self.log_writer = BackgroundLogWriter(
+                open_log_writer(log_file, compression), flush_batches=compression is None)
+
+    def enable_binary_logging(self, capture_file: Optional[str]):
+        """Start recording parsed events to a binary capture file."""
+        if capture_file:
+            # Encoded records are written on a writer thread, like the raw log
+            self.capture_writer = BinaryCaptureWriter(capture_file, background=True)
 
     def open(self):
         """Open the serial connection."""
         if self.serial_conn is None or not self.serial_conn.is_open:
+            self._closing.clear()
             self.serial_conn = serial.Serial(
                 port=self.port,
                 baudrate=self.baudrate,
@@ -44,7 +80,7 @@ class UartDataSource(DataSource):
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
                 rtscts=True,
-                timeout=1.0
+                timeout=self.read_timeout
             )
 
     def send(self, data: bytes):
@@ -56,109 +92,251 @@ class UartDataSource(DataSource):
         """Discard all data in the input buffer."""
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.reset_input_buffer()
-        self.buffer = ""
-
-    def _process_line(self, line: str) -> Iterator[CSEvent]:
-        """Check a line for status markers and capabilities data."""
-        for key, marker in _STATUS_MARKERS.items():
-            markers = marker if isinstance(marker, tuple) else (marker,)
-            if any(m in line for m in markers):
-                yield StatusEvent(key)
-
-        if self._collecting_capabilities:
-            if 'I:  - ' in line:
-                self._capabilities_lines.append(line.split('I:  - ', 1)[1])
-            else:
-                if self._capabilities_lines:
-                    yield CapabilitiesEvent('\n'.join(self._capabilities_lines))
-                self._collecting_capabilities = False
-                self._capabilities_lines = []
-
-        if _STATUS_MARKERS['cs_capabilities'] in line:
-            self._collecting_capabilities = True
-            self._capabilities_lines = []
-
-        if 'Connection interval:' in line:
-            m = re.search(r'Connection interval:\s*(\d+)', line)
-            if m:
-                self._connection_interval_ms = int(m.group(1))
-
-        if 'procedure interval:' in line:
-            m = re.search(r'procedure interval:\s*(\d+)', line)
-            if m:
-                self._procedure_interval = int(m.group(1))
-                if self._connection_interval_ms is not None:
-                    yield ProcedureParamsEvent(
-                        connection_interval_ms=self._connection_interval_ms,
-                        procedure_interval=self._procedure_interval,
-                    )
+        self._rx.clear()
+        self._frame = None
+
+    def _feed(self, chunk: bytes) -> Iterator[CSEvent]:
+        """Append received bytes and yield events for every completed line.
+
+        A single newline scan over the byte buffer drives both line handling
+        and subevent framing. Hex rows of a subevent are decoded as they
+        arrive, so a subevent is ready as soon as its end marker is seen.
+        """
+        rx = self._rx
+        rx += chunk
+
+        pos = 0
+        while True:
+            nl = rx.find(b'\n', pos)
+            if nl == -1:
+                break
+            yield from self._process_raw_line(pos, nl)
+            pos = nl + 1
+
+        # Drop consumed lines; deleting a bytearray prefix only moves its start pointer
+        del rx[:pos]
+
+    def _process_raw_line(self, start: int, end: int) -> Iterator[CSEvent]:
+        rx = self._rx
+        # Hex rows ("  0a1b...") never carry markers and are not decoded as text
+        if rx.startswith(_HEX_ROW_PREFIX, start):
+            if self._frame is not None and self._frame.in_steps:
+                self._frame.add_hex_row(rx[start:end])
+            return
+
+        line = rx[start:end].decode('utf-8', errors='replace').rstrip('\r')
+        markers = find_markers(line)
+
+        if self.START_MARKER in markers:
+            self._frame = SubeventAssembler(line)
+        elif self._frame is not None:
+            if self.END_MARKER in markers:
+                frame, self._frame = self._frame, None
+                # Step rows were decoded as they arrived; this is the remaining work at the end marker
+                start = time.perf_counter()
+                parsed = frame.finish()
+                if parsed:
+                    SUBEVENT_PARSE_TIME.record(time.perf_counter() - start)
+                    SUBEVENTS_PARSED.add()
+                    yield SubeventResultEvent(parsed)
+            elif not self._frame.in_steps:
+                self._frame.add_header_line(line)
+                if RAW_STEP_DATA_MARKER in markers:
+                    self._frame.start_steps()
+
+        yield from self._line_parser.process_line(line, markers)
+
+    def _read_chunk(self) -> bytes:
+        """Read the next chunk of data according to read_mode ('poll' or 'blocking').
+
+        Returns b'' once the port has been closed by another thread.
+        """
+        if self.read_mode == 'poll':
+            with self._io_lock:
+                if not self.serial_conn.is_open:
+                    return b''
+                waiting = self.serial_conn.in_waiting
+                if waiting:
+                    return self.serial_conn.read(waiting)
+            # No data yet — brief sleep so stop_event is checked promptly
+            time.sleep(0.01)
+            return b''
+
+        # Block until the first byte arrives (or read_timeout expires so the
+        # stop event is re-checked), then drain whatever is already buffered.
+        with self._io_lock:
+            if not self.serial_conn.is_open:
+                return b''
+            chunk = self.serial_conn.read(1)
+            if chunk:
+                waiting = self.serial_conn.in_waiting
+                if waiting:
+                    chunk += self.serial_conn.read(waiting)
+        return chunk
+
+    def _read_ready(self) -> bytes:
+        """Read buffered data after the port was reported readable by a selector."""
+        with self._io_lock:
+            if not self.serial_conn.is_open:
+                return b''
+            return self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+
+    def _handle_chunk(self, chunk: bytes) -> Iterator[CSEvent]:
+        _BYTES_READ.add(len(chunk))
+        # Queue raw data for the log file if enabled
+        log_writer = self.log_writer
+        if log_writer:
+            log_writer.write(chunk)
+
+        capture_writer = self.capture_writer
+        for event in self._feed(chunk):
+            if capture_writer:
+                capture_writer.write_event(event)
+            yield event
 
     def read(self) -> Iterator[CSEvent]:
         """Yield events from UART as they arrive."""
         try:
             self.open()
 
-            while not (self._stop_event and self._stop_event.is_set()):
-                if self.serial_conn.in_waiting > 0:
-                    chunk = self.serial_conn.read(self.serial_conn.in_waiting)
-                    try:
-                        decoded_chunk = chunk.decode('utf-8', errors='replace')
-                        self.buffer += decoded_chunk
-
-                        # Write raw data to log file if enabled
-                        if self.log_handle:
-                            self.log_handle.write(decoded_chunk)
-                            self.log_handle.flush()
-
-                        # Check for status markers line-by-line
-                        self._line_buffer += decoded_chunk
-                        while '\n' in self._line_buffer:
-                            line, self._line_buffer = self._line_buffer.split('\n', 1)
-                            yield from self._process_line(line.rstrip('\r'))
-                    except UnicodeDecodeError:
-                        continue
-
-                    # Process complete subevents in buffer
-                    while self.START_MARKER in self.buffer:
-                        start_idx = self.buffer.find(self.START_MARKER)
-
-                        # Discard any data before the start marker
-                        if start_idx > 0:
-                            self.buffer = self.buffer[start_idx:]
-                            start_idx = 0
-
-                        end_idx = self.buffer.find(self.END_MARKER, start_idx + len(self.START_MARKER))
-
-                        if end_idx != -1:
-                            # Extract complete subevent from start to end marker
-                            subevent_text = self.buffer[start_idx:end_idx + len(self.END_MARKER)]
-                            self.buffer = self.buffer[end_idx + len(self.END_MARKER):]
-
-                            parsed = parse_cs_subevent_result(subevent_text)
-                            if parsed:
-                                yield SubeventResultEvent(parsed)
-                        else:
-                            # Don't have complete subevent yet, wait for more data
-                            break
-                else:
-                    # No data yet — brief sleep so stop_event is checked promptly
-                    time.sleep(0.01)
+            if self.read_mode == 'select':
+                for _, event in read_multiplexed([self], self._stop_event, self.read_timeout):
+                    yield event
+                return
+
+            while self.serial_conn.is_open and not (self._stop_event and self._stop_event.is_set()):
+                chunk = self._read_chunk()
+                if chunk:
+                    yield from self._handle_chunk(chunk)
 
         except serial.SerialException as e:
-            print(f"Serial error on {self.port}: {e}")
+            # A read interrupted by close() is the end of the stream
+            if not self._closing.is_set():
+                print(f"Serial error on {self.port}: {e}")
         except KeyboardInterrupt:
             pass
 
+    async def aread(self) -> AsyncIterator[CSEvent]:
+        """Yield events from UART without blocking the event loop.
+
+        The port descriptor is set non-blocking and watched with the loop's
+        add_reader(), so any number of ports can share one thread. POSIX
+        only; elsewhere the blocking read() runs in a helper thread.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            self.open()
+            fd = self.serial_conn.fileno()
+            os.set_blocking(fd, False)
+            readable = asyncio.Event()
+            loop.add_reader(fd, readable.set)
+        except serial.SerialException as e:
+            print(f"Serial error on {self.port}: {e}")
+            return
+        except (AttributeError, NotImplementedError, OSError):
+            async for event in super().aread():
+                yield event
+            return
+
+        try:
+            while self.serial_conn.is_open and not (self._stop_event and self._stop_event.is_set()):
+                # Wake up after read_timeout so the stop event is re-checked.
+                # (asyncio.wait_for can swallow a cancellation before Python 3.12.)
+                wakeup = loop.call_later(self.read_timeout, readable.set)
+                try:
+                    await readable.wait()
+                finally:
+                    wakeup.cancel()
+                readable.clear()
+                try:
+                    chunk = os.read(fd, 65536)
+                    if not chunk:
+                        # The port is set up with VMIN=0: an empty read after a stale
+                        # wakeup is normal, while a descriptor that polls readable
+                        # yet has no data means the device is gone
+                        if not select.select([fd], [], [], 0)[0]:
+                            continue
+                        chunk = os.read(fd, 65536)
+                        if not chunk:
+                            print(f"Serial error on {self.port}: device reports readiness to read but returned no data")
+                            return
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    if not self._closing.is_set():
+                        print(f"Serial error on {self.port}: {e}")
+                    return
+                for event in self._handle_chunk(chunk):
+                    yield event
+        finally:
+            try:
+                loop.remove_reader(fd)
+            except (OSError, ValueError):
+                pass
+
     def close(self):
         """Close serial connection."""
+        self._closing.set()
         if self.serial_conn and self.serial_conn.is_open:
             try:
-                self.serial_conn.close()
-            except OSError:
-                pass
-        if self.log_handle:
-            try:
-                self.log_handle.close()
+                # Wake up a reader blocked in read() (POSIX only), then wait
+                # for it to leave the port before closing
+                if hasattr(self.serial_conn, 'cancel_read'):
+                    self.serial_conn.cancel_read()
+                with self._io_lock:
+                    self.serial_conn.close()
             except OSError:
                 pass
-            self.log_handle = None
+        if self.log_writer:
+            self.log_writer.close()
+            stats = self.log_writer.stats
+            if stats.dropped_bytes:
+                print(f"Raw log of {self.port}: dropped {stats.dropped_bytes} bytes "
+                      f"({stats.dropped_chunks} chunks), max write lag {stats.max_lag_s * 1000:.0f} ms")
+            self.log_writer = None
+        if self.capture_writer:
+            self.capture_writer.close()
+            stats = self.capture_writer.log_writer.stats
+            if stats.dropped_bytes:
+                print(f"Binary capture of {self.port}: dropped {stats.dropped_bytes} bytes "
+                      f"({stats.dropped_chunks} records), max write lag {stats.max_lag_s * 1000:.0f} ms")
+            self.capture_writer = None
+
+
+def read_multiplexed(
+    sources: List[UartDataSource],
+    stop_event: Optional[Event] = None,
+    timeout: float = 0.1,
+) -> Iterator[Tuple[UartDataSource, CSEvent]]:
+    """Read several UART sources from one thread, waiting on all port descriptors at once.
+
+    Yields (source, event) pairs as data arrives on any port. The selector wait
+    times out every `timeout` seconds so stop_event is honored promptly.
+    A source whose port fails or is closed is unregistered; the rest keep
+    running, and reading ends once no port is left.
+    POSIX only: relies on serial ports exposing a selectable fileno().
+    """
+    selector = selectors.DefaultSelector()
+    try:
+        for source in sources:
+            source.open()
+            selector.register(source.serial_conn.fileno(), selectors.EVENT_READ, source)
+
+        while selector.get_map() and not (stop_event and stop_event.is_set()):
+            for key in list(selector.get_map().values()):
+                # Closed by another thread; its descriptor never reports readiness again
+                if not key.data.serial_conn.is_open:
+                    selector.unregister(key.fd)
+            for key, _ in selector.select(timeout):
+                source = key.data
+                try:
+                    chunk = source._read_ready()
+                except serial.SerialException as e:
+                    if not source._closing.is_set():
+                        print(f"Serial error on {source.port}: {e}")
+                    selector.unregister(key.fd)
+                    continue
+                for event in source._handle_chunk(chunk):
+                    yield source, event
+    finally:
+        selector.close()
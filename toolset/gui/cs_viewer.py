@@ -1,6 +1,7 @@
+import time
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Optional, Callable, Dict
+from typing import Any, List, Optional, Callable, Dict
 from toolset.cs_utils.cs_subevent import SubeventResults
 from toolset.gui.cs_theme import _Theme, LIGHT_THEME, DARK_THEME
 from toolset.gui.setup_tab import SetupTabMixin
@@ -10,6 +11,7 @@ from toolset.gui.ifft_tab import IFftTabMixin
 from toolset.gui.music_tab import MusicTabMixin
 from toolset.gui.ml_tab import MLTabMixin
 from toolset.processing.ml_handler import load_ml_handler
+from toolset.stats import STATS
 from matplotlib.collections import PolyCollection
 
 # Skip a render when this many subevents have accumulated since the last rendered
@@ -17,6 +19,9 @@ from matplotlib.collections import PolyCollection
 # tab (e.g. MUSIC eigendecomposition) takes longer than gui_refresh_interval_ms.
 _LAG_SKIP_COUNT = 3
 
+_RENDER_TIME = STATS.histogram('gui.render_s')
+_DROPPED_FRAMES = STATS.counter('gui.dropped_frames')
+
 
 class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicTabMixin, MLTabMixin):
     """GUI for viewing Channel Sounding data"""
@@ -36,6 +41,8 @@ class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicT
         self.live_reflector: Optional[SubeventResults] = None
         self.live_phase_slope: Optional[Dict[int, float]] = None
         self.live_amplitude_response: Optional[Dict[int, float]] = None
+        # Estimator results computed off the Tk thread for the live pair (see EstimatorStage)
+        self.live_estimates: Optional[Dict[str, Any]] = None
         self.gui_refresh_interval_ms = 100
         self._live_render_scheduled = False
         self._pending_live_counter: Optional[int] = None
@@ -45,6 +52,7 @@ class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicT
         self._current_reflector: Optional[SubeventResults] = None
         self._current_phase_slope_data: Optional[Dict[int, float]] = None
         self._current_amplitude_response_data: Optional[Dict[int, float]] = None
+        self._current_estimates: Dict[str, Any] = {}
         self._tab_update_handlers: Dict[str, Callable[[], None]] = {}
         self._tab_indices: Dict[str, int] = {}
         self._active_tab_key: Optional[str] = None
@@ -246,14 +254,18 @@ class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicT
                 self._current_reflector = self.live_reflector
                 self._current_phase_slope_data = self.live_phase_slope
                 self._current_amplitude_response_data = self.live_amplitude_response
+                self._current_estimates = self.live_estimates or {}
             else:
                 self._current_counter = counter_value
                 self._current_initiator = self.initiator_map.get(counter_value)
                 self._current_reflector = self.reflector_map.get(counter_value)
                 self._current_phase_slope_data = self.phase_slope_map.get(counter_value)
                 self._current_amplitude_response_data = self.amplitude_response_map.get(counter_value)
+                self._current_estimates = {}
 
+            start = time.perf_counter()
             self._update_current_tab_content()
+            _RENDER_TIME.record(time.perf_counter() - start)
 
         except Exception as e:
             print(f"[ERROR] Exception in _update_display: {type(e).__name__}: {e}")
@@ -270,13 +282,19 @@ class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicT
         if update_handler is not None:
             update_handler()
 
-    def update_live_data(self, initiator: SubeventResults, reflector: SubeventResults, phase_slope_data: Dict[int, float], amplitude_response_data: Dict[int, float]):
-        """Update live data from consumer thread - thread-safe"""
+    def update_live_data(self, initiator: SubeventResults, reflector: SubeventResults, phase_slope_data: Dict[int, float], amplitude_response_data: Dict[int, float],
+                         estimates: Optional[Dict[str, Any]] = None):
+        """Update live data from consumer thread - thread-safe.
+
+        estimates holds precomputed estimator results by name (e.g. 'ifft',
+        'music'); tabs compute what is missing themselves.
+        """
         def _update():
             self.live_initiator = initiator
             self.live_reflector = reflector
             self.live_phase_slope = phase_slope_data
             self.live_amplitude_response = amplitude_response_data
+            self.live_estimates = estimates
 
             self.initiator_map[initiator.procedure_counter] = initiator
             self.reflector_map[reflector.procedure_counter] = reflector
@@ -315,6 +333,7 @@ class CSViewer(SetupTabMixin, StepsTabMixin, PlotsTabMixin, IFftTabMixin, MusicT
             self._last_rendered_counter = counter
             self._live_render_scheduled = True
             self.root.after(self.gui_refresh_interval_ms, self._flush_live_render)
+            _DROPPED_FRAMES.add(lag)
             print(f"GUI dropped {lag} frames to catch up with live data (counter={counter})")
             return
 
@@ -70,7 +70,10 @@ class IFftTabMixin:
 
     def _update_ifft_tab(self):
         t_ns, magnitude = None, None
-        if self._current_phase_slope_data and self._current_amplitude_response_data:
+        if self._current_estimates.get('ifft') is not None:
+            # Precomputed off the Tk thread
+            t_ns, magnitude = self._current_estimates['ifft']
+        elif self._current_phase_slope_data and self._current_amplitude_response_data:
             t_ns, magnitude = compute_ifft_response(
                 self._current_phase_slope_data,
                 self._current_amplitude_response_data,
@@ -71,7 +71,10 @@ class MusicTabMixin:
 
     def _update_music_tab(self):
         delays_ns, pseudo_spectrum = None, None
-        if self._current_phase_slope_data and self._current_amplitude_response_data:
+        if self._current_estimates.get('music') is not None:
+            # Precomputed off the Tk thread
+            delays_ns, pseudo_spectrum = self._current_estimates['music']
+        elif self._current_phase_slope_data and self._current_amplitude_response_data:
             delays_ns, pseudo_spectrum = compute_music_spectrum(
                 self._current_phase_slope_data,
                 self._current_amplitude_response_data,
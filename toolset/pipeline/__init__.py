@@ -1,5 +1,8 @@
 """Pipeline orchestration modules."""
 
-from .workers import producer_worker
+from .workers import producer_worker, multiplexed_producer_worker, async_producer_worker, run_async_pipeline
+from .queues import PolicyQueue, QueueStats, QUEUE_POLICIES, parse_queue_policies
+from .estimator_stage import EstimatorStage
 
-__all__ = ['producer_worker']
+__all__ = ['producer_worker', 'multiplexed_producer_worker', 'async_producer_worker', 'run_async_pipeline',
+           'PolicyQueue', 'QueueStats', 'QUEUE_POLICIES', 'parse_queue_policies', 'EstimatorStage']
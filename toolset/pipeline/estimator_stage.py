@@ -0,0 +1,114 @@
+"""Processing stage running the estimators of coupled pairs in worker processes.
+
+The consumer thread only pairs subevents and hands each pair to
+EstimatorStage.submit(); phase slope, amplitude response and the registered
+estimators (IFFT, MUSIC, ...) run in a process pool, outside the GIL of the
+consumer and the Tk thread. A delivery thread passes results on in the
+order the pairs were submitted.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from threading import Thread
+from typing import Callable, Dict, Optional, Tuple
+from toolset.cs_utils.cs_subevent import SubeventResults
+from toolset.pipeline.queues import BLOCK, PolicyQueue
+from toolset.processing.cs_estimators import ESTIMATORS, Estimator, PairEstimates, compact_subevent, run_estimators
+from toolset.stats import STATS
+
+# Whole run_estimators() call in a worker: phase slope, amplitude response and every estimator
+_RUNTIME = STATS.histogram('estimator.pool_runtime_s')
+# From submit() to the results reaching gui_callback
+_LATENCY = STATS.histogram('estimator.latency_s')
+
+# Estimators of this worker process, set by the pool initializer
+_worker_estimators: Dict[str, Estimator] = {}
+
+
+class EstimatorStage:
+    """Runs run_estimators() for coupled pairs in a process pool, delivering results in order."""
+
+    def __init__(
+        self,
+        gui_callback: Callable,
+        workers: int,
+        estimators: Optional[Dict[str, Estimator]] = None,
+        max_pending: Optional[int] = None,
+        policy: str = BLOCK,
+    ):
+        """
+        Args:
+            gui_callback: Called from the delivery thread with (initiator,
+                reflector, phase_slope_data, amplitude_response_data,
+                estimates) for every pair, in submission order
+            workers: Number of worker processes
+            estimators: Estimators by name, the registered ESTIMATORS if None
+            max_pending: Pairs submitted but not yet delivered before the
+                policy applies, 2 per worker if None
+            policy: Queue policy for pending pairs (see PolicyQueue); pairs
+                dropped by it are cancelled or their results discarded
+        """
+        if workers < 1:
+            raise ValueError(f"Estimator workers must be at least 1, got {workers}")
+        self.gui_callback = gui_callback
+        # spawn: the caller is running GUI and producer threads
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(dict(ESTIMATORS if estimators is None else estimators),),
+        )
+        self.pending = PolicyQueue(maxsize=max_pending or 2 * workers, policy=policy,
+                                   on_drop=lambda item: item[3].cancel())
+        self.failed = 0
+        self._thread = Thread(target=self._deliver, name='EstimatorDelivery', daemon=True)
+        self._thread.start()
+
+    def submit(self, initiator: SubeventResults, reflector: SubeventResults):
+        """Queue a coupled pair for processing; usable as pair_handler of the consumers."""
+        submitted_at = time.monotonic()
+        future = self.pool.submit(_run_in_worker, compact_subevent(initiator), compact_subevent(reflector))
+        self.pending.put((initiator, reflector, submitted_at, future))
+
+    def _deliver(self):
+        while True:
+            item: Optional[Tuple[SubeventResults, SubeventResults, float, Future]] = self.pending.get()
+            if item is None:
+                return
+            initiator, reflector, submitted_at, future = item
+            try:
+                result: PairEstimates = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                self.failed += 1
+                print(f"Processing of procedure {initiator.procedure_counter} failed: {e}")
+                continue
+            _RUNTIME.record(result.runtime_s)
+            self.gui_callback(initiator, reflector, result.phase_slope_data, result.amplitude_response_data,
+                              result.estimates)
+            _LATENCY.record(time.monotonic() - submitted_at)
+
+    def close(self, wait: bool = True):
+        """Stop the stage.
+
+        Args:
+            wait: Deliver the results of all submitted pairs first; if False,
+                pending pairs are cancelled
+        """
+        if not wait:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pending.put(None)
+        self._thread.join()
+        self.pool.shutdown(cancel_futures=True)
+
+
+def _init_worker(estimators: Dict[str, Estimator]):
+    global _worker_estimators
+    _worker_estimators = estimators
+
+
+def _run_in_worker(initiator, reflector) -> PairEstimates:
+    """Process one pair. Runs in a worker process."""
+    return run_estimators(initiator, reflector, _worker_estimators)
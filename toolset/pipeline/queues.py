@@ -0,0 +1,181 @@
+"""Bounded queues with a selectable policy for when they are full.
+
+A live pipeline can prefer fresh data over complete data: instead of
+blocking a producer that must keep draining a serial port, a full
+PolicyQueue can drop the oldest or the newest item, or coalesce by
+replacing the oldest item of the same stream with the new one. End-of-stream
+sentinels are never dropped or coalesced.
+"""
+
+import time
+from dataclasses import dataclass
+from queue import Full, Queue
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+BLOCK = 'block'
+DROP_OLDEST = 'drop-oldest'
+DROP_NEWEST = 'drop-newest'
+COALESCE = 'coalesce'
+QUEUE_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+
+@dataclass
+class QueueStats:
+    """Counters of a PolicyQueue."""
+    # put() calls, including sentinels and dropped items
+    put: int = 0
+    delivered: int = 0
+    # Items discarded by drop-oldest, drop-newest or a full coalescing queue
+    dropped: int = 0
+    # Items of a full coalescing queue replaced by a newer one of the same stream
+    coalesced: int = 0
+    # Puts that had to wait for room, and the total time they waited
+    blocked: int = 0
+    blocked_s: float = 0.0
+    max_depth: int = 0
+
+
+class PolicyQueue(Queue):
+    """queue.Queue whose put() follows a policy once maxsize items are queued.
+
+    block: wait for room, like queue.Queue.
+    drop-oldest: discard the oldest queued item to make room.
+    drop-newest: discard the item being put.
+    coalesce: discard the oldest queued item of the new item's stream (see
+        key), so other streams keep their items; discard the oldest item
+        if that stream has none queued.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = BLOCK,
+        key: Optional[Callable[[Any], Hashable]] = None,
+        is_sentinel: Optional[Callable[[Any], bool]] = None,
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ):
+        """
+        Args:
+            maxsize: Items queued before the policy applies, 0 for no limit
+            policy: One of QUEUE_POLICIES
+            key: Stream of an item for coalescing, e.g. its role on a merged
+                queue; None makes coalescing drop the oldest item
+            is_sentinel: Tells end-of-stream items, which are always queued;
+                defaults to `item is None`
+            on_drop: Called with every item discarded or replaced by the
+                policy, with the queue locked
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r}, expected one of {', '.join(QUEUE_POLICIES)}")
+        super().__init__(maxsize)
+        self.policy = policy
+        self.key = key
+        self.is_sentinel = is_sentinel if is_sentinel is not None else (lambda item: item is None)
+        self.on_drop = on_drop
+        self.stats = QueueStats()
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        """Put an item, applying the policy if the queue is full.
+
+        Only the block policy ever waits or raises queue.Full, and only for
+        items that are not sentinels.
+        """
+        with self.not_full:
+            stats = self.stats
+            stats.put += 1
+            if not self.is_sentinel(item) and 0 < self.maxsize <= self._qsize():
+                if self.policy == BLOCK:
+                    self._wait_for_room(block, timeout)
+                elif self.policy == DROP_NEWEST:
+                    stats.dropped += 1
+                    self._dropped(item)
+                    return
+                elif self.policy == COALESCE and self._coalesce(item):
+                    stats.coalesced += 1
+                elif self._drop_oldest():
+                    stats.dropped += 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            stats.max_depth = max(stats.max_depth, self._qsize())
+            self.not_empty.notify()
+
+    def _coalesce(self, item: Any) -> bool:
+        """Discard the oldest queued item of item's stream; False if there is none."""
+        if self.key is None:
+            return self._drop_oldest()
+        key = self.key(item)
+        return self._drop_first(lambda queued: self.key(queued) == key)
+
+    def _drop_oldest(self) -> bool:
+        return self._drop_first(lambda queued: True)
+
+    def _drop_first(self, matches: Callable[[Any], bool]) -> bool:
+        for i, queued in enumerate(self.queue):
+            if not self.is_sentinel(queued) and matches(queued):
+                del self.queue[i]
+                self.unfinished_tasks -= 1
+                self._dropped(queued)
+                return True
+        return False
+
+    def _dropped(self, item: Any):
+        if self.on_drop is not None:
+            self.on_drop(item)
+
+    def _wait_for_room(self, block: bool, timeout: Optional[float]):
+        # Same waiting as queue.Queue.put, with the wait counted
+        if not block:
+            raise Full
+        self.stats.blocked += 1
+        start = time.monotonic()
+        try:
+            if timeout is None:
+                while self._qsize() >= self.maxsize:
+                    self.not_full.wait()
+            elif timeout < 0:
+                raise ValueError("'timeout' must be a non-negative number")
+            else:
+                endtime = start + timeout
+                while self._qsize() >= self.maxsize:
+                    remaining = endtime - time.monotonic()
+                    if remaining <= 0.0:
+                        raise Full
+                    self.not_full.wait(remaining)
+        finally:
+            self.stats.blocked_s += time.monotonic() - start
+
+    def _get(self) -> Any:
+        self.stats.delivered += 1
+        return super()._get()
+
+
+def parse_queue_policies(specs: Iterable[str], stages: Iterable[str], default: str = BLOCK) -> Dict[str, str]:
+    """Parse `[STAGE=]POLICY` options into a policy per stage.
+
+    A spec without a stage applies to every stage; later specs override
+    earlier ones.
+
+    Args:
+        specs: Option values, e.g. ['drop-oldest', 'pairing=coalesce']
+        stages: Known stage names
+        default: Policy of stages no spec mentions
+
+    Returns:
+        Dictionary mapping every stage to its policy
+
+    Raises:
+        ValueError: If a stage or policy is unknown
+    """
+    stages = tuple(stages)
+    policies = {stage: default for stage in stages}
+    for spec in specs:
+        stage, sep, policy = spec.rpartition('=')
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy {policy!r} in {spec!r}, expected one of {', '.join(QUEUE_POLICIES)}")
+        if not sep:
+            policies = {stage: policy for stage in stages}
+        elif stage in policies:
+            policies[stage] = policy
+        else:
+            raise ValueError(f"Unknown queue stage {stage!r} in {spec!r}, expected one of {', '.join(stages)}")
+    return policies
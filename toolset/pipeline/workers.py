@@ -1,8 +1,12 @@
+import asyncio
+from contextlib import aclosing
 from queue import Queue
 from threading import Event
-from typing import Optional, Callable
+from typing import Optional, Callable, Dict, List, Sequence, Tuple
 from toolset.data_sources.base import DataSource
 from toolset.data_sources.events import CSEvent, StatusEvent, CapabilitiesEvent, SubeventResultEvent, ProcedureParamsEvent
+from toolset.data_sources.uart_source import UartDataSource, read_multiplexed
+from toolset.processing.cs_subevent_data_consumer import async_dual_stream_consumer
 
 
 def producer_worker(
@@ -28,17 +32,122 @@ def producer_worker(
         for event in source.read():
             if stop_event.is_set():
                 break
-            if isinstance(event, StatusEvent):
-                if status_callback:
-                    status_callback(event.key)
-            elif isinstance(event, CapabilitiesEvent):
-                if capabilities_callback:
-                    capabilities_callback(event.text)
-            elif isinstance(event, ProcedureParamsEvent):
-                if procedure_params_callback:
-                    procedure_params_callback(event.connection_interval_ms, event.procedure_interval)
-            elif isinstance(event, SubeventResultEvent):
-                output_queue.put(event.subevent)
+            _dispatch_event(event, output_queue, status_callback, capabilities_callback, procedure_params_callback)
     finally:
         output_queue.put(None)  # Sentinel
         source.close()
+
+
+def multiplexed_producer_worker(
+    routes: List[Tuple[UartDataSource, Queue, Dict[str, Callable]]],
+    stop_event: Event,
+):
+    """
+    Read several UART sources from a single thread using a selector,
+    dispatching each source's events like producer_worker does.
+
+    Args:
+        routes: (source, output_queue, callbacks) per source. callbacks maps
+            producer_worker callback argument names to callables.
+        stop_event: Event to signal stop
+    """
+    queues = {id(source): (output_queue, callbacks) for source, output_queue, callbacks in routes}
+    try:
+        for source, event in read_multiplexed([source for source, _, _ in routes], stop_event):
+            if stop_event.is_set():
+                break
+            output_queue, callbacks = queues[id(source)]
+            _dispatch_event(event, output_queue, **callbacks)
+    finally:
+        for source, output_queue, _ in routes:
+            output_queue.put(None)  # Sentinel
+            source.close()
+
+
+async def async_producer_worker(
+    source: DataSource,
+    output_queue: asyncio.Queue,
+    status_callback: Optional[Callable[[str], None]] = None,
+    capabilities_callback: Optional[Callable[[str], None]] = None,
+    procedure_params_callback: Optional[Callable[[int, int], None]] = None,
+):
+    """
+    asyncio counterpart of producer_worker: read events with source.aread(),
+    dispatch status/capabilities immediately, and put subevents on the queue.
+    Stop it by cancelling its task.
+
+    Args:
+        source: DataSource instance
+        output_queue: asyncio.Queue to put subevent data on
+        status_callback: Optional callback for status events
+        capabilities_callback: Optional callback for capabilities events
+    """
+    cancelled = False
+    try:
+        async with aclosing(source.aread()) as events:
+            async for event in events:
+                if isinstance(event, SubeventResultEvent):
+                    await output_queue.put(event.subevent)
+                else:
+                    _dispatch_event(event, output_queue, status_callback, capabilities_callback, procedure_params_callback)
+    except asyncio.CancelledError:
+        cancelled = True
+        raise
+    finally:
+        source.close()
+        # A cancelled pipeline's consumer is cancelled too and may never drain the queue
+        if not cancelled:
+            await output_queue.put(None)  # Sentinel
+
+
+async def run_async_pipeline(
+    source_pairs: Sequence[Tuple[DataSource, DataSource]],
+    gui_callback: Optional[Callable] = None,
+    queue_size: int = 100,
+):
+    """
+    Run producers and a consumer for every (initiator, reflector) source
+    pair as tasks of the running event loop, until all sources are done.
+
+    Args:
+        source_pairs: (initiator, reflector) DataSource per device pair
+        gui_callback: Optional callback called with the coupled data of every pair;
+            it receives the pair index as first argument
+        queue_size: Subevents buffered per source
+    """
+    tasks = []
+    for index, (initiator, reflector) in enumerate(source_pairs):
+        initiator_queue = asyncio.Queue(maxsize=queue_size)
+        reflector_queue = asyncio.Queue(maxsize=queue_size)
+        callback = None
+        if gui_callback:
+            callback = lambda *data, index=index: gui_callback(index, *data)
+        tasks.append(asyncio.create_task(async_producer_worker(initiator, initiator_queue)))
+        tasks.append(asyncio.create_task(async_producer_worker(reflector, reflector_queue)))
+        tasks.append(asyncio.create_task(async_dual_stream_consumer(initiator_queue, reflector_queue, callback)))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _dispatch_event(
+    event: CSEvent,
+    output_queue: Queue,
+    status_callback: Optional[Callable[[str], None]] = None,
+    capabilities_callback: Optional[Callable[[str], None]] = None,
+    procedure_params_callback: Optional[Callable[[int, int], None]] = None,
+):
+    if isinstance(event, StatusEvent):
+        if status_callback:
+            status_callback(event.key)
+    elif isinstance(event, CapabilitiesEvent):
+        if capabilities_callback:
+            capabilities_callback(event.text)
+    elif isinstance(event, ProcedureParamsEvent):
+        if procedure_params_callback:
+            procedure_params_callback(event.connection_interval_ms, event.procedure_interval)
+    elif isinstance(event, SubeventResultEvent):
+        output_queue.put(event.subevent)
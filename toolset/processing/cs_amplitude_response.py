@@ -1,7 +1,7 @@
 from typing import Dict
 from math import log, sqrt
+import numpy as np
 from toolset.cs_utils.cs_subevent import SubeventResults
-from toolset.cs_utils.cs_step import CSStepMode2, ToneQualityIndicatorExtensionSlot
 
 def avg_dbm(a, b):
     a_mw = 10 ** (a / 10)
@@ -27,39 +27,19 @@ def calculate_amplitude_response_data(initiator: SubeventResults, reflector: Sub
     return calculate_amplitude_response(initiator_rssi_vals, reflector_rssi_vals)
 
 def _extract_channel_rssi(subevent: SubeventResults) -> Dict[int, float]:
-    channel_rssi = {}
-
-    rpl_dbm = subevent.reference_power_level
-
-    for step in subevent.steps:
-        if not isinstance(step, CSStepMode2):
-            continue
+    tones = subevent.mode2_tones()
+    return channel_rssi_from_iq(tones.step_channels(), *tones.average_iq(), subevent.reference_power_level)
 
-        if not step.tones:
-            continue
+def channel_rssi_from_iq(channels: np.ndarray, avg_i: np.ndarray, avg_q: np.ndarray, rpl_dbm: int) -> Dict[int, float]:
+    """RSSI per channel from the average I/Q of each mode-2 step and the reference power level."""
+    channel_rssi = {}
 
-        avg_i, avg_q = _calculate_average_rssi(step)
-        mag = sqrt(avg_i ** 2 + avg_q ** 2)
+    for channel, i, q in zip(channels.tolist(), avg_i.tolist(), avg_q.tolist()):
+        mag = sqrt(i ** 2 + q ** 2)
         if mag == 0:
             continue
         rssi_dbm = 20 * log(mag / 2048, 10) + rpl_dbm
         # TODO: if channel_rssi is not empty, we need to do something smart. Maybe find average or something like that?
-        channel_rssi[step.channel] = rssi_dbm
+        channel_rssi[channel] = rssi_dbm
 
     return channel_rssi
-
-
-def _calculate_average_rssi(step: CSStepMode2) -> tuple[float, float]:
-    valid_tones = [
-        tone for tone in step.tones
-        if tone.quality_extension_slot != ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
-    ]
-
-    if not valid_tones:
-        return 0.0, 0.0
-
-    sum_i = sum(tone.pct_i for tone in valid_tones)
-    sum_q = sum(tone.pct_q for tone in valid_tones)
-
-    count = len(valid_tones)
-    return sum_i / count, sum_q / count
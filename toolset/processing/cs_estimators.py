@@ -0,0 +1,97 @@
+"""Estimators run on every coupled subevent pair.
+
+A coupled pair is reduced to CompactSubevent arrays (channel and average
+I/Q of each mode-2 step), which is all the phase slope, amplitude response
+and registered estimators need. The compact form is cheap to pickle, so
+pairs can be processed in worker processes (see pipeline.EstimatorStage).
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, NamedTuple, Optional
+import numpy as np
+from toolset.cs_utils.cs_subevent import SubeventResults
+from toolset.processing.cs_amplitude_response import calculate_amplitude_response, channel_rssi_from_iq
+from toolset.processing.cs_ifft import compute_ifft_response
+from toolset.processing.cs_music import compute_music_spectrum
+from toolset.processing.cs_phase_slope import calculate_phase_response, channel_phases_from_iq
+
+# Estimator: (phase_slope_data, amplitude_response_data) -> result
+Estimator = Callable[[Dict[int, float], Dict[int, float]], Any]
+
+# Estimators run for every pair, by name. Worker processes look estimators
+# up by reference, so they must be module-level functions.
+ESTIMATORS: Dict[str, Estimator] = {
+    'ifft': compute_ifft_response,
+    'music': compute_music_spectrum,
+}
+
+
+def register_estimator(name: str, estimator: Estimator):
+    """Run estimator for every coupled pair; its result is passed on under name."""
+    ESTIMATORS[name] = estimator
+
+
+class CompactSubevent(NamedTuple):
+    """The parts of a subevent the estimators use."""
+    procedure_counter: int
+    reference_power_level: int
+    # Per mode-2 step
+    channels: np.ndarray
+    avg_i: np.ndarray
+    avg_q: np.ndarray
+
+
+def compact_subevent(subevent: SubeventResults) -> CompactSubevent:
+    tones = subevent.mode2_tones()
+    avg_i, avg_q = tones.average_iq()
+    return CompactSubevent(subevent.procedure_counter, subevent.reference_power_level,
+                           tones.step_channels(), avg_i, avg_q)
+
+
+@dataclass
+class PairEstimates:
+    """Results of processing one coupled pair."""
+    procedure_counter: int
+    phase_slope_data: Dict[int, float]
+    amplitude_response_data: Dict[int, float]
+    # Estimator name -> result; None if the estimator failed
+    estimates: Dict[str, Any]
+    # Time run_estimators() took
+    runtime_s: float = 0.0
+
+
+def run_estimators(
+    initiator: CompactSubevent,
+    reflector: CompactSubevent,
+    estimators: Optional[Dict[str, Estimator]] = None,
+) -> PairEstimates:
+    """Compute phase slope and amplitude response of a pair, then run the estimators on them.
+
+    Args:
+        initiator: Compact initiator subevent
+        reflector: Compact reflector subevent
+        estimators: Estimators by name, ESTIMATORS if None
+
+    Returns:
+        PairEstimates of the pair
+    """
+    start = time.perf_counter()
+    phase_slope_data = calculate_phase_response(
+        channel_phases_from_iq(initiator.channels, initiator.avg_i, initiator.avg_q),
+        channel_phases_from_iq(reflector.channels, reflector.avg_i, reflector.avg_q),
+    )
+    amplitude_response_data = calculate_amplitude_response(
+        channel_rssi_from_iq(initiator.channels, initiator.avg_i, initiator.avg_q, initiator.reference_power_level),
+        channel_rssi_from_iq(reflector.channels, reflector.avg_i, reflector.avg_q, reflector.reference_power_level),
+    )
+
+    estimates = {}
+    for name, estimator in (ESTIMATORS if estimators is None else estimators).items():
+        try:
+            estimates[name] = estimator(phase_slope_data, amplitude_response_data)
+        except Exception as e:
+            print(f"Estimator {name} failed for procedure {initiator.procedure_counter}: {e}")
+            estimates[name] = None
+    return PairEstimates(initiator.procedure_counter, phase_slope_data, amplitude_response_data, estimates,
+                         time.perf_counter() - start)
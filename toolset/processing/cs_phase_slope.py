@@ -2,14 +2,15 @@ from typing import Dict, Optional
 from math import atan2, pi
 import numpy as np
 from toolset.cs_utils.cs_subevent import SubeventResults
-from toolset.cs_utils.cs_step import CSStepMode2, ToneQualityIndicatorExtensionSlot
 from toolset.constants import SPEED_OF_LIGHT, BLE_CS_STEP_1MHZ
 
 
 def calculate_phase_slope_data(initiator: SubeventResults, reflector: SubeventResults) -> Dict[int, float]:
-    initiator_phases = _extract_channel_phases(initiator)
-    reflector_phases = _extract_channel_phases(reflector)
+    return calculate_phase_response(_extract_channel_phases(initiator), _extract_channel_phases(reflector))
 
+
+def calculate_phase_response(initiator_phases: Dict[int, float], reflector_phases: Dict[int, float]) -> Dict[int, float]:
+    """Channel phase response from the per-channel phases measured by both sides."""
     common_channels = set(initiator_phases.keys()) & set(reflector_phases.keys())
 
     phase_sums = {}
@@ -67,34 +68,15 @@ def _unwrap_phases_by_channel(phase_by_channel: Dict[int, float]) -> Dict[int, f
 
 
 def _extract_channel_phases(subevent: SubeventResults) -> Dict[int, float]:
-    channel_phases = {}
-
-    for step in subevent.steps:
-        if not isinstance(step, CSStepMode2):
-            continue
+    tones = subevent.mode2_tones()
+    return channel_phases_from_iq(tones.step_channels(), *tones.average_iq())
 
-        if not step.tones:
-            continue
 
-        avg_i, avg_q = _calculate_average_iq(step)
-        phase = atan2(avg_q, avg_i)
+def channel_phases_from_iq(channels: np.ndarray, avg_i: np.ndarray, avg_q: np.ndarray) -> Dict[int, float]:
+    """Phase per channel from the average I/Q of each mode-2 step."""
+    channel_phases = {}
 
-        channel_phases[step.channel] = phase
+    for channel, i, q in zip(channels.tolist(), avg_i.tolist(), avg_q.tolist()):
+        channel_phases[channel] = atan2(q, i)
 
     return channel_phases
-
-
-def _calculate_average_iq(step: CSStepMode2) -> tuple[float, float]:
-    valid_tones = [
-        tone for tone in step.tones
-        if tone.quality_extension_slot != ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
-    ]
-
-    if not valid_tones:
-        return 0.0, 0.0
-
-    sum_i = sum(tone.pct_i for tone in valid_tones)
-    sum_q = sum(tone.pct_q for tone in valid_tones)
-
-    count = len(valid_tones)
-    return sum_i / count, sum_q / count
@@ -1,62 +1,355 @@
 
 
+import asyncio
+import time
+from dataclasses import dataclass, field
 from queue import Queue
-from typing import Dict, Tuple, Optional, Callable
+from threading import Thread
+from typing import Dict, List, Tuple, Optional, Callable
 from toolset.cs_utils.cs_subevent import SubeventResults
 from toolset.processing.cs_phase_slope import calculate_phase_slope_data
 from toolset.processing.cs_amplitude_response import calculate_amplitude_response_data
+from toolset.stats import STATS
 
-def dual_stream_consumer(initiator_queue: Queue, reflector_queue: Queue, gui_callback: Optional[Callable] = None):
+INITIATOR = 0
+REFLECTOR = 1
+
+# Procedure counters are 16 bit and wrap around
+COUNTER_MODULUS = 0x10000
+COUNTER_HALF = COUNTER_MODULUS // 2
+DEFAULT_PAIRING_WINDOW = 1024
+DEFAULT_ORPHAN_AGE_S = 10.0
+
+_PAIRS = STATS.counter('pairing.pairs')
+_ORPHANS = STATS.counter('pairing.orphans')
+_JOIN_LATENCY = STATS.histogram('pairing.join_latency_s')
+# Time a subevent waited in the merged queue before the consumer took it
+_QUEUE_WAIT = STATS.histogram('pairing.queue_wait_s')
+# Phase slope and amplitude response computed in the consumer thread; IFFT and
+# MUSIC then run while rendering (gui.render_s)
+_INLINE_RUNTIME = STATS.histogram('estimator.inline_runtime_s')
+
+
+class MergedQueueWriter:
+    """Producer-side handle on a merged event channel.
+
+    Looks like a Queue to producer_worker: every put() lands on the shared
+    merged queue as (role, item, arrival time), so one consumer sees events
+    of both streams in the order they arrived.
+    """
+
+    def __init__(self, merged_queue: Queue, role: int):
+        """
+        Args:
+            merged_queue: Queue shared by the producers of both roles
+            role: INITIATOR or REFLECTOR
+        """
+        self.merged_queue = merged_queue
+        self.role = role
+
+    def put(self, item: Optional[SubeventResults], block: bool = True, timeout: Optional[float] = None):
+        self.merged_queue.put((self.role, item, time.monotonic()), block, timeout)
+
+
+@dataclass
+class JoinLatencyStats:
+    """Time from the first half of a pair arriving to the second one."""
+    pairs: int = 0
+    total_s: float = 0.0
+    last_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.pairs if self.pairs else 0.0
+
+
+@dataclass
+class CoupledPair:
+    """Initiator and reflector subevent of one procedure."""
+    initiator: SubeventResults
+    reflector: SubeventResults
+    join_latency_s: float
+
+
+@dataclass
+class PairingStats:
+    """Counters of subevents that never found their other half."""
+    # Per role, indexed by INITIATOR / REFLECTOR
+    received: List[int] = field(default_factory=lambda: [0, 0])
+    orphaned: List[int] = field(default_factory=lambda: [0, 0])
+    # Orphans dropped because the counters moved on by more than the window
+    evicted_by_window: int = 0
+    # Orphans dropped because they waited longer than max_age_s
+    evicted_by_age: int = 0
+    # Buffered subevents replaced by a newer one with the same counter
+    duplicates: int = 0
+
+    def orphan_rate(self, role: int) -> float:
+        """Fraction of the subevents of a role that were dropped unpaired."""
+        return self.orphaned[role] / self.received[role] if self.received[role] else 0.0
+
+
+def counter_distance(counter: int, reference: int) -> int:
+    """Signed distance from reference to counter in 16-bit serial number arithmetic.
+
+    Procedure counters wrap from 0xFFFF to 0, so 2 is 4 counters after
+    0xFFFE. Distances are in -0x8000..0x7FFF.
+    """
+    return (counter - reference + COUNTER_HALF) % COUNTER_MODULUS - COUNTER_HALF
+
+
+class PairingEngine:
+    """Couples initiator and reflector subevents by procedure counter.
+
+    Subevents may be added in any order; a pair is emitted by the add() that
+    completes it, so one stream running ahead or stalling never delays pairs
+    that are already complete.
+
+    Unpaired subevents are kept for a bounded window: once a new subevent is
+    more than `window` counters away from a buffered one (in wraparound
+    arithmetic) or the buffered one waited more than `max_age_s`, the latter
+    is evicted as an orphan. Memory stays constant however many subevents
+    one side drops, and a counter reused after wrapping around never pairs
+    with data from 65536 procedures ago.
+
+    The limits suit live data, where both boards stream in step. When
+    replaying files one source may run far ahead of the other, so replays
+    disable both limits and keep every orphan until its partner arrives.
+    """
+
+    def __init__(self, window: Optional[int] = DEFAULT_PAIRING_WINDOW,
+                 max_age_s: Optional[float] = DEFAULT_ORPHAN_AGE_S):
+        """
+        Args:
+            window: Procedure counters an orphan may lag behind the newest
+                subevent; below half the counter range. None to never evict
+                by counter
+            max_age_s: Seconds an orphan may wait for its other half, None
+                to never evict by age
+        """
+        if window is not None and not 0 < window < COUNTER_HALF:
+            raise ValueError(f"Pairing window must be between 1 and {COUNTER_HALF - 1}, got {window}")
+        if max_age_s is not None and max_age_s <= 0:
+            raise ValueError(f"Orphan age must be positive, got {max_age_s}")
+        self.window = window
+        self.max_age_s = max_age_s
+        # Per role: procedure counter -> (subevent, arrival time), in arrival order
+        self.buffers: Tuple[Dict[int, Tuple[SubeventResults, float]], ...] = ({}, {})
+        # Per role: a buffered counter arrived before a smaller one, so the
+        # buffer is not in counter order and must be scanned in full
+        self._disordered = [False, False]
+        self.join_latency = JoinLatencyStats()
+        self.stats = PairingStats()
+
+    def add(self, role: int, subevent: SubeventResults, arrived_at: Optional[float] = None) -> Optional[CoupledPair]:
+        """Add a subevent of one role.
+
+        Args:
+            role: INITIATOR or REFLECTOR
+            subevent: Subevent to pair
+            arrived_at: time.monotonic() when the subevent left its source;
+                defaults to now
+
+        Returns:
+            The completed pair, or None if the other half has not arrived yet
+        """
+        if arrived_at is None:
+            arrived_at = time.monotonic()
+        proc_counter = subevent.procedure_counter % COUNTER_MODULUS
+        self.stats.received[role] += 1
+        self._evict(proc_counter, arrived_at)
+
+        other = self.buffers[1 - role].pop(proc_counter, None)
+        if other is None:
+            buffer = self.buffers[role]
+            if buffer.pop(proc_counter, None) is not None:
+                self.stats.duplicates += 1
+                self.stats.orphaned[role] += 1
+                _ORPHANS.add()
+            if buffer and counter_distance(proc_counter, next(reversed(buffer))) <= 0:
+                self._disordered[role] = True
+            buffer[proc_counter] = (subevent, arrived_at)
+            return None
+
+        other_subevent, other_arrived_at = other
+        latency = max(arrived_at - other_arrived_at, 0.0)
+        stats = self.join_latency
+        stats.pairs += 1
+        stats.total_s += latency
+        stats.last_s = latency
+        stats.max_s = max(stats.max_s, latency)
+        _PAIRS.add()
+        _JOIN_LATENCY.record(latency)
+        if role == INITIATOR:
+            return CoupledPair(subevent, other_subevent, latency)
+        return CoupledPair(other_subevent, subevent, latency)
+
+    def _evict(self, proc_counter: int, now: float):
+        """Drop orphans out of the window around proc_counter or older than max_age_s."""
+        window = self.window
+        if window is None and self.max_age_s is None:
+            return
+        oldest_arrival = now - self.max_age_s if self.max_age_s is not None else None
+        stats = self.stats
+        for role, buffer in enumerate(self.buffers):
+            stale = []
+            for counter, (_, arrived_at) in buffer.items():
+                if window is not None and abs(counter_distance(proc_counter, counter)) > window:
+                    stats.evicted_by_window += 1
+                elif oldest_arrival is not None and arrived_at < oldest_arrival:
+                    stats.evicted_by_age += 1
+                elif self._disordered[role]:
+                    # A fresh counter may sit before a stale one: check them all
+                    continue
+                else:
+                    # In counter and arrival order, so the rest is newer still
+                    break
+                stale.append(counter)
+            for counter in stale:
+                del buffer[counter]
+            if stale:
+                stats.orphaned[role] += len(stale)
+                _ORPHANS.add(len(stale))
+            if self._disordered[role]:
+                counters = list(buffer)
+                self._disordered[role] = any(counter_distance(b, a) <= 0 for a, b in zip(counters, counters[1:]))
+
+    def print_summary(self):
+        latency = self.join_latency
+        stats = self.stats
+        _print_unpaired_summary(self.buffers[INITIATOR], self.buffers[REFLECTOR])
+        print(f"Coupled pairs: {latency.pairs}")
+        if latency.pairs:
+            print(f"  Join latency: mean {latency.mean_s * 1000:.1f} ms, max {latency.max_s * 1000:.1f} ms")
+        if stats.evicted_by_window or stats.evicted_by_age or stats.duplicates:
+            print(f"Evicted orphans: {stats.evicted_by_window} out of window, {stats.evicted_by_age} too old, "
+                  f"{stats.duplicates} duplicate counters")
+            print(f"  Orphan rate: initiator {stats.orphan_rate(INITIATOR):.1%}, "
+                  f"reflector {stats.orphan_rate(REFLECTOR):.1%}")
+
+
+def merged_stream_consumer(merged_queue: Queue, gui_callback: Optional[Callable] = None,
+                           engine: Optional[PairingEngine] = None,
+                           pair_handler: Optional[Callable[[SubeventResults, SubeventResults], None]] = None
+                           ) -> PairingEngine:
+    """
+    Consume subevents of both streams from one merged queue and couple them
+    by procedure_counter as soon as both halves are there.
+
+    Args:
+        merged_queue: Queue fed through a MergedQueueWriter per role; each
+            role ends with a None item
+        gui_callback: Optional callback to update GUI with coupled data
+        engine: PairingEngine with the buffer limits to use, default limits if None
+        pair_handler: Called with (initiator, reflector) of every coupled pair
+            instead of processing it here, e.g. EstimatorStage.submit
+
+    Returns:
+        The PairingEngine, holding the join latency and orphan statistics
+    """
+    if engine is None:
+        engine = PairingEngine()
+    if pair_handler is None:
+        pair_handler = lambda initiator, reflector: process_coupled_subevents(initiator, reflector, gui_callback)
+    done = [False, False]
+
+    while not all(done):
+        role, data, arrived_at = merged_queue.get()
+        if data is None:
+            done[role] = True
+            continue
+        _QUEUE_WAIT.record(time.monotonic() - arrived_at)
+        pair = engine.add(role, data, arrived_at)
+        if pair is not None:
+            pair_handler(pair.initiator, pair.reflector)
+
+    engine.print_summary()
+    return engine
+
+
+def dual_stream_consumer(initiator_queue: Queue, reflector_queue: Queue, gui_callback: Optional[Callable] = None,
+                         engine: Optional[PairingEngine] = None,
+                         pair_handler: Optional[Callable[[SubeventResults, SubeventResults], None]] = None
+                         ) -> PairingEngine:
     """
     Consume subevents from initiator and reflector queues and couple them by procedure_counter.
 
+    Both queues are forwarded into one merged queue, so neither stream
+    waits on the other. New code should hand MergedQueueWriters to the
+    producers and call merged_stream_consumer directly.
+
     Args:
         initiator_queue: Queue containing initiator SubeventResults
         reflector_queue: Queue containing reflector SubeventResults
         gui_callback: Optional callback to update GUI with coupled data
+        engine: PairingEngine with the buffer limits to use, default limits if None
+        pair_handler: Called with (initiator, reflector) of every coupled pair
+            instead of processing it here
+
+    Returns:
+        The PairingEngine, holding the join latency and orphan statistics
+    """
+    merged_queue = Queue()
+    for role, queue in enumerate((initiator_queue, reflector_queue)):
+        Thread(target=_forward, args=(queue, MergedQueueWriter(merged_queue, role)),
+               name=f"Forward{('Initiator', 'Reflector')[role]}", daemon=True).start()
+    return merged_stream_consumer(merged_queue, gui_callback, engine, pair_handler)
+
+
+def _forward(queue: Queue, writer: MergedQueueWriter):
+    while True:
+        data = queue.get()
+        writer.put(data)
+        if data is None:
+            return
+
+
+async def async_dual_stream_consumer(initiator_queue: asyncio.Queue, reflector_queue: asyncio.Queue,
+                                     gui_callback: Optional[Callable] = None,
+                                     engine: Optional[PairingEngine] = None) -> PairingEngine:
     """
-    initiator_buffer: Dict[int, SubeventResults] = {}
-    reflector_buffer: Dict[int, SubeventResults] = {}
-
-    initiator_done = False
-    reflector_done = False
-
-    while not (initiator_done and reflector_done):
-        # Read from initiator queue
-        if not initiator_done:
-            initiator_data = initiator_queue.get()
-            if initiator_data is None:
-                initiator_done = True
-            else:
-                proc_counter = initiator_data.procedure_counter
-                # TODO: fix issue when proc_counter wraps around
-                initiator_buffer[proc_counter] = initiator_data
-
-                # Check if we have a matching reflector
-                if proc_counter in reflector_buffer:
-                    process_coupled_subevents(
-                        initiator_buffer.pop(proc_counter),
-                        reflector_buffer.pop(proc_counter),
-                        gui_callback
-                    )
-
-        # Read from reflector queue
-        if not reflector_done:
-            reflector_data = reflector_queue.get()
-            if reflector_data is None:
-                reflector_done = True
-            else:
-                proc_counter = reflector_data.procedure_counter
-                reflector_buffer[proc_counter] = reflector_data
-
-                # Check if we have a matching initiator
-                if proc_counter in initiator_buffer:
-                    process_coupled_subevents(
-                        initiator_buffer.pop(proc_counter),
-                        reflector_buffer.pop(proc_counter),
-                        gui_callback
-                    )
+    asyncio counterpart of dual_stream_consumer, for pipelines that run many
+    sources on one event loop. Both queues are awaited at once, so neither
+    stream waits on the other.
+
+    Args:
+        initiator_queue: asyncio.Queue containing initiator SubeventResults
+        reflector_queue: asyncio.Queue containing reflector SubeventResults
+        gui_callback: Optional callback to update GUI with coupled data
+        engine: PairingEngine with the buffer limits to use, default limits if None
+
+    Returns:
+        The PairingEngine, holding the join latency and orphan statistics
+    """
+    queues = (initiator_queue, reflector_queue)
+    if engine is None:
+        engine = PairingEngine()
+    gets = {asyncio.ensure_future(queue.get()): role for role, queue in enumerate(queues)}
+
+    try:
+        while gets:
+            done, _ = await asyncio.wait(gets, return_when=asyncio.FIRST_COMPLETED)
+            for get in done:
+                role = gets.pop(get)
+                data = get.result()
+                if data is None:
+                    continue
+                gets[asyncio.ensure_future(queues[role].get())] = role
+
+                pair = engine.add(role, data)
+                if pair is not None:
+                    process_coupled_subevents(pair.initiator, pair.reflector, gui_callback)
+    finally:
+        for get in gets:
+            get.cancel()
+
+    engine.print_summary()
+    return engine
+
 
+def _print_unpaired_summary(initiator_buffer: Dict[int, Tuple[SubeventResults, float]],
+                            reflector_buffer: Dict[int, Tuple[SubeventResults, float]]):
     # Process any remaining unpaired subevents
     print("\n=== Summary ===")
     print(f"Unpaired initiator subevents: {len(initiator_buffer)}")
@@ -76,8 +369,10 @@ def process_coupled_subevents(initiator: SubeventResults, reflector: SubeventRes
         reflector: Reflector subevent
         gui_callback: Optional callback to update GUI
     """
+    start = time.perf_counter()
     phase_slope_data = calculate_phase_slope_data(initiator, reflector)
     amplitude_response_data = calculate_amplitude_response_data(initiator, reflector)
+    _INLINE_RUNTIME.record(time.perf_counter() - start)
 
     if gui_callback:
         gui_callback(initiator, reflector, phase_slope_data, amplitude_response_data)
\ No newline at end of file
@@ -5,7 +5,7 @@ from typing import Dict, Optional
 import numpy as np
 
 from toolset.cs_utils.cs_subevent import SubeventResults
-from toolset.cs_utils.cs_step import CSStepMode2, ToneQualityIndicator, ToneQualityIndicatorExtensionSlot
+from toolset.cs_utils.cs_step import ToneQualityIndicator, ToneQualityIndicatorExtensionSlot
 
 # Fixed BLE CS channel set used for feature vector alignment (channels 2–78, excluding advertising channels 0/1/37/38/39)
 PHASE_CHANNELS = [ch for ch in range(2, 79) if ch not in (37, 38, 39)]
@@ -51,32 +51,25 @@ def ext_slot_emission(subevent: SubeventResults, threshold: float = 30.0) -> Opt
 
     A large magnitude in an extension slot indicates external RF emission on that channel.
     """
-    for step in subevent.steps:
-        if not isinstance(step, CSStepMode2):
-            continue
-        for tone in step.tones:
-            if tone.quality_extension_slot != ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED:
-                continue
-            mag = (tone.pct_i ** 2 + tone.pct_q ** 2) ** 0.5
-            if mag > threshold:
-                return f'ext slot emission on ch {step.channel}: mag={mag:.1f}'
+    tones = subevent.mode2_tones()
+    ext_slot = tones.quality_extension_slot == ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
+    mag = np.sqrt(tones.pct_i.astype(np.float64) ** 2 + tones.pct_q.astype(np.float64) ** 2)
+    hits = np.flatnonzero(ext_slot & (mag > threshold))
+    if len(hits):
+        t = hits[0]
+        return f'ext slot emission on ch {tones.channel[t]}: mag={mag[t]:.1f}'
     return None
 
 
 def first_bad_tone(subevent: SubeventResults) -> Optional[str]:
     """Return description when at least 1 bad tone is found, or None."""
-    bad = []
-    for step in subevent.steps:
-        if not isinstance(step, CSStepMode2):
-            continue
-        for tone in step.tones:
-            if tone.quality_extension_slot == ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED:
-                continue
-            if tone.quality in (ToneQualityIndicator.TONE_QUALITY_MEDIUM,
-                                ToneQualityIndicator.TONE_QUALITY_LOW):
-                bad.append(f'ch {step.channel}={tone.quality.name}')
-                if len(bad) >= 1:
-                    return f'{len(bad)} bad tones: {", ".join(bad)}'
+    tones = subevent.mode2_tones()
+    ext_slot = tones.quality_extension_slot == ToneQualityIndicatorExtensionSlot.TONE_EXTENSION_NOT_EXPECTED
+    hits = np.flatnonzero(~ext_slot & _is_bad_quality(tones.quality))
+    if len(hits):
+        t = hits[0]
+        quality = ToneQualityIndicator(int(tones.quality[t]))
+        return f'1 bad tones: ch {tones.channel[t]}={quality.name}'
     return None
 
 
@@ -84,14 +77,13 @@ def subevent_quality_ok(subevent: Optional[SubeventResults]) -> bool:
     """Return False if any mode-2 step has a MEDIUM or LOW tone quality."""
     if subevent is None:
         return False
-    for step in subevent.steps:
-        if not isinstance(step, CSStepMode2):
-            continue
-        for tone in step.tones:
-            if tone.quality in (ToneQualityIndicator.TONE_QUALITY_MEDIUM,
-                                ToneQualityIndicator.TONE_QUALITY_LOW):
-                return False
-    return True
+    return not _is_bad_quality(subevent.mode2_tones().quality).any()
+
+
+def _is_bad_quality(quality: np.ndarray) -> np.ndarray:
+    """Mask of MEDIUM or LOW tone quality values."""
+    return ((quality == ToneQualityIndicator.TONE_QUALITY_MEDIUM)
+            | (quality == ToneQualityIndicator.TONE_QUALITY_LOW))
 
 
 def build_feature_vector(
@@ -0,0 +1,273 @@
+"""Pipeline-wide counters, latency histograms and gauges.
+
+Stages record into the process-wide STATS registry: counters for
+throughput (bytes read, subevents parsed), histograms for durations
+(parse time, pairing latency, estimator runtime, GUI render time) and
+gauges sampled on demand (queue depths). STATS.snapshot() returns all
+of it as plain data; StatsDumper writes snapshots periodically as JSON
+lines and, optionally, a summary to the console.
+
+Metric names are dotted, stage first: 'uart.bytes_read',
+'pairing.join_latency_s'. Durations are in seconds.
+"""
+
+import json
+import time
+from bisect import bisect_left
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, TextIO, Union
+
+DEFAULT_STATS_INTERVAL_S = 5.0
+
+# Histogram bucket upper bounds: 1 us to ~100 s, four buckets per octave
+_BUCKET_BOUNDS: List[float] = [1e-6 * 2 ** (i / 4) for i in range(4 * 27)]
+
+
+class Counter:
+    """Monotonic count, e.g. of bytes or subevents."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = Lock()
+
+    def add(self, n: int = 1):
+        with self._lock:
+            self.value += n
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+
+class Histogram:
+    """Distribution of durations in log-spaced buckets (about 19% wide)."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
+            self._buckets = [0] * (len(_BUCKET_BOUNDS) + 1)
+
+    def record(self, value: float):
+        with self._lock:
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+            self._buckets[bisect_left(_BUCKET_BOUNDS, value)] += 1
+
+    def merge(self, other: 'Histogram'):
+        """Add the values recorded by other, e.g. a histogram returned by a worker process."""
+        with other._lock:
+            count, total, maximum, buckets = other.count, other.total, other.max, list(other._buckets)
+        with self._lock:
+            self.count += count
+            self.total += total
+            self.max = max(self.max, maximum)
+            self._buckets = [a + b for a, b in zip(self._buckets, buckets)]
+
+    def __getstate__(self):
+        # Picklable for results of worker processes; the lock stays behind
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = Lock()
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100), capped at max."""
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self._buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(_BUCKET_BOUNDS[i], self.max) if i < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, p50/p90/p99 and max, all taken at the same instant."""
+        with self._lock:
+            return {
+                'count': self.count,
+                'mean': self.total / self.count if self.count else 0.0,
+                'p50': self._percentile(50),
+                'p90': self._percentile(90),
+                'p99': self._percentile(99),
+                'max': self.max,
+            }
+
+
+# A gauge returns a number, or a dictionary of numbers such as a dataclass' fields
+Gauge = Callable[[], Union[float, Dict[str, Any]]]
+
+
+class StatsRegistry:
+    """Named counters, histograms and gauges of the pipeline."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._counters: Dict[str, Counter] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Gauge] = {}
+        self._lock = Lock()
+
+    def counter(self, name: str) -> Counter:
+        """Return the counter of this name, creating it on first use."""
+        with self._lock:
+            return self._counters.setdefault(name, Counter())
+
+    def histogram(self, name: str) -> Histogram:
+        """Return the histogram of this name, creating it on first use."""
+        with self._lock:
+            return self._histograms.setdefault(name, Histogram())
+
+    def gauge(self, name: str, gauge: Gauge):
+        """Sample gauge() in every snapshot, replacing a gauge of the same name."""
+        with self._lock:
+            self._gauges[name] = gauge
+
+    def remove_gauge(self, name: str):
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current value of every metric.
+
+        Returns:
+            Dictionary with 'time' (Unix time), 'uptime_s', 'counters' (name
+            -> value), 'histograms' (name -> count/mean/p50/p90/p99/max) and
+            'gauges' (name -> sampled value; None if sampling failed)
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+
+        sampled = {}
+        for name, gauge in gauges.items():
+            try:
+                sampled[name] = gauge()
+            except Exception:
+                sampled[name] = None
+
+        return {
+            'time': time.time(),
+            'uptime_s': time.monotonic() - self.started,
+            'counters': {name: counter.value for name, counter in sorted(counters.items())},
+            'histograms': {name: histogram.summary() for name, histogram in sorted(histograms.items())},
+            'gauges': dict(sorted(sampled.items())),
+        }
+
+    def reset(self):
+        """Zero all counters and histograms and drop the gauges; mainly for tests and benchmarks.
+
+        Counter and Histogram objects stay valid, so stages may keep
+        references to them.
+        """
+        with self._lock:
+            self.started = time.monotonic()
+            for counter in self._counters.values():
+                counter.reset()
+            for histogram in self._histograms.values():
+                histogram.reset()
+            self._gauges.clear()
+
+
+# Registry every stage records into
+STATS = StatsRegistry()
+
+
+def format_snapshot(snapshot: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> str:
+    """Render a snapshot as console text; counters show rates since previous if given."""
+    lines = [f"=== Stats at {snapshot['uptime_s']:.1f} s ==="]
+    elapsed = snapshot['uptime_s'] - previous['uptime_s'] if previous else 0.0
+    for name, value in snapshot['counters'].items():
+        line = f"  {name}: {value}"
+        if elapsed > 0:
+            rate = (value - previous['counters'].get(name, 0)) / elapsed
+            line += f" ({rate:.1f}/s)"
+        lines.append(line)
+    for name, h in snapshot['histograms'].items():
+        if h['count']:
+            lines.append(f"  {name}: n={h['count']} mean {h['mean'] * 1e3:.2f} ms p50 {h['p50'] * 1e3:.2f} ms "
+                         f"p99 {h['p99'] * 1e3:.2f} ms max {h['max'] * 1e3:.2f} ms")
+    for name, value in snapshot['gauges'].items():
+        if isinstance(value, dict):
+            value = ' '.join(f"{k}={v:.3g}" if isinstance(v, float) else f"{k}={v}" for k, v in value.items())
+        lines.append(f"  {name}: {value}")
+    return '\n'.join(lines)
+
+
+class StatsDumper:
+    """Writes registry snapshots every interval from a background thread."""
+
+    def __init__(
+        self,
+        registry: StatsRegistry = STATS,
+        handle: Optional[TextIO] = None,
+        interval: float = DEFAULT_STATS_INTERVAL_S,
+        echo: bool = False,
+    ):
+        """
+        Args:
+            registry: Registry to snapshot
+            handle: Text file to append one JSON object per snapshot to;
+                closed by close()
+            interval: Seconds between snapshots
+            echo: Also print each snapshot with format_snapshot()
+        """
+        if interval <= 0:
+            raise ValueError(f"Stats interval must be positive, got {interval}")
+        self.registry = registry
+        self.handle = handle
+        self.interval = interval
+        self.echo = echo
+        self._previous: Optional[Dict[str, Any]] = None
+        self._stop = Event()
+        self._thread = Thread(target=self._run, name='stats-dumper', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.dump()
+
+    def dump(self) -> Dict[str, Any]:
+        """Write one snapshot now and return it."""
+        snapshot = self.registry.snapshot()
+        if self.handle is not None:
+            try:
+                self.handle.write(json.dumps(snapshot, default=str) + '\n')
+                self.handle.flush()
+            except (OSError, ValueError) as e:
+                print(f"Stats write failed: {e}")
+        if self.echo:
+            print(format_snapshot(snapshot, self._previous))
+        self._previous = snapshot
+        return snapshot
+
+    def close(self):
+        """Stop, write a final snapshot and close the file."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.dump()
+        if self.handle is not None:
+            self.handle.close()